@@ -5,6 +5,7 @@ from boto3.resources.params import create_request_parameters
 from boto3.resources.action import xform_name
 
 from aioboto3.resources.response import AIOResourceHandler, AIORawHandler
+from aioboto3.utils import run_concurrently, prefetch
 
 logger = logging.getLogger(__name__)
 
@@ -50,32 +51,45 @@ class AioBatchAction(ServiceAction):
     async def __call__(self, parent, *args, **kwargs):
         service_name = None
         client = None
-        responses = []
+        # Number of batch requests in flight at once, the next pages are listed whilst they run.
+        # Responses are still returned in page order.
+        concurrency = kwargs.pop('concurrency', 1)
+        responses = {}
         operation_name = xform_name(self._action_model.request.operation)
 
         # Unlike the simple action above, a batch action must operate
         # on batches (or pages) of items. So we get each page, construct
         # the necessary parameters and call the batch operation.
-        async for page in parent.pages():
-            params = {}
-            for index, resource in enumerate(page):
-                # There is no public interface to get a service name
-                # or low-level client from a collection, so we get
-                # these from the first resource in the collection.
-                if service_name is None:
-                    service_name = resource.meta.service_name
-                if client is None:
-                    client = resource.meta.client
-
-                create_request_parameters(
-                    resource, self._action_model.request,
-                    params=params, index=index)
-
-            if not params:
-                # There are no items, no need to make a call.
-                break
-
-            params.update(kwargs)
+        async def batches():
+            nonlocal service_name, client
+
+            page_number = 0
+            async for page in prefetch(parent.pages(), concurrency):
+                params = {}
+                for index, resource in enumerate(page):
+                    # There is no public interface to get a service name
+                    # or low-level client from a collection, so we get
+                    # these from the first resource in the collection.
+                    if service_name is None:
+                        service_name = resource.meta.service_name
+                    if client is None:
+                        client = resource.meta.client
+
+                    create_request_parameters(
+                        resource, self._action_model.request,
+                        params=params, index=index)
+
+                if not params:
+                    # There are no items, no need to make a call.
+                    break
+
+                params.update(kwargs)
+
+                yield page_number, params
+                page_number += 1
+
+        async def call_batch(batch):
+            page_number, params = batch
 
             logger.debug('Calling %s:%s with %r',
                          service_name, operation_name, params)
@@ -84,10 +98,11 @@ class AioBatchAction(ServiceAction):
 
             logger.debug('Response: %r', response)
 
-            responses.append(
-                self._response_handler(parent, params, response))
+            responses[page_number] = self._response_handler(parent, params, response)
+
+        await run_concurrently(batches(), call_batch, concurrency)
 
-        return responses
+        return [responses[page_number] for page_number in sorted(responses)]
 
 
 class AIOWaiterAction(WaiterAction):
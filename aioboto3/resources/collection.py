@@ -1,15 +1,32 @@
 import logging
-from typing import AsyncIterator, Any, cast
+from typing import AsyncIterator, Any, Iterable, AsyncIterable, Union, cast
 
 from boto3.docs import docstring
 from boto3.resources.collection import CollectionFactory, ResourceCollection, CollectionManager, merge_dicts
 from boto3.resources.params import create_request_parameters
 
 from aioboto3.resources.action import AioBatchAction, AIOResourceHandler
+from aioboto3.utils import run_concurrently, prefetch
 
 logger = logging.getLogger(__name__)
 
 
+async def load_resources(resources: Union[Iterable[Any], AsyncIterable[Any]], concurrency: int = 10) -> None:
+    """
+    Call load() on lots of resources, with up to ``concurrency`` loads in flight at once.
+
+    E.g. filling in the metadata of listed S3 ObjectSummary's is one head_object each, which is
+    very slow when done one after the other.
+
+    :param resources: (Async) iterable of resources, e.g. a page from a collection
+    :param concurrency: Maximum number of load calls at once
+    """
+    async def load(resource):
+        await resource.load()
+
+    await run_concurrently(resources, load, concurrency)
+
+
 class AIOResourceCollection(ResourceCollection):
     """
     Converted the ResourceCollection.pages() function to an async generator so that we can do
@@ -35,6 +52,23 @@ class AIOResourceCollection(ResourceCollection):
     def __iter__(self):
         raise NotImplementedError('Use async-for instead')
 
+    async def loaded(self, concurrency: int = 10):
+        """
+        Like async-for over the collection, but every item has been loaded before it's yielded.
+
+        Each page is loaded with up to ``concurrency`` concurrent load calls whilst the next page is
+        being fetched. Items are yielded in the same order as the collection.
+
+        Usage::
+
+            async for obj in bucket.objects.filter(Prefix='data/').loaded(concurrency=50):
+                print(obj.key, obj.meta.data['ContentType'])
+        """
+        async for page in prefetch(cast(AsyncIterable[Any], self.pages()), 1):
+            await load_resources(page, concurrency)
+            for item in page:
+                yield item
+
     async def pages(self):
         client = self._parent.meta.client
         cleaned_params = self._params.copy()
@@ -0,0 +1,108 @@
+import asyncio
+import inspect
+import time
+from typing import Optional, Dict, Any, Tuple
+
+
+class BucketIndex(object):
+    """
+    Session wide cache of ListBuckets results, used by Bucket.load().
+
+    Rather than every Bucket.load() listing every bucket in the account, the index is built from a
+    single (paginated) listing and reused until it's ``ttl`` seconds old. Loads which happen whilst
+    the index is being built wait for that listing instead of starting their own.
+
+    If ``prefix`` is set, only buckets starting with it are indexed, which keeps the listing small
+    in accounts with lots of buckets. Buckets outside of the prefix are looked up with a listing
+    filtered to just their name.
+
+    Caching is off by default, so each Bucket.load() sees a fresh listing (concurrent loads still
+    share one). Enable it through the session before loading any buckets::
+
+        session = aioboto3.Session()
+        session.bucket_index.ttl = 300
+        session.bucket_index.prefix = 'myapp-'
+
+    Listings are kept separately per endpoint and access key, so clients using different
+    credentials, which may see different buckets, don't share them.
+    """
+    def __init__(self, ttl: float = 0.0, prefix: Optional[str] = None):
+        self.ttl = ttl
+        self.prefix = prefix
+        # Keyed by endpoint, access key and prefix
+        self._indexes: Dict[Tuple[Optional[str], ...], Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+        self._refreshes: Dict[Tuple[Optional[str], ...], asyncio.Future] = {}
+
+    def clear(self) -> None:
+        """
+        Forget all cached buckets.
+        """
+        self._indexes.clear()
+
+    async def get(self, client, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the ListBuckets entry for a bucket.
+
+        A miss triggers one refresh of the index, in case the bucket has been created since it was built.
+
+        :param client: S3 client, used if the index needs refreshing
+        :param name: Bucket name
+        :return: Dict of bucket data, or None if the bucket isn't in the listing
+        """
+        if self.prefix is not None and not name.startswith(self.prefix):
+            buckets = await _list_buckets(client, name)
+            return buckets.get(name)
+
+        key = (client.meta.endpoint_url, await _identity(client), self.prefix)
+        cached = self._indexes.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            if name in cached[1]:
+                return cached[1][name]
+
+        buckets = await self._refresh(client, key)
+        return buckets.get(name)
+
+    async def _refresh(self, client, key) -> Dict[str, Dict[str, Any]]:
+        future = self._refreshes.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._list(client, key))
+            self._refreshes[key] = future
+            future.add_done_callback(lambda _: self._refreshes.pop(key, None))
+        # Shielded so one cancelled load doesn't fail everyone else waiting on the listing
+        return await asyncio.shield(future)
+
+    async def _list(self, client, key) -> Dict[str, Dict[str, Any]]:
+        started = time.monotonic()
+        buckets = await _list_buckets(client, self.prefix)
+        if self.ttl > 0:
+            self._indexes[key] = (started, buckets)
+        return buckets
+
+
+async def _identity(client) -> str:
+    """
+    Identify who a client is making requests as, by their access key.
+    """
+    get_credentials = getattr(client, '_get_credentials', None)
+    if get_credentials is None:
+        # Can't tell, so don't share with any other client
+        return f'client-{id(client)}'
+    credentials = get_credentials()
+    if inspect.isawaitable(credentials):
+        credentials = await credentials
+    if credentials is None:
+        return 'anonymous'
+    return (await credentials.get_frozen_credentials()).access_key
+
+
+async def _list_buckets(client, prefix: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    kwargs = {}
+    if prefix:
+        kwargs['Prefix'] = prefix
+
+    buckets = {}
+    paginator = client.get_paginator('list_buckets')
+    async for page in paginator.paginate(**kwargs):
+        for bucket_data in page.get('Buckets', []):
+            buckets[bucket_data['Name']] = bucket_data
+    return buckets
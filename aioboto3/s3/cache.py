@@ -0,0 +1,140 @@
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Set
+
+from aioboto3.s3.hedging import hedged_head_object
+
+# Operations which change what head_object returns for the keys they touch
+INVALIDATING_OPERATIONS = (
+    'PutObject', 'CopyObject', 'DeleteObject', 'DeleteObjects', 'CompleteMultipartUpload', 'RestoreObject',
+    'PutObjectRetention', 'PutObjectLegalHold',
+)
+
+_CONTEXT_KEY = 'aioboto3_head_object_cache_keys'
+
+
+class HeadObjectCache(object):
+    """
+    Size bounded LRU cache of head_object responses, with entries expiring after ``ttl`` seconds.
+
+    Entries are keyed by bucket, key and the other head_object arguments (e.g. VersionId). Lookups
+    for an entry which is already being fetched wait for that head_object rather than making their
+    own. Writes made through a client the cache is registered with evict the keys they touch, but
+    writes made elsewhere will only be seen once entries expire, so keep ``ttl`` short.
+
+    Enable it on a client, after which download_fileobj, copy and ObjectSummary.load use it::
+
+        s3.enable_head_object_cache(MaxSize=10000, TTL=30)
+
+    Errors, e.g. 404s, aren't cached.
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        # (bucket, key) -> {other args: (expiry, response)}, in least to most recently used order
+        self._entries: 'OrderedDict[Tuple[str, str], Dict[Tuple, Tuple[float, Dict[str, Any]]]]' = OrderedDict()
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        # In flight head_object's whose key has since been invalidated, so mustn't be cached
+        self._invalidated: Set[Tuple] = set()
+
+    def __len__(self) -> int:
+        return sum(len(variants) for variants in self._entries.values())
+
+    def register(self, client) -> None:
+        """
+        Evict keys when they're written to through this client.
+        """
+        for operation in INVALIDATING_OPERATIONS:
+            client.meta.events.register(f'before-parameter-build.s3.{operation}', self._before_write)
+            client.meta.events.register(f'after-call.s3.{operation}', self._after_write)
+            client.meta.events.register(f'after-call-error.s3.{operation}', self._after_write)
+
+    def _before_write(self, params, context, **kwargs) -> None:
+        bucket = params.get('Bucket')
+        if 'Delete' in params:
+            keys = [obj['Key'] for obj in params['Delete'].get('Objects', [])]
+        else:
+            keys = [params.get('Key')]
+        context[_CONTEXT_KEY] = [(bucket, key) for key in keys]
+        for key in keys:
+            self.invalidate(bucket, key)
+
+    def _after_write(self, context, **kwargs) -> None:
+        # Again, in case a head_object raced with the write
+        for bucket, key in context.get(_CONTEXT_KEY, []):
+            self.invalidate(bucket, key)
+
+    def invalidate(self, bucket: str, key: Optional[str] = None) -> None:
+        """
+        Evict a key, or every key in a bucket.
+        """
+        def matches(cache_key: Tuple) -> bool:
+            return cache_key[0] == bucket and (key is None or cache_key[1] == key)
+
+        for cache_key in [cache_key for cache_key in self._entries if matches(cache_key)]:
+            del self._entries[cache_key]
+        self._invalidated.update(flight_key for flight_key in self._in_flight if matches(flight_key))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated.update(self._in_flight)
+
+    async def head_object(self, client, **kwargs) -> Dict[str, Any]:
+        """
+        Call client.head_object, unless there's a cached response.
+        """
+        cache_key = (kwargs.get('Bucket'), kwargs.get('Key'))
+        variant = tuple(sorted((name, repr(value)) for name, value in kwargs.items() if name not in ('Bucket', 'Key')))
+
+        variants = self._entries.get(cache_key)
+        if variants is not None and variant in variants:
+            expiry, response = variants[variant]
+            if time.monotonic() < expiry:
+                self._entries.move_to_end(cache_key)
+                return copy.deepcopy(response)
+            del variants[variant]
+
+        flight_key = cache_key + (variant,)
+        future = self._in_flight.get(flight_key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(client, cache_key, variant, kwargs))
+            self._in_flight[flight_key] = future
+            future.add_done_callback(lambda _: self._finish_flight(flight_key))
+        # Shielded so one cancelled caller doesn't fail the others waiting on it
+        response = await asyncio.shield(future)
+        return copy.deepcopy(response)
+
+    def _finish_flight(self, flight_key: Tuple) -> None:
+        self._in_flight.pop(flight_key, None)
+        self._invalidated.discard(flight_key)
+
+    async def _fetch(self, client, cache_key: Tuple[str, str], variant: Tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        response = await hedged_head_object(client, **kwargs)
+
+        if cache_key + (variant,) not in self._invalidated and self.ttl > 0 and self.max_size > 0:
+            self._entries.setdefault(cache_key, {})[variant] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return response
+
+
+async def cached_head_object(client, **kwargs) -> Dict[str, Any]:
+    """
+    Call head_object through the client's HeadObjectCache, if it has one.
+    """
+    cache = getattr(client, '_head_object_cache', None)
+    if cache is None:
+        return await hedged_head_object(client, **kwargs)
+    return await cache.head_object(client, **kwargs)
+
+
+def invalidate_head_object(client, bucket: str, key: str) -> None:
+    """
+    Evict a key from the client's HeadObjectCache, if it has one.
+    """
+    cache = getattr(client, '_head_object_cache', None)
+    if cache is not None:
+        cache.invalidate(bucket, key)
@@ -0,0 +1,228 @@
+import bisect
+import datetime
+from array import array
+from typing import Optional, Dict, Any, List, Iterable, Iterator, AsyncIterable, Callable, Tuple, Union
+
+
+class StringColumn(object):
+    """
+    Column of strings packed into one UTF-8 buffer, with an array of offsets into it.
+
+    Costs a few bytes per string on top of its contents, rather than a whole str object.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+        # offsets[i]:offsets[i + 1] is string i
+        self.offsets = array('Q', [0])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('column index out of range')
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, value: str) -> None:
+        self.buffer += value.encode('utf-8')
+        self.offsets.append(len(self.buffer))
+
+    def raw(self, index: int) -> bytes:
+        """
+        Get the UTF-8 bytes of a string, these sort in the same order as S3 sorts keys.
+        """
+        return bytes(self.buffer[self.offsets[index]:self.offsets[index + 1]])
+
+    def take(self, indexes: Iterable[int]) -> 'StringColumn':
+        column = StringColumn()
+        for index in indexes:
+            column.buffer += self.buffer[self.offsets[index]:self.offsets[index + 1]]
+            column.offsets.append(len(column.buffer))
+        return column
+
+
+class _RawKeys(object):
+    """
+    Sequence view of a StringColumn's raw values, for bisect.
+    """
+    def __init__(self, column: StringColumn):
+        self._column = column
+
+    def __len__(self) -> int:
+        return len(self._column)
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._column.raw(index)
+
+
+class ObjectListing(object):
+    """
+    Compact, column oriented store of listed objects.
+
+    Instead of a dict (or ObjectSummary) per object, keys and ETags are packed into
+    StringColumn's and sizes and LastModified timestamps into ``array``'s, which is a small
+    fraction of the memory for large listings. The numeric columns can be used as NumPy arrays
+    without copying, see ``to_numpy``.
+
+    Build one from anything yielding list_objects_v2 Contents dicts::
+
+        listing = await ObjectListing.from_async_iterable(s3.list_objects_parallel('mybucket'))
+
+    or with ``s3.list_objects_columnar('mybucket', 'prefix/')``. Listings from list_objects_v2
+    are already sorted by key, which ``find`` and ``diff`` rely on, use ``sort`` otherwise.
+    """
+    def __init__(self):
+        self.keys = StringColumn()
+        self.etags = StringColumn()
+        self.sizes = array('q')
+        # Seconds since the epoch, UTC
+        self.last_modified = array('d')
+
+    @classmethod
+    async def from_async_iterable(cls, objects: AsyncIterable[Dict[str, Any]]) -> 'ObjectListing':
+        listing = cls()
+        async for obj in objects:
+            listing.append(obj)
+        return listing
+
+    @classmethod
+    def from_iterable(cls, objects: Iterable[Dict[str, Any]]) -> 'ObjectListing':
+        listing = cls()
+        for obj in objects:
+            listing.append(obj)
+        return listing
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """
+        Get an object as a dict, like an entry in list_objects_v2's Contents.
+        """
+        return {
+            'Key': self.keys[index],
+            'ETag': self.etags[index],
+            'Size': self.sizes[index],
+            'LastModified': datetime.datetime.fromtimestamp(self.last_modified[index], tz=datetime.timezone.utc),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, obj: Dict[str, Any]) -> None:
+        self.keys.append(obj['Key'])
+        self.etags.append(obj['ETag'])
+        self.sizes.append(obj['Size'])
+        self.last_modified.append(obj['LastModified'].timestamp())
+
+    def take(self, indexes: Iterable[int]) -> 'ObjectListing':
+        """
+        New listing of just the objects at the given indexes, in that order.
+        """
+        indexes = array('Q', indexes)
+        listing = ObjectListing()
+        listing.keys = self.keys.take(indexes)
+        listing.etags = self.etags.take(indexes)
+        listing.sizes = array('q', (self.sizes[index] for index in indexes))
+        listing.last_modified = array('d', (self.last_modified[index] for index in indexes))
+        return listing
+
+    def sort(self) -> 'ObjectListing':
+        """
+        New listing sorted by key, in the same order S3 lists them.
+        """
+        return self.take(sorted(range(len(self)), key=self.keys.raw))
+
+    def filter(self, predicate: Union[Callable[[Dict[str, Any]], bool], Iterable[bool]]) -> 'ObjectListing':
+        """
+        New listing of the objects matching a predicate, called with each object's dict, or an
+        iterable of booleans (e.g. a NumPy mask).
+        """
+        if callable(predicate):
+            mask = (predicate(obj) for obj in self)
+        else:
+            mask = predicate
+        return self.take(index for index, keep in enumerate(mask) if keep)
+
+    def find(self, key: str) -> Optional[int]:
+        """
+        Index of a key in a sorted listing, or None.
+        """
+        raw_key = key.encode('utf-8')
+        index = bisect.bisect_left(_RawKeys(self.keys), raw_key)
+        if index < len(self) and self.keys.raw(index) == raw_key:
+            return index
+        return None
+
+    def diff(self, other: 'ObjectListing') -> Tuple[List[int], List[int], List[Tuple[int, int]]]:
+        """
+        Compare two sorted listings, e.g. of the same prefix at different times, or of a source and destination.
+
+        Objects are considered changed if their size or ETag differ.
+
+        :param other: Newer listing
+        :return: Indexes in other of added objects, indexes in self of removed objects, and (self, other)
+                 index pairs of changed objects
+        """
+        added: List[int] = []
+        removed: List[int] = []
+        changed: List[Tuple[int, int]] = []
+
+        i = j = 0
+        while i < len(self) and j < len(other):
+            key, other_key = self.keys.raw(i), other.keys.raw(j)
+            if key < other_key:
+                removed.append(i)
+                i += 1
+            elif key > other_key:
+                added.append(j)
+                j += 1
+            else:
+                if self.sizes[i] != other.sizes[j] or self.etags.raw(i) != other.etags.raw(j):
+                    changed.append((i, j))
+                i += 1
+                j += 1
+        removed.extend(range(i, len(self)))
+        added.extend(range(j, len(other)))
+
+        return added, removed, changed
+
+    def total_size(self) -> int:
+        return sum(self.sizes)
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory used by the columns.
+        """
+        return (
+            len(self.keys.buffer) + len(self.etags.buffer)
+            + (len(self.keys.offsets) + len(self.etags.offsets)) * self.keys.offsets.itemsize
+            + len(self.sizes) * self.sizes.itemsize + len(self.last_modified) * self.last_modified.itemsize
+        )
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        NumPy views of the columns, these share memory with the listing rather than copying it.
+
+        Keys and ETags are given as their UTF-8 buffer and offsets arrays. Requires NumPy. The
+        listing can't be appended to whilst the views exist.
+
+        :return: Dict of key_buffer, key_offsets, etag_buffer, etag_offsets, sizes and last_modified arrays
+        """
+        import numpy
+
+        return {
+            'key_buffer': numpy.frombuffer(self.keys.buffer, dtype=numpy.uint8),
+            'key_offsets': numpy.frombuffer(self.keys.offsets, dtype=numpy.uint64),
+            'etag_buffer': numpy.frombuffer(self.etags.buffer, dtype=numpy.uint8),
+            'etag_offsets': numpy.frombuffer(self.etags.offsets, dtype=numpy.uint64),
+            'sizes': numpy.frombuffer(self.sizes, dtype=numpy.int64),
+            'last_modified': numpy.frombuffer(self.last_modified, dtype=numpy.float64),
+        }
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Awaitable, BinaryIO
+
+import aiofiles
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Download ExtraArgs which also make sense for get_object, head_object and as part of the cache key
+CACHE_KEY_ARGS = ('VersionId',)
+# Objects downloaded with these aren't cached, customer provided keys mean the contents are meant to be protected
+UNCACHEABLE_ARGS = ('SSECustomerKey', 'SSECustomerAlgorithm', 'SSECustomerKeyMD5')
+
+DownloadFunc = Callable[[Any, Dict[str, Any]], Awaitable[None]]
+
+
+class DownloadCache(object):
+    """
+    Size bounded LRU cache of downloaded objects on local disk.
+
+    Each object is stored as a file named after a hash of its bucket, key and version, next to a
+    small JSON file holding its ETag. A cached object is revalidated on every use with a
+    get_object conditional on the ETag, so a hit costs one tiny request which returns 304, and an
+    object which has changed is downloaded by that same request.
+
+    Enable it on a client, after which download_file and download_fileobj use it::
+
+        s3.enable_download_cache('/var/cache/myapp/s3', MaxSize=20 * 1024 ** 3)
+
+    Least recently used objects are deleted once the cache is over ``max_size`` bytes. The cache
+    survives restarts, the directory can also be shared by processes although the size limit is
+    only enforced by each process for the objects it knows about.
+    """
+    def __init__(self, directory: str, max_size: int = 10 * 1024 ** 3):
+        self.directory = directory
+        self.max_size = max_size
+        # Entry name -> size, in least to most recently used order
+        self._entries: Optional['OrderedDict[str, int]'] = None
+        self._total_size = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def cacheable(extra_args: Dict[str, Any]) -> bool:
+        return not any(arg in extra_args for arg in UNCACHEABLE_ARGS)
+
+    def _name(self, bucket: str, key: str, extra_args: Dict[str, Any]) -> str:
+        parts = [bucket, key] + [f'{arg}={extra_args[arg]}' for arg in CACHE_KEY_ARGS if arg in extra_args]
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load_entries(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            name = filename[:-5]
+            try:
+                stat = os.stat(self._path(name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+
+        entries.sort()
+        self._entries = OrderedDict((name, size) for _, name, size in entries)
+        self._total_size = sum(self._entries.values())
+
+    def _read_meta(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(name) + '.json') as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_files(self, name: str, tmp_path: str, meta: Dict[str, Any]) -> None:
+        path = self._path(name)
+        with open(tmp_path + '.json', 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(tmp_path, path)
+        os.replace(tmp_path + '.json', path + '.json')
+
+    def _remove_files(self, names) -> None:
+        for name in names:
+            for path in (self._path(name), self._path(name) + '.json'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    async def _store(self, name: str, tmp_path: str, meta: Dict[str, Any]) -> None:
+        await self._run(self._write_files, name, tmp_path, meta)
+
+        self._total_size -= self._entries.pop(name, 0)
+        self._entries[name] = meta['Size']
+        self._total_size += meta['Size']
+
+        # Never evict what was just added, even if it's larger than the cache
+        evicted = []
+        while self._total_size > self.max_size and len(self._entries) > 1:
+            old_name, size = self._entries.popitem(last=False)
+            self._total_size -= size
+            evicted.append(old_name)
+        if evicted:
+            logger.debug(f'Evicting {len(evicted)} objects from the download cache')
+            await self._run(self._remove_files, evicted)
+
+    def _touch(self, name: str) -> None:
+        self._entries.move_to_end(name)
+        try:
+            # Keep the LRU order across restarts
+            os.utime(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def get_path(self, client, bucket: str, key: str, extra_args: Dict[str, Any], download: DownloadFunc) -> str:
+        """
+        Make sure the cached copy of an object is up to date, and get its path.
+
+        :param client: S3 client
+        :param bucket: Bucket name
+        :param key: Object key
+        :param extra_args: Download ExtraArgs
+        :param download: Function called with an async file and get_object kwargs to download an
+                         object which isn't cached yet, e.g. a multipart download
+        :return: Path of the cached file
+        """
+        if self._entries is None:
+            await self._run(self._load_entries)
+
+        name = self._name(bucket, key, extra_args)
+        future = self._in_flight.get(name)
+        if future is None:
+            future = asyncio.ensure_future(self._refresh(client, bucket, key, extra_args, name, download))
+            self._in_flight[name] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(name, None))
+        # Shielded so one cancelled caller doesn't fail the others waiting on it
+        return await asyncio.shield(future)
+
+    async def open(self, client, bucket: str, key: str, extra_args: Dict[str, Any], download: DownloadFunc) -> BinaryIO:
+        """
+        Like get_path, but open the cached file for reading so it can't be evicted from under the caller.
+        """
+        for attempt in range(2):
+            path = await self.get_path(client, bucket, key, extra_args, download)
+            try:
+                return await self._run(open, path, 'rb')
+            except FileNotFoundError:
+                # Evicted in between, rare so just go round again
+                if attempt:
+                    raise
+                self._total_size -= self._entries.pop(self._name(bucket, key, extra_args), 0)
+
+    async def _refresh(self, client, bucket: str, key: str, extra_args: Dict[str, Any], name: str, download: DownloadFunc) -> str:
+        meta = None
+        if name in self._entries:
+            meta = await self._run(self._read_meta, name)
+        tmp_path = self._path(f'{name}.{uuid.uuid4().hex}.tmp')
+
+        try:
+            if meta is None:
+                # Not cached, so do a normal (multipart) download, pinned to one version of the object
+                head_response = await client.head_object(Bucket=bucket, Key=key, **extra_args)
+                etag = head_response['ETag']
+                async with aiofiles.open(tmp_path, 'wb') as fileobj:
+                    await download(fileobj, {**extra_args, 'IfMatch': etag})
+                size = head_response['ContentLength']
+            else:
+                try:
+                    response = await client.get_object(Bucket=bucket, Key=key, IfNoneMatch=meta['ETag'], **extra_args)
+                except ClientError as err:
+                    if err.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 304 or \
+                            err.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+                        self._touch(name)
+                        return self._path(name)
+                    raise
+
+                # Changed, and get_object has returned the new version so keep it
+                etag = response['ETag']
+                size = 0
+                body = response['Body']
+                async with body, aiofiles.open(tmp_path, 'wb') as fileobj:
+                    async for chunk in body.iter_chunks(1024 * 1024):
+                        await fileobj.write(chunk)
+                        size += len(chunk)
+
+            await self._store(name, tmp_path, {'Bucket': bucket, 'Key': key, 'ETag': etag, 'Size': size})
+            return self._path(name)
+        finally:
+            for path in (tmp_path, tmp_path + '.json'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,160 @@
+import asyncio
+import collections
+import logging
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Latencies needed before a percentile is trusted as the hedge delay
+MIN_LATENCY_SAMPLES = 20
+
+
+class HedgingPolicy(object):
+    """
+    Send a duplicate of a slow idempotent request, and use whichever response comes back first.
+
+    A request still running after ``delay`` seconds, or if that's None, after the ``percentile``
+    of recently seen latencies, gets a second identical request sent. The first to succeed wins
+    and the other is cancelled.
+
+    Enable it on a client, after which hedged_get_object, hedged_head_object, the head_object
+    calls made by the transfer methods and single part download_fileobj's use it::
+
+        s3.enable_hedging(Percentile=95)
+
+    Latencies are kept separately per ``operation`` given to ``call``, as e.g. head_object is
+    much quicker than downloading a small object, so they need different delays. Every attempt
+    which finishes is recorded, and one cancelled because the other won is recorded with how long
+    it had taken so far, so the slow requests being hedged still count towards the percentile.
+
+    Hedges are paid for from a token bucket which gains ``budget_ratio`` tokens per request, up
+    to ``budget_burst``, and each hedge costs one. So with the defaults at most around 5% more
+    requests are made, which stops hedging from piling more load onto S3 when it's already
+    slow for everyone.
+    """
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: float = 95.0,
+        min_delay: float = 0.01,
+        budget_ratio: float = 0.05,
+        budget_burst: float = 10.0,
+        window: int = 1000
+    ):
+        if delay is None and not 0 < percentile < 100:
+            raise ValueError('percentile must be between 0 and 100')
+        self.delay = delay
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self.window = window
+        # Operation -> latencies of its recent attempts
+        self._latencies: Dict[str, 'collections.deque[float]'] = {}
+        self._tokens = budget_burst
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self, operation: str = 'request') -> Optional[float]:
+        """
+        Seconds to wait before hedging an operation, None if there isn't enough history to tell yet.
+        """
+        if self.delay is not None:
+            return self.delay
+        latencies = self._latencies.get(operation, ())
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        latencies = sorted(latencies)
+        index = min(int(len(latencies) * self.percentile / 100), len(latencies) - 1)
+        return max(latencies[index], self.min_delay)
+
+    def _take_token(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def call(
+        self, func: Callable[[], Awaitable[T]], discard: Optional[Callable[[T], None]] = None, operation: str = 'request'
+    ) -> T:
+        """
+        Call func, and call it again if it's slow.
+
+        :param func: Makes the request, it must be safe to call twice
+        :param discard: Called with the result of a losing request which also succeeded, e.g. to close its body
+        :param operation: Kind of request, each has its own latency history
+        :return: Result of the first request to succeed
+        """
+        self.requests += 1
+        self._tokens = min(self.budget_burst, self._tokens + self.budget_ratio)
+        latencies = self._latencies.get(operation)
+        if latencies is None:
+            latencies = self._latencies[operation] = collections.deque(maxlen=self.window)
+
+        started: Dict[asyncio.Future, float] = {asyncio.ensure_future(func()): time.monotonic()}
+        try:
+            delay = self.hedge_delay(operation)
+            if delay is not None:
+                done, _ = await asyncio.wait(started, timeout=delay)
+                if not done and self._take_token():
+                    self.hedges += 1
+                    started[asyncio.ensure_future(func())] = time.monotonic()
+
+            pending = set(started)
+            winner = None
+            error = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                now = time.monotonic()
+                for task in done:
+                    latencies.append(now - started[task])
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                    elif winner is None:
+                        winner = task
+                    elif discard is not None:
+                        discard(task.result())
+
+            if winner is None:
+                raise error
+
+            # About to be cancelled, they'd have taken at least this long
+            for task in pending:
+                latencies.append(now - started[task])
+            if len(started) > 1 and winner is not next(iter(started)):
+                self.hedge_wins += 1
+                logger.debug('Hedged request won')
+            return winner.result()
+        finally:
+            for task in started:
+                if not task.done():
+                    task.cancel()
+
+
+async def hedged_head_object(client, **kwargs) -> Dict[str, Any]:
+    """
+    Call head_object through the client's HedgingPolicy, if it has one.
+    """
+    policy = getattr(client, '_hedging_policy', None)
+    if policy is None:
+        return await client.head_object(**kwargs)
+    return await policy.call(lambda: client.head_object(**kwargs), operation='head_object')
+
+
+async def hedged_get_object(client, **kwargs) -> Dict[str, Any]:
+    """
+    Call get_object through the client's HedgingPolicy, if it has one.
+
+    Only the time to the response headers is hedged, the body is streamed from the winner.
+    """
+    policy = getattr(client, '_hedging_policy', None)
+    if policy is None:
+        return await client.get_object(**kwargs)
+    return await policy.call(
+        lambda: client.get_object(**kwargs), discard=lambda response: response['Body'].close(), operation='get_object'
+    )
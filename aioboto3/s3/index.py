@@ -0,0 +1,350 @@
+import asyncio
+import datetime
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Iterable
+
+from aioboto3.utils import run_concurrently
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    last_modified REAL NOT NULL,
+    PRIMARY KEY (bucket, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS shards (
+    bucket TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    PRIMARY KEY (bucket, prefix)
+) WITHOUT ROWID;
+"""
+
+# (size, etag, last modified timestamp)
+_ObjectRow = Tuple[int, str, float]
+# Keys >= lower and < upper, None for no upper bound
+_KeyRange = Tuple[str, Optional[str]]
+
+
+def _prefix_end(prefix: str) -> Optional[str]:
+    """
+    Smallest string greater than every string starting with prefix, None if there isn't one.
+    """
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+def _gaps(prefix: str, shard_prefixes: List[str]) -> List[_KeyRange]:
+    """
+    The key ranges under prefix which aren't under any of its shard prefixes.
+    """
+    ranges: List[_KeyRange] = []
+    lower: Optional[str] = prefix
+    for shard_prefix in sorted(shard_prefixes):
+        if lower < shard_prefix:
+            ranges.append((lower, shard_prefix))
+        lower = _prefix_end(shard_prefix)
+        if lower is None:
+            return ranges
+    upper = _prefix_end(prefix) if prefix else None
+    if upper is None or lower < upper:
+        ranges.append((lower, upper))
+    return ranges
+
+
+def _to_row(obj: Dict[str, Any]) -> _ObjectRow:
+    return obj['Size'], obj['ETag'], obj['LastModified'].timestamp()
+
+
+class ListingIndex(object):
+    """
+    Local SQLite copy of bucket listings, so "does this key exist" or "what's under this prefix"
+    doesn't need a listing of S3 every time.
+
+    Each refreshed prefix is split into shards, the prefixes one delimiter below it plus the
+    objects directly in it. A refresh only re-lists shards older than ``max_age`` and only
+    writes the rows which have changed. Rows are compared by key range rather than by which
+    shard wrote them, so refreshing both a prefix and one of its sub-prefixes is fine.
+
+    Usage::
+
+        async with ListingIndex('/tmp/listing.db') as index:
+            await index.refresh(s3_client, 'mybucket', 'data/', max_age=3600)
+            if await index.exists('mybucket', 'data/somefile'):
+                ...
+            async for obj in index.iter_objects('mybucket', prefix='data/2024/'):
+                print(obj['Key'], obj['Size'])
+
+    All database access happens on a single background thread.
+    """
+    def __init__(self, path: str):
+        self._path = path
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def __aenter__(self) -> 'ListingIndex':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self) -> None:
+        if self._conn is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aioboto3-listing-index')
+            await self._run(self._open)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _open(self) -> None:
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    async def refresh(
+        self,
+        client,
+        bucket: str,
+        prefix: str = '',
+        max_age: Optional[float] = None,
+        delimiter: Optional[str] = '/',
+        concurrency: int = 10,
+        extra_args: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """
+        Bring the index up to date with everything under a prefix.
+
+        The objects directly under the prefix and its shard prefixes are always listed (with the
+        delimiter), then each shard which hasn't been refreshed in the last ``max_age`` seconds is
+        listed in full, ``concurrency`` at a time. Shards which no longer exist are dropped.
+
+        :param client: S3 client
+        :param bucket: Bucket name
+        :param prefix: Prefix to refresh, use the same one each time
+        :param max_age: Skip shards refreshed less than this many seconds ago, None to refresh all of them
+        :param delimiter: Splits the prefix into shards, None for one shard
+        :param concurrency: Number of shards listed at once
+        :param extra_args: Extra list_objects_v2 arguments, e.g. RequestPayer
+        :return: Dict of the number of keys added, updated and deleted
+        """
+        await self.open()
+        extra_args = extra_args or {}
+        counts = {'added': 0, 'updated': 0, 'deleted': 0}
+
+        def add_counts(changes: Dict[str, int]) -> None:
+            for name, count in changes.items():
+                counts[name] += count
+
+        shard_prefixes: List[str] = []
+        if delimiter:
+            direct_objects = []
+            paginator = client.get_paginator('list_objects_v2')
+            async for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter=delimiter, **extra_args):
+                direct_objects.extend(page.get('Contents', []))
+                shard_prefixes.extend(common_prefix['Prefix'] for common_prefix in page.get('CommonPrefixes', []))
+
+            # The objects directly under the prefix have just been listed anyway, so always update them.
+            # Their ranges include those of shards which no longer exist, so this deletes their rows
+            add_counts(await self._run(self._update_rows, bucket, _gaps(prefix, shard_prefixes), direct_objects))
+        else:
+            shard_prefixes.append(prefix)
+
+        await self._run(self._drop_missing_shards, bucket, prefix, set(shard_prefixes))
+        stale = await self._run(self._stale_shards, bucket, shard_prefixes, max_age)
+
+        async def refresh_shard(shard_prefix: str) -> None:
+            objects = []
+            paginator = client.get_paginator('list_objects_v2')
+            async for page in paginator.paginate(Bucket=bucket, Prefix=shard_prefix, **extra_args):
+                objects.extend(page.get('Contents', []))
+            shard_range = (shard_prefix, _prefix_end(shard_prefix))
+            add_counts(await self._run(self._update_rows, bucket, [shard_range], objects, (shard_prefix, prefix)))
+
+        await run_concurrently(stale, refresh_shard, concurrency)
+
+        return counts
+
+    def _stale_shards(self, bucket: str, shard_prefixes: List[str], max_age: Optional[float]) -> List[str]:
+        if max_age is None:
+            return shard_prefixes
+        refreshed_since = time.time() - max_age
+        fresh = {
+            row[0] for row in self._conn.execute(
+                'SELECT prefix FROM shards WHERE bucket = ? AND refreshed_at >= ?', (bucket, refreshed_since)
+            )
+        }
+        return [shard_prefix for shard_prefix in shard_prefixes if shard_prefix not in fresh]
+
+    def _drop_missing_shards(self, bucket: str, parent: str, shard_prefixes: set) -> None:
+        """
+        Forget the shards of parent from earlier refreshes which this one doesn't have.
+
+        Only their records go, every key under parent is in a range this refresh updates, so their
+        rows are left to that. Deleting them here would also delete rows of the shards which replace
+        them, e.g. after switching between refreshing with and without a delimiter.
+        """
+        missing = [
+            row[0] for row in self._conn.execute('SELECT prefix FROM shards WHERE bucket = ? AND parent = ?', (bucket, parent))
+            if row[0] not in shard_prefixes
+        ]
+        with self._conn:
+            for shard_prefix in missing:
+                if shard_prefix == parent:
+                    # The whole prefix from a refresh without a delimiter, the shards under it are this refresh's
+                    self._conn.execute('DELETE FROM shards WHERE bucket = ? AND prefix = ?', (bucket, shard_prefix))
+                else:
+                    # Along with any shards of sub-prefixes refreshed on their own
+                    self._delete_range(bucket, 'shards', 'prefix', shard_prefix)
+
+    def _delete_range(self, bucket: str, table: str, column: str, prefix: str) -> int:
+        upper = _prefix_end(prefix)
+        if upper is None:
+            return self._conn.execute(f'DELETE FROM {table} WHERE bucket = ? AND {column} >= ?', (bucket, prefix)).rowcount
+        return self._conn.execute(
+            f'DELETE FROM {table} WHERE bucket = ? AND {column} >= ? AND {column} < ?', (bucket, prefix, upper)
+        ).rowcount
+
+    def _update_rows(
+        self, bucket: str, key_ranges: List[_KeyRange], objects: List[Dict[str, Any]], shard: Optional[Tuple[str, str]] = None
+    ) -> Dict[str, int]:
+        """
+        Make the rows within key_ranges match objects, a complete listing of those ranges.
+
+        shard is the (prefix, parent) to record as refreshed along with the rows, if any.
+        """
+        existing: Dict[str, _ObjectRow] = {}
+        for lower, upper in key_ranges:
+            query = 'SELECT key, size, etag, last_modified FROM objects WHERE bucket = ? AND key >= ?'
+            params: List[Any] = [bucket, lower]
+            if upper is not None:
+                query += ' AND key < ?'
+                params.append(upper)
+            existing.update((row[0], (row[1], row[2], row[3])) for row in self._conn.execute(query, params))
+
+        added = updated = 0
+        upserts = []
+        for obj in objects:
+            row = _to_row(obj)
+            old_row = existing.pop(obj['Key'], None)
+            if old_row == row:
+                continue
+            if old_row is None:
+                added += 1
+            else:
+                updated += 1
+            upserts.append((bucket, obj['Key']) + row)
+
+        with self._conn:
+            if upserts:
+                self._conn.executemany('INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)', upserts)
+            if existing:
+                self._conn.executemany('DELETE FROM objects WHERE bucket = ? AND key = ?', [(bucket, key) for key in existing])
+            if shard is not None:
+                self._conn.execute('INSERT OR REPLACE INTO shards VALUES (?, ?, ?, ?)', (bucket, *shard, time.time()))
+
+        return {'added': added, 'updated': updated, 'deleted': len(existing)}
+
+    async def get(self, bucket: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an object from the index.
+
+        :return: Dict with Key, Size, ETag and LastModified like list_objects_v2's Contents, or None
+        """
+        await self.open()
+        rows = await self._run(self._select, bucket, key, None, 1)
+        if rows and rows[0]['Key'] == key:
+            return rows[0]
+        return None
+
+    async def exists(self, bucket: str, key: str) -> bool:
+        return await self.get(bucket, key) is not None
+
+    async def exists_many(self, bucket: str, keys: Iterable[str]) -> Dict[str, bool]:
+        """
+        Check which of many keys are in the index.
+        """
+        await self.open()
+        return await self._run(self._exists_many, bucket, list(keys))
+
+    def _exists_many(self, bucket: str, keys: List[str]) -> Dict[str, bool]:
+        result = dict.fromkeys(keys, False)
+        # Stay well under SQLite's limit on the number of bound parameters
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            query = f'SELECT key FROM objects WHERE bucket = ? AND key IN ({", ".join("?" * len(batch))})'
+            for row in self._conn.execute(query, [bucket] + batch):
+                result[row[0]] = True
+        return result
+
+    async def iter_objects(
+        self,
+        bucket: str,
+        prefix: str = '',
+        start_after: Optional[str] = None,
+        end_before: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over indexed objects in key order, like a listing.
+
+        :param bucket: Bucket name
+        :param prefix: Only keys starting with this
+        :param start_after: Only keys after this
+        :param end_before: Only keys before this
+        :param batch_size: Number of rows read from the database at once
+        """
+        await self.open()
+        lower = prefix
+        upper = _prefix_end(prefix) if prefix else None
+        if end_before is not None and (upper is None or end_before < upper):
+            upper = end_before
+
+        after = start_after
+        while True:
+            rows = await self._run(self._select, bucket, lower, upper, batch_size, after)
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            after = rows[-1]['Key']
+
+    def _select(self, bucket: str, lower: str, upper: Optional[str], limit: int, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = 'SELECT key, size, etag, last_modified FROM objects WHERE bucket = ? AND key >= ?'
+        params: List[Any] = [bucket, lower]
+        if after is not None:
+            query += ' AND key > ?'
+            params.append(after)
+        if upper is not None:
+            query += ' AND key < ?'
+            params.append(upper)
+        query += ' ORDER BY key LIMIT ?'
+        params.append(limit)
+
+        return [
+            {
+                'Key': key,
+                'Size': size,
+                'ETag': etag,
+                'LastModified': datetime.datetime.fromtimestamp(last_modified, tz=datetime.timezone.utc),
+            }
+            for key, size, etag, last_modified in self._conn.execute(query, params)
+        ]
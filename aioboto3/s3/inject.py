@@ -1,27 +1,68 @@
 import asyncio
 import aiofiles
+import aiofiles.os
+import collections
 import inspect
+import io
 import logging
 import math
+import mmap
+import os
+import stat
+import statistics
+import time
+import uuid
 from functools import partial
 from io import BytesIO
-from typing import Optional, Callable, BinaryIO, Dict, Any, Union
+from typing import Optional, Callable, BinaryIO, Dict, Any, Union, AsyncIterable, AsyncIterator, Iterable, List, Sequence, Tuple
 from abc import abstractmethod
 
 from aiobotocore.context import with_current_context
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, IncompleteReadError
 from botocore.useragent import register_feature_id
 from boto3 import utils
 from boto3.s3.transfer import S3TransferConfig, S3Transfer
 from boto3.s3.inject import bucket_upload_file, bucket_download_file, bucket_copy, bucket_upload_fileobj, bucket_download_fileobj
 from s3transfer.upload import UploadSubmissionTask
 from s3transfer.copies import CopySubmissionTask
+from s3transfer.utils import ChunksizeAdjuster
+
+from aioboto3.s3.utils import schedule_checksum, call_with_retries
+from aioboto3.utils import run_concurrently, prefetch
+from aioboto3.s3.writer import S3Writer
+from aioboto3.s3.reader import S3Reader
+from aioboto3.s3.ranges import get_ranges
+from aioboto3.s3.bucket_index import BucketIndex
+from aioboto3.s3.listing import iter_objects_parallel
+from aioboto3.s3.columnar import ObjectListing
+from aioboto3.s3.cache import HeadObjectCache, cached_head_object, invalidate_head_object
+from aioboto3.s3.disk_cache import DownloadCache
+from aioboto3.s3.hedging import HedgingPolicy, hedged_get_object, hedged_head_object
+from aioboto3.s3.lookup import lookup_objects as _lookup_objects
+from aioboto3.s3.multiget import get_objects as _get_objects
+from aioboto3.s3.sync import sync_upload as _sync_upload, sync_download as _sync_download
+from aioboto3.s3.pipeline import Stage, transform_object
 
 logger = logging.getLogger(__name__)
 
 
 TransferCallback = Callable[[int], None]
 
+# Largest object a single CopyObject request can copy
+MAX_COPY_OBJECT_SIZE = 5 * 1024 ** 3
+# get_object response fields a streaming copy passes on to put_object, like CopyObject copies them
+_COPIED_OBJECT_ATTRIBUTES = ('Metadata', 'ContentType', 'ContentEncoding', 'ContentDisposition', 'ContentLanguage', 'CacheControl')
+
+# A part of a multipart download going slower than this fraction of the median rate is a straggler,
+# once there are no parts left to start, idle connections take over the end of its range
+STRAGGLER_RATE_RATIO = 0.25
+# Parts aren't judged until they've been downloading this long, so connection setup isn't mistaken for slowness
+STRAGGLER_MIN_ELAPSED = 1.0
+# Smallest range taken over from a straggler
+STRAGGLER_MIN_SPLIT = 1024 * 1024
+# How often idle connections look for a straggler, in seconds
+STRAGGLER_POLL_INTERVAL = 0.1
+
 
 class _AsyncBinaryIO:
     @abstractmethod
@@ -36,22 +77,136 @@ class _AsyncBinaryIO:
 AnyFileObject = Union[_AsyncBinaryIO, BinaryIO]
 
 
+class _AsyncIterableReader:
+    """
+    Presents an async iterable of bytes-like chunks as an object with an async read().
+
+    Chunks are handed back as-is where they fit, larger ones are split with memoryviews so
+    nothing is copied until the data is assembled into a part.
+    """
+    def __init__(self, iterable: AsyncIterable[bytes]):
+        self._iterator = iterable.__aiter__()
+        self._chunk: Union[bytes, bytearray, memoryview] = b''
+        self._eof = False
+
+    async def read(self, num_bytes: int = -1) -> Union[bytes, bytearray, memoryview]:
+        # Skip over any empty chunks, as returning b'' means EOF
+        while not self._chunk:
+            if self._eof:
+                return b''
+            try:
+                self._chunk = await self._iterator.__anext__()
+            except StopAsyncIteration:
+                self._eof = True
+                return b''
+
+        if num_bytes < 0 or len(self._chunk) <= num_bytes:
+            data = self._chunk
+            self._chunk = b''
+            return data
+
+        chunk = memoryview(self._chunk)
+        self._chunk = chunk[num_bytes:]
+        return chunk[:num_bytes]
+
+
+class _FileSegment(io.RawIOBase):
+    """
+    Read-only, seekable view over a region of a file descriptor.
+
+    Used as an upload_part body so the HTTP layer streams the part straight out of the file in small
+    chunks, instead of the whole part being read into memory first. Reads use pread so any number of
+    segments can share one descriptor concurrently.
+    """
+    def __init__(self, fd: int, offset: int, length: int):
+        super().__init__()
+        self._fd = fd
+        self._offset = offset
+        self._length = length
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._length + offset
+        else:
+            raise ValueError(f'Invalid whence ({whence})')
+
+        self._position = max(position, 0)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self._length - self._position
+        if remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+
+        data = os.pread(self._fd, size, self._offset + self._position)
+        self._position += len(data)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
 def inject_s3_transfer_methods(class_attributes, **kwargs):
     utils.inject_attribute(class_attributes, 'upload_file', upload_file)
     utils.inject_attribute(class_attributes, 'download_file', download_file)
     utils.inject_attribute(class_attributes, 'copy', copy)
+    utils.inject_attribute(class_attributes, 'copy_prefix', copy_prefix)
     utils.inject_attribute(class_attributes, 'upload_fileobj', upload_fileobj)
     utils.inject_attribute(
         class_attributes, 'download_fileobj', download_fileobj
     )
+    utils.inject_attribute(class_attributes, 'open_writer', open_writer)
+    utils.inject_attribute(class_attributes, 'open_reader', open_reader)
+    utils.inject_attribute(class_attributes, 'get_object_ranges', get_object_ranges)
+    utils.inject_attribute(class_attributes, 'list_objects_parallel', list_objects_parallel)
+    utils.inject_attribute(class_attributes, 'list_objects_columnar', list_objects_columnar)
+    utils.inject_attribute(class_attributes, 'lookup_objects', lookup_objects)
+    utils.inject_attribute(class_attributes, 'get_objects', get_objects)
+    utils.inject_attribute(class_attributes, 'sync_upload', sync_upload)
+    utils.inject_attribute(class_attributes, 'sync_download', sync_download)
+    utils.inject_attribute(class_attributes, 'transform', transform)
+    utils.inject_attribute(class_attributes, 'enable_head_object_cache', enable_head_object_cache)
+    utils.inject_attribute(class_attributes, '_head_object_cache', None)
+    utils.inject_attribute(class_attributes, 'enable_download_cache', enable_download_cache)
+    utils.inject_attribute(class_attributes, 'open_cached', open_cached)
+    utils.inject_attribute(class_attributes, '_download_cache', None)
+    utils.inject_attribute(class_attributes, 'enable_hedging', enable_hedging)
+    utils.inject_attribute(class_attributes, 'hedged_get_object', hedged_get_object)
+    utils.inject_attribute(class_attributes, 'hedged_head_object', hedged_head_object)
+    utils.inject_attribute(class_attributes, '_hedging_policy', None)
 
 
 def inject_object_summary_methods(class_attributes, **kwargs):
     utils.inject_attribute(class_attributes, 'load', object_summary_load)
 
 
-def inject_bucket_methods(class_attributes, **kwargs):
+def inject_bucket_methods(class_attributes, bucket_index=None, **kwargs):
     utils.inject_attribute(class_attributes, 'load', bucket_load)
+    utils.inject_attribute(class_attributes, '_bucket_index', bucket_index)
     utils.inject_attribute(class_attributes, 'upload_file', bucket_upload_file)
     utils.inject_attribute(
         class_attributes, 'download_file', bucket_download_file
@@ -65,9 +220,196 @@ def inject_bucket_methods(class_attributes, **kwargs):
     )
 
 
+def enable_head_object_cache(
+    self,
+    MaxSize: int = 1024,
+    TTL: float = 30.0,
+    Cache: Optional[HeadObjectCache] = None
+) -> HeadObjectCache:
+    """Cache head_object responses used by download_fileobj, copy and ObjectSummary.load.
+
+    Entries expire after TTL seconds, and at most MaxSize keys are kept,
+    least recently used first out. Writes made through this client evict
+    the keys they touch, writes made by anything else are only picked up
+    once entries expire.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            s3.enable_head_object_cache(MaxSize=10000, TTL=30)
+
+    :type MaxSize: int
+    :param MaxSize: The maximum number of keys cached.
+
+    :type TTL: float
+    :param TTL: The number of seconds responses are cached for.
+
+    :type Cache: aioboto3.s3.cache.HeadObjectCache
+    :param Cache: Use an existing cache, e.g. to share one between
+        clients. MaxSize and TTL are ignored.
+
+    :rtype: aioboto3.s3.cache.HeadObjectCache
+    """
+    if Cache is None:
+        Cache = HeadObjectCache(max_size=MaxSize, ttl=TTL)
+    Cache.register(self)
+    self._head_object_cache = Cache
+    return Cache
+
+
+def enable_hedging(
+    self,
+    Delay: Optional[float] = None,
+    Percentile: float = 95.0,
+    BudgetRatio: float = 0.05,
+    BudgetBurst: float = 10.0,
+    Policy: Optional[HedgingPolicy] = None
+) -> HedgingPolicy:
+    """Hedge slow head_object and small get_object requests.
+
+    A request which hasn't finished after Delay seconds, or the
+    Percentile of recent latencies if Delay isn't given, is sent again and
+    whichever finishes first is used. Applies to hedged_get_object,
+    hedged_head_object, the head_object calls made by the transfer
+    methods and download_fileobj of objects which fit in one part.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            s3.enable_hedging(Percentile=95)
+            response = await s3.hedged_get_object(Bucket='mybucket', Key='mykey')
+
+    :type Delay: float
+    :param Delay: Seconds before a request is hedged.
+
+    :type Percentile: float
+    :param Percentile: The latency percentile to hedge after, used when
+        Delay isn't given. It's tracked separately for head_object,
+        get_object and small downloads, and nothing is hedged until enough
+        requests of that kind have been made to know it.
+
+    :type BudgetRatio: float
+    :param BudgetRatio: The number of hedges allowed per request made.
+
+    :type BudgetBurst: float
+    :param BudgetBurst: The number of hedges which can be saved up.
+
+    :type Policy: aioboto3.s3.hedging.HedgingPolicy
+    :param Policy: Use an existing policy, e.g. to share a budget between
+        clients. The other arguments are ignored.
+
+    :rtype: aioboto3.s3.hedging.HedgingPolicy
+    """
+    if Policy is None:
+        Policy = HedgingPolicy(delay=Delay, percentile=Percentile, budget_ratio=BudgetRatio, budget_burst=BudgetBurst)
+    self._hedging_policy = Policy
+    return Policy
+
+
+def enable_download_cache(
+    self,
+    Directory: str,
+    MaxSize: int = 10 * 1024 ** 3,
+    Cache: Optional[DownloadCache] = None
+) -> DownloadCache:
+    """Keep downloaded objects on local disk and serve repeat downloads from there.
+
+    download_file and download_fileobj then revalidate the cached copy
+    with a get_object conditional on its ETag, which costs one small
+    request instead of the whole transfer when the object hasn't changed.
+    Objects using SSECustomerKey are never cached.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            s3.enable_download_cache('/var/cache/myapp/s3', MaxSize=20 * 1024 ** 3)
+
+    :type Directory: str
+    :param Directory: The directory to keep cached objects in.
+
+    :type MaxSize: int
+    :param MaxSize: The maximum total size of cached objects in bytes,
+        least recently used objects are deleted first.
+
+    :type Cache: aioboto3.s3.disk_cache.DownloadCache
+    :param Cache: Use an existing cache, e.g. to share one between
+        clients. Directory and MaxSize are ignored.
+
+    :rtype: aioboto3.s3.disk_cache.DownloadCache
+    """
+    if Cache is None:
+        Cache = DownloadCache(Directory, max_size=MaxSize)
+    self._download_cache = Cache
+    return Cache
+
+
+async def open_cached(
+    self,
+    Bucket: str,
+    Key: str,
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Config: Optional[S3TransferConfig] = None,
+    Mmap: bool = False
+) -> Union[BinaryIO, mmap.mmap]:
+    """Open the up to date cached copy of an object, downloading it if needed.
+
+    Needs enable_download_cache to have been called. The returned file
+    should be closed by the caller.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            s3.enable_download_cache('/var/cache/myapp/s3')
+            with await s3.open_cached('mybucket', 'model.bin', Mmap=True) as model:
+                header = model[:16]
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to download from.
+
+    :type Key: str
+    :param Key: The name of the key to download from.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to the
+        client operation.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: The transfer configuration to be used if the object needs
+        downloading.
+
+    :type Mmap: bool
+    :param Mmap: Return a read only memory map of the file rather than a
+        file object, so it can be accessed without reading it all into memory.
+        Empty objects can't be memory mapped.
+
+    :rtype: file object or mmap.mmap
+    """
+    if self._download_cache is None:
+        raise ValueError('enable_download_cache must be called first')
+    Config = Config or S3TransferConfig()
+    ExtraArgs = ExtraArgs or {}
+
+    async def download(fileobj, extra_args):
+        await _download_fileobj(self, Bucket, Key, fileobj, extra_args, None, Config)
+
+    cached_file = await self._download_cache.open(self, Bucket, Key, ExtraArgs, download)
+    if not Mmap:
+        return cached_file
+    with cached_file:
+        return mmap.mmap(cached_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 async def object_summary_load(self, *args, **kwargs):
-    response = await self.meta.client.head_object(
-        Bucket=self.bucket_name, Key=self.key
+    response = await cached_head_object(
+        self.meta.client, Bucket=self.bucket_name, Key=self.key
     )
     if 'ContentLength' in response:
         response['Size'] = response.pop('ContentLength')
@@ -108,35 +450,104 @@ async def download_file(
         )
 
 
-async def _download_part(self, bucket: str, key: str, extraArgs: Dict[str, str], headers: Dict[str, str], start: int, file: AnyFileObject, semaphore: asyncio.Semaphore, write_lock: asyncio.Lock,
-                         callback=None, io_queue: Optional[asyncio.Queue] = None) -> None:
-    async with semaphore:  # limit number of concurrent downloads
-        response = await self.get_object(
-            Bucket=bucket, Key=key, Range=headers['Range'], **extraArgs
-        )
-        content = await response['Body'].read()
+class _DownloadJob(object):
+    """
+    Byte range of a multipart download, end is moved in if another connection takes over its tail.
+    """
+    __slots__ = ('start', 'end', 'position', 'started_at', 'finished_at', 'responded')
 
-        # If stream is not seekable, return the offset and data so it can be queued up to be written
-        if io_queue:
-            await io_queue.put((start, content))
-        else:
-            # Check if it's aiofiles file
-            if inspect.iscoroutinefunction(file.seek) and inspect.iscoroutinefunction(file.write):
-                # These operations need to happen sequentially, which is non-deterministic when dealing with event loops
-                async with write_lock:
-                    await file.seek(start)
-                    await file.write(content)
-            else:
-                # Fallback to synchronous operations for file objects that are not async
-                file.seek(start)
-                file.write(content)
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.position = start
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Whether get_object returned, after which data may have been written
+        self.responded = False
 
-        # Call the wrapper callback with the number of bytes written, if provided
-        if callback:
-            try:
-                callback(len(content))
-            except:  # noqa: E722
-                pass
+    @property
+    def remaining(self) -> int:
+        return self.end - self.position
+
+    def rate(self, now: float) -> float:
+        elapsed = (self.finished_at or now) - self.started_at
+        return (self.position - self.start) / elapsed if elapsed > 0 else 0.0
+
+
+def _find_straggler(running: List[_DownloadJob], finished: List[_DownloadJob]) -> Optional[Tuple[_DownloadJob, float]]:
+    """
+    Find the running job most worth splitting, one well below the median download rate.
+
+    :return: The job and the median rate, or None
+    """
+    now = time.monotonic()
+    # Jobs waiting for a request slot haven't started
+    started = [job for job in running if job.started_at is not None and now - job.started_at >= STRAGGLER_MIN_ELAPSED]
+    rates = [job.rate(now) for job in finished + started]
+    if len(rates) < 2:
+        return None
+    median_rate = statistics.median(rates)
+
+    candidates = [
+        job for job in started
+        if job.remaining >= 2 * STRAGGLER_MIN_SPLIT and job.rate(now) < median_rate * STRAGGLER_RATE_RATIO
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda job: job.remaining), median_rate
+
+
+async def _download_part(self, bucket: str, key: str, extraArgs: Dict[str, str], job: _DownloadJob, file: AnyFileObject, write_lock: asyncio.Lock,
+                         chunk_size: int, callback=None, io_queue: Optional[asyncio.Queue] = None,
+                         request_semaphore: Optional[asyncio.Semaphore] = None) -> None:
+    if request_semaphore is not None:
+        async with request_semaphore:
+            await _download_part(self, bucket, key, extraArgs, job, file, write_lock, chunk_size, callback, io_queue)
+        return
+
+    job.started_at = time.monotonic()
+    response = await self.get_object(
+        Bucket=bucket, Key=key, Range=f'bytes={job.start}-{job.end - 1}', **extraArgs
+    )
+    job.responded = True
+    body = response['Body']
+    try:
+        # Read in chunks so progress can be measured, and so we can stop early if the tail has been taken over
+        while job.position < job.end:
+            content = await body.read(min(chunk_size, job.end - job.position))
+            if not content:
+                raise IncompleteReadError(actual_bytes=job.position - job.start, expected_bytes=job.end - job.start)
+            # The end may have moved in whilst reading
+            content = content[:job.end - job.position]
+            offset = job.position
+
+            # If stream is not seekable, return the offset and data so it can be queued up to be written
+            if io_queue:
+                await io_queue.put((offset, content))
+            else:
+                # Check if it's aiofiles file
+                if inspect.iscoroutinefunction(file.seek) and inspect.iscoroutinefunction(file.write):
+                    # These operations need to happen sequentially, which is non-deterministic when dealing with event loops
+                    async with write_lock:
+                        await file.seek(offset)
+                        await file.write(content)
+                else:
+                    # Fallback to synchronous operations for file objects that are not async
+                    file.seek(offset)
+                    file.write(content)
+            job.position += len(content)
+
+            # Call the wrapper callback with the number of bytes written, if provided
+            if callback:
+                try:
+                    callback(len(content))
+                except:  # noqa: E722
+                    pass
+    finally:
+        job.finished_at = time.monotonic()
+        if job.position < job.start + int(response['ContentLength']):
+            # Stopped early, so drop the connection rather than reading the rest of the range
+            body.close()
 
 
 @with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
@@ -190,17 +601,123 @@ async def download_fileobj(
     Config = Config or S3TransferConfig()
     ExtraArgs = ExtraArgs or {}
 
+    if self._download_cache is not None and DownloadCache.cacheable(ExtraArgs):
+        await _download_fileobj_cached(self, Bucket, Key, Fileobj, ExtraArgs, Callback, Config)
+    else:
+        await _download_fileobj(self, Bucket, Key, Fileobj, ExtraArgs, Callback, Config)
+
+
+async def _download_fileobj_cached(
+    self,
+    Bucket: str,
+    Key: str,
+    Fileobj: AnyFileObject,
+    ExtraArgs: Dict[str, Any],
+    Callback: Optional[TransferCallback],
+    Config: S3TransferConfig
+) -> None:
+    async def download(fileobj, extra_args):
+        await _download_fileobj(self, Bucket, Key, fileobj, extra_args, None, Config)
+
     try:
-        # Get object metadata to determine the total size
-        head_response = await self.head_object(Bucket=Bucket, Key=Key, **ExtraArgs)
+        cached_file = await self._download_cache.open(self, Bucket, Key, ExtraArgs, download)
     except ClientError as err:
         if err.response['Error']['Code'] == 'NoSuchKey':
             # Convert to 404 so it looks the same when boto3.download_file fails
             raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
         raise
 
-    # Semaphore to limit the number of concurrent downloads
-    semaphore = asyncio.Semaphore(Config.max_request_concurrency)
+    loop = asyncio.get_running_loop()
+    is_async = inspect.iscoroutinefunction(Fileobj.write)
+    total_size = 0
+    try:
+        while True:
+            data = await loop.run_in_executor(None, cached_file.read, Config.multipart_chunksize)
+            if not data:
+                break
+            if is_async:
+                await Fileobj.write(data)
+            else:
+                Fileobj.write(data)
+
+            total_size += len(data)
+            if Callback:
+                try:
+                    Callback(total_size)
+                except:  # noqa: E722
+                    pass
+    finally:
+        cached_file.close()
+
+
+class _ObjectChanged(Exception):
+    """
+    An object no longer had the ETag it was being downloaded at, before anything was written.
+    """
+
+
+def _is_precondition_failed(err: ClientError) -> bool:
+    return err.response.get('Error', {}).get('Code') in ('PreconditionFailed', '412') or \
+        err.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 412
+
+
+async def _download_fileobj(
+    self,
+    Bucket: str,
+    Key: str,
+    Fileobj: AnyFileObject,
+    ExtraArgs: Dict[str, Any],
+    Callback: Optional[TransferCallback],
+    Config: S3TransferConfig,
+    request_semaphore: Optional[asyncio.Semaphore] = None
+) -> str:
+    """
+    Download an object, returning the ETag of the version downloaded.
+
+    request_semaphore, if given, is held by each get_object until its body has been read, so it
+    can bound the requests of many downloads together.
+    """
+    for attempt in range(2):
+        try:
+            # Get object metadata to determine the total size
+            head_response = await cached_head_object(self, Bucket=Bucket, Key=Key, **ExtraArgs)
+        except ClientError as err:
+            if err.response['Error']['Code'] == 'NoSuchKey':
+                # Convert to 404 so it looks the same when boto3.download_file fails
+                raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+            raise
+
+        try:
+            await _download_version(self, Bucket, Key, Fileobj, ExtraArgs, Callback, Config, head_response, request_semaphore)
+            return head_response['ETag']
+        except _ObjectChanged as err:
+            if attempt:
+                raise Exception(f"Couldn't download file from {Bucket}/{Key}") from err.__cause__
+            # Most likely a stale cached head_object response, so start again from a fresh one
+            logger.debug(f'{Bucket}/{Key} changed before its download started, retrying')
+            invalidate_head_object(self, Bucket, Key)
+
+
+async def _download_version(
+    self,
+    Bucket: str,
+    Key: str,
+    Fileobj: AnyFileObject,
+    ExtraArgs: Dict[str, Any],
+    Callback: Optional[TransferCallback],
+    Config: S3TransferConfig,
+    head_response: Dict[str, Any],
+    request_semaphore: Optional[asyncio.Semaphore] = None
+) -> None:
+    """
+    Download the version of an object described by a head_object response.
+
+    Every ranged get_object is pinned to its ETag, so parts of different versions can't be mixed
+    together. If the object has changed before any data was received, _ObjectChanged is raised so
+    the caller can start again.
+    """
+    # Pinned to the version we got the size of
+    ExtraArgs = {'IfMatch': head_response['ETag'], **ExtraArgs}
     write_mutex = asyncio.Lock()
 
     total_size = head_response['ContentLength']
@@ -220,7 +737,42 @@ async def download_fileobj(
 
     is_seekable = hasattr(Fileobj, "seek")
 
-    # This'll have around `semaphore` length items, somewhat more if writing is slow
+    if total_parts == 1 and self._hedging_policy is not None:
+        # Small objects are mostly latency, so hedge the whole download. It's read into memory
+        # first so a losing request can't have written anything.
+        async def get_content() -> bytes:
+            if request_semaphore is not None:
+                await request_semaphore.acquire()
+            try:
+                response = await self.get_object(Bucket=Bucket, Key=Key, Range=f'bytes=0-{total_size - 1}', **ExtraArgs)
+                return await response['Body'].read()
+            finally:
+                if request_semaphore is not None:
+                    request_semaphore.release()
+
+        try:
+            content = await self._hedging_policy.call(get_content, operation='download')
+        except ClientError as e:
+            if _is_precondition_failed(e):
+                # Read into memory first, so nothing has been written yet
+                raise _ObjectChanged() from e
+            raise Exception(
+                f"Couldn't download file from {Bucket}/{Key}"
+            ) from e
+        if is_seekable:
+            if inspect.iscoroutinefunction(Fileobj.seek):
+                await Fileobj.seek(0)
+            else:
+                Fileobj.seek(0)
+        if inspect.iscoroutinefunction(Fileobj.write):
+            await Fileobj.write(content)
+        else:
+            Fileobj.write(content)
+        wrapper_callback(len(content))
+        logger.debug(f'Downloaded file from {Bucket}/{Key}')
+        return
+
+    # This'll have around `max_request_concurrency` length items, somewhat more if writing is slow
     # TODO add limits so we dont fill up this list n blow out ram
     io_list = []
 
@@ -268,22 +820,57 @@ async def download_fileobj(
     if not is_seekable:
         queue_reader_future = asyncio.ensure_future(queue_reader())
 
-    try:
-        tasks = []
-        for i in range(total_parts):
-            start = i * Config.multipart_chunksize
-            end = min(
-                start + Config.multipart_chunksize, total_size
-            )  # Ensure we don't go beyond the total size
-            # Range headers, start at 0 so end which would be total_size, minus 1 = 0 indexed.
-            headers = {'Range': f'bytes={start}-{end - 1}'}
-            # Create a task for each part download
-            tasks.append(
-                _download_part(self, Bucket, Key, ExtraArgs, headers, start, Fileobj, semaphore, write_mutex, wrapper_callback, io_queue if not is_seekable else None)
-            )
+    jobs = collections.deque(
+        _DownloadJob(start, min(start + Config.multipart_chunksize, total_size))
+        for start in range(0, total_size, Config.multipart_chunksize)
+    )
+    running: List[_DownloadJob] = []
+    finished: List[_DownloadJob] = []
+    started: List[_DownloadJob] = []
+
+    async def worker() -> None:
+        """
+        Download parts until there are none left, then help out with any part that's downloading
+        far slower than the rest by taking over the end of its range.
+        """
+        while True:
+            if jobs:
+                job = jobs.popleft()
+            else:
+                straggler = _find_straggler(running, finished)
+                if straggler is None:
+                    if not running:
+                        return
+                    await asyncio.sleep(STRAGGLER_POLL_INTERVAL)
+                    continue
+
+                slow_job, median_rate = straggler
+                slow_rate = slow_job.rate(time.monotonic())
+                # Split so both connections should finish around the same time
+                tail = int(slow_job.remaining * median_rate / (median_rate + slow_rate))
+                tail = max(STRAGGLER_MIN_SPLIT, min(tail, slow_job.remaining - STRAGGLER_MIN_SPLIT))
+                job = _DownloadJob(slow_job.end - tail, slow_job.end)
+                slow_job.end = job.start
+                logger.debug(f'Splitting slow part of {Bucket}/{Key}, downloading bytes {job.start}-{job.end - 1} separately')
+
+            running.append(job)
+            started.append(job)
+            try:
+                await _download_part(
+                    self, Bucket, Key, ExtraArgs, job, Fileobj, write_mutex, Config.io_chunksize,
+                    wrapper_callback, io_queue if not is_seekable else None, request_semaphore
+                )
+            finally:
+                running.remove(job)
+            finished.append(job)
 
-        # Run all the download tasks concurrently
-        await asyncio.gather(*tasks)  # TODO might not be worth spamming the eventloop with 1000's of tasks, but deal with it when its a problem.
+    try:
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(Config.max_request_concurrency, total_parts) or 1)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
 
         if queue_reader_future:
             await queue_reader_future
@@ -291,15 +878,20 @@ async def download_fileobj(
         logger.debug(f'Downloaded file from {Bucket}/{Key}')
 
     except ClientError as e:
+        if _is_precondition_failed(e) and not any(job.responded for job in started):
+            raise _ObjectChanged() from e
         raise Exception(
             f"Couldn't download file from {Bucket}/{Key}"
         ) from e
+    finally:
+        if queue_reader_future and not queue_reader_future.done():
+            queue_reader_future.cancel()
 
 
 @with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
 async def upload_fileobj(
     self,
-    Fileobj: AnyFileObject,
+    Fileobj: Union[AnyFileObject, AsyncIterable[bytes]],
     Bucket: str,
     Key: str,
     ExtraArgs: Optional[Dict[str, Any]] = None,
@@ -322,9 +914,11 @@ async def upload_fileobj(
         async with aiofiles.open('filename', 'rb') as data:
             await s3.upload_fileobj(data, 'mybucket', 'mykey')
 
-    :type Fileobj: a file-like object
+    :type Fileobj: a file-like object or async iterable
     :param Fileobj: A file-like object to upload. At a minimum, it must
-        implement the `read` method, and must return bytes.
+        implement the `read` method, and must return bytes. Alternatively
+        an async iterable which yields bytes-like chunks, e.g. an aiohttp
+        response's `content.iter_chunked()`.
 
     :type Bucket: str
     :param Bucket: The name of the bucket to upload to.
@@ -351,8 +945,12 @@ async def upload_fileobj(
     kwargs = ExtraArgs or {}
     upload_part_args = {k: v for k, v in kwargs.items() if k in UploadSubmissionTask.UPLOAD_PART_ARGS}
     complete_upload_args = {k: v for k, v in kwargs.items() if k in UploadSubmissionTask.COMPLETE_MULTIPART_ARGS}
+    checksum_algorithm = kwargs.get('ChecksumAlgorithm')
     Config = Config or S3TransferConfig()
 
+    if not hasattr(Fileobj, 'read') and hasattr(Fileobj, '__aiter__'):
+        Fileobj = _AsyncIterableReader(Fileobj)
+
     async def fileobj_read(num_bytes: int) -> bytes:
         data = Fileobj.read(num_bytes)
         if inspect.isawaitable(data):
@@ -363,12 +961,16 @@ async def upload_fileobj(
         return data
 
     # So some streams might return less than Config.multipart_threshold on a read, but that might not be eof
-    initial_data = b''
-    while len(initial_data) < Config.multipart_threshold:
+    # Collect the reads and join them once, as lots of small reads would make repeated concatenation quadratic
+    initial_chunks = []
+    initial_size = 0
+    while initial_size < Config.multipart_threshold:
         new_data = await fileobj_read(Config.multipart_threshold)
         if new_data == b'':
             break
-        initial_data += new_data
+        initial_chunks.append(new_data)
+        initial_size += len(new_data)
+    initial_data = b''.join(initial_chunks)
 
     if len(initial_data) < Config.multipart_threshold:
         # Do Processing hook here, else it'll happen during the multipart
@@ -390,9 +992,9 @@ async def upload_fileobj(
                 Callback(len(initial_data))
         return
 
-    # File bigger than threshold, start multipart upload
-    resp = await self.create_multipart_upload(Bucket=Bucket, Key=Key, **kwargs)
-    upload_id = resp['UploadId']
+    # File bigger than threshold, start multipart upload. Don't wait for the UploadId here, the file reader
+    # can carry on reading and queueing parts whilst it's being created, the uploaders will wait for it
+    create_multipart_future = asyncio.ensure_future(self.create_multipart_upload(Bucket=Bucket, Key=Key, **kwargs))
     finished_parts = []
     expected_parts = 0
     io_queue = asyncio.Queue(maxsize=Config.max_io_queue_size)
@@ -400,6 +1002,17 @@ async def upload_fileobj(
     exception = None
     sent_bytes = 0
 
+    async def get_upload_id() -> str:
+        return (await create_multipart_future)['UploadId']
+
+    async def abort_upload() -> None:
+        try:
+            upload_id = await get_upload_id()
+        except Exception:
+            # Never managed to create the multipart upload, so there's nothing to abort
+            return
+        await self.abort_multipart_upload(Bucket=Bucket, Key=Key, UploadId=upload_id)
+
     async def uploader() -> int:
         nonlocal sent_bytes
         nonlocal exception
@@ -408,12 +1021,20 @@ async def upload_fileobj(
         # Loop whilst no other co-routine has raised an exception
         while not exception:
             try:
-                part_args = await io_queue.get()
+                part_args, checksum_future = await io_queue.get()
             except asyncio.CancelledError:
                 break
 
             # Submit part to S3
             try:
+                part_args['UploadId'] = await get_upload_id()
+
+                if checksum_future is not None:
+                    # Precomputed off the event loop, botocore won't recalculate it when the header is present
+                    checksum_args = await checksum_future
+                    if checksum_args:
+                        part_args.update(checksum_args)
+
                 resp = await self.upload_part(**part_args)
             except Exception as err:
                 # Set the main exception variable to the current exception, trigger the exception event
@@ -425,7 +1046,7 @@ async def upload_fileobj(
             # Success, add the result to the finished_parts, increment the sent_bytes
 
             finished_parts_kwargs = {}
-            if 'ChecksumAlgorithm' in kwargs:
+            if checksum_algorithm:
                 for key in resp:
                     if key.startswith('Checksum'):
                         finished_parts_kwargs[key] = resp[key]
@@ -494,8 +1115,11 @@ async def upload_fileobj(
             if Processing:
                 multipart_payload = Processing(multipart_payload)
 
-            await io_queue.put({'Body': multipart_payload, 'Bucket': Bucket, 'Key': Key,
-                                'PartNumber': part, 'UploadId': upload_id, **upload_part_args})
+            # Start checksumming the part now so it overlaps with the upload of earlier parts
+            checksum_future = schedule_checksum(checksum_algorithm, multipart_payload)
+
+            await io_queue.put(({'Body': multipart_payload, 'Bucket': Bucket, 'Key': Key,
+                                 'PartNumber': part, **upload_part_args}, checksum_future))
             logger.debug('Added part to io_queue')
             expected_parts += 1
 
@@ -519,7 +1143,7 @@ async def upload_fileobj(
 
     if exception_event.is_set() or len(finished_parts) != expected_parts:
         # An exception during upload or for some reason the finished parts dont match the expected parts, cancel upload
-        await self.abort_multipart_upload(Bucket=Bucket, Key=Key, UploadId=upload_id)
+        await abort_upload()
         # Raise exception later after we've disposed of the pending co-routines
     else:
         # All io chunks from the queue have been successfully uploaded
@@ -530,7 +1154,7 @@ async def upload_fileobj(
             await self.complete_multipart_upload(
                 Bucket=Bucket,
                 Key=Key,
-                UploadId=upload_id,
+                UploadId=await get_upload_id(),
                 MultipartUpload={'Parts': finished_parts},
                 **complete_upload_args
             )
@@ -538,7 +1162,7 @@ async def upload_fileobj(
             # We failed to complete the upload, try and abort, then return the orginal error
             exception = err
             try:
-                await self.abort_multipart_upload(Bucket=Bucket, Key=Key, UploadId=upload_id)
+                await abort_upload()
             except:
                 pass
 
@@ -590,7 +1214,19 @@ async def upload_file(
 
     Similar behavior as S3Transfer's upload_file() method,
     except that parameters are capitalized.
+
+    Regular files over the multipart threshold are uploaded with each part
+    streamed directly from the file, so parts aren't held in memory.
     """
+    Config = Config or S3TransferConfig()
+
+    # pread isn't available on Windows, so fall back to reading the file into parts there
+    if hasattr(os, 'pread'):
+        file_stat = await aiofiles.os.stat(Filename)
+        if stat.S_ISREG(file_stat.st_mode) and file_stat.st_size >= Config.multipart_threshold:
+            await _upload_file_segments(self, Filename, file_stat.st_size, Bucket, Key, ExtraArgs, Callback, Config)
+            return
+
     async with aiofiles.open(Filename, 'rb') as open_file:
         await upload_fileobj(
             self,
@@ -603,110 +1239,1226 @@ async def upload_file(
         )
 
 
-@with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
-async def copy(
+async def _upload_file_segments(
+    self,
+    filename: str,
+    size: int,
+    bucket: str,
+    key: str,
+    extra_args: Optional[Dict[str, Any]],
+    callback: Optional[TransferCallback],
+    config: S3TransferConfig,
+    request_semaphore: Optional[asyncio.Semaphore] = None
+) -> str:
+    """
+    Upload a file with each part streamed from it, returning the object's ETag.
+    """
+    # Size is known upfront so make sure we stay within the 10,000 part limit
+    chunksize = ChunksizeAdjuster().adjust_chunksize(config.multipart_chunksize, size)
+
+    loop = asyncio.get_running_loop()
+    fd = await loop.run_in_executor(None, os.open, filename, os.O_RDONLY)
+    try:
+        writer = S3Writer(self, bucket, key, ExtraArgs=extra_args, Callback=callback, Config=config, RequestSemaphore=request_semaphore)
+        try:
+            for offset in range(0, size, chunksize):
+                await writer.write_part(_FileSegment(fd, offset, min(chunksize, size - offset)))
+        except BaseException:
+            await writer.abort()
+            raise
+        await writer.close()
+        return writer.etag
+    finally:
+        os.close(fd)
+
+
+async def _sync_upload_file(
+    self,
+    filename: str,
+    bucket: str,
+    key: str,
+    extra_args: Optional[Dict[str, Any]],
+    config: S3TransferConfig,
+    request_semaphore: asyncio.Semaphore
+) -> str:
+    """
+    Upload a file like upload_file, but with every request taking a slot of request_semaphore and
+    returning the object's ETag.
+    """
+    file_stat = await aiofiles.os.stat(filename)
+    if hasattr(os, 'pread') and file_stat.st_size >= config.multipart_threshold:
+        return await _upload_file_segments(self, filename, file_stat.st_size, bucket, key, extra_args, None, config, request_semaphore)
+
+    async with S3Writer(self, bucket, key, ExtraArgs=extra_args, Config=config, RequestSemaphore=request_semaphore) as writer:
+        async with aiofiles.open(filename, 'rb') as open_file:
+            while True:
+                data = await open_file.read(config.multipart_chunksize)
+                if not data:
+                    break
+                await writer.write(data)
+    return writer.etag
+
+
+def open_writer(
     self,
-    CopySource: Dict[str, Any],
     Bucket: str,
     Key: str,
     ExtraArgs: Optional[Dict[str, Any]] = None,
     Callback: Optional[TransferCallback] = None,
-    SourceClient=None,  # Should be aioboto3/aiobotocore client
     Config: Optional[S3TransferConfig] = None
-):
-    assert 'Bucket' in CopySource
-    assert 'Key' in CopySource
+) -> S3Writer:
+    """Open an async writable file-like object which uploads to S3.
 
-    SourceClient = SourceClient or self
-    Config = Config or S3TransferConfig()
-    ExtraArgs = ExtraArgs or {}
+    Data written is buffered into parts which are uploaded concurrently in
+    the background, write() waits when too many parts are in flight.
 
-    try:
-        head_object_kwargs = {}
-        for param, value in ExtraArgs.items():
-            if param in CopySubmissionTask.EXTRA_ARGS_TO_HEAD_ARGS_MAPPING:
-                head_object_kwargs[CopySubmissionTask.EXTRA_ARGS_TO_HEAD_ARGS_MAPPING[param]] = value
+    Usage::
 
-        # Get object metadata to determine the total size
-        head_response = await SourceClient.head_object(Bucket=CopySource['Bucket'], Key=CopySource['Key'], **head_object_kwargs)
-    except ClientError as err:
-        if err.response['Error']['Code'] == 'NoSuchKey':
-            # Convert to 404 so it looks the same when boto3.download_file fails
-            raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
-        raise
+        import aioboto3
 
-    # So CopyObject works up to 5GiB, but S3Transfer uses Config.MultipartThreshold which by default is 8MiB :unamused:
-    if head_response['ContentLength'] < Config.multipart_threshold:
-        await self.copy_object(CopySource=CopySource, Bucket=Bucket, Key=Key, **ExtraArgs)
-        return
+        async with aioboto3.Session().client('s3') as s3:
+            async with s3.open_writer('mybucket', 'mykey') as writer:
+                await writer.write(b'Hello World')
 
-    # File is larger than 5GiB, do multipart copy
-    create_multipart_kwargs = {k: v for k, v in ExtraArgs.items() if k not in CopySubmissionTask.CREATE_MULTIPART_ARGS_BLACKLIST}
-    create_multipart_upload_resp = await self.create_multipart_upload(Bucket=Bucket, Key=Key, **create_multipart_kwargs)
+    :type Bucket: str
+    :param Bucket: The name of the bucket to upload to.
 
-    finished_parts = []
-    total_size = 0
+    :type Key: str
+    :param Key: The name of the key to upload to.
 
-    sem = asyncio.Semaphore(Config.max_request_concurrency)
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to the
+        client operation.
 
-    async def uploader(size: int, part_args: Dict[str, Any]):
-        nonlocal total_size
+    :type Callback: method
+    :param Callback: A method which takes a number of bytes transferred to
+        be periodically called during the upload.
 
-        async with sem:
-            upload_part_response = await self.upload_part_copy(**part_args)
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: The transfer configuration to be used when performing the
+        upload.
 
-        finished_parts.append({'ETag': upload_part_response['CopyPartResult']['ETag'], 'PartNumber': part_args['PartNumber']})
+    :rtype: aioboto3.s3.writer.S3Writer
+    """
+    return S3Writer(self, Bucket, Key, ExtraArgs=ExtraArgs, Callback=Callback, Config=Config)
 
-        # Call the callback, if it blocks then not good :/
-        if Callback:
-            try:
-                total_size += size
-                Callback(total_size)
+
+def open_reader(
+    self,
+    Bucket: str,
+    Key: str,
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    BlockSize: int = 1024 * 1024,
+    MaxBlocks: int = 32,
+    ReadAhead: int = 4,
+    Config: Optional[S3TransferConfig] = None
+) -> S3Reader:
+    """Open an async, seekable, read-only file-like object over an S3 object.
+
+    Reads are served from BlockSize blocks fetched with ranged get_object
+    calls and kept in an LRU cache, so lots of small reads and seeks, as
+    done by readers of formats like Parquet or zip, don't each need a
+    request. Sequential reads prefetch the next blocks.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            async with s3.open_reader('mybucket', 'mykey') as reader:
+                await reader.seek(-8, io.SEEK_END)
+                data = await reader.read(8)
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to read from.
+
+    :type Key: str
+    :param Key: The name of the key to read from.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to the
+        head_object and get_object calls.
+
+    :type BlockSize: int
+    :param BlockSize: The number of bytes fetched by each ranged get_object.
+
+    :type MaxBlocks: int
+    :param MaxBlocks: The maximum number of blocks cached.
+
+    :type ReadAhead: int
+    :param ReadAhead: The number of blocks prefetched once reads are
+        sequential, 0 to disable.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: Config.num_download_attempts is used to retry blocks.
+
+    :rtype: aioboto3.s3.reader.S3Reader
+    """
+    return S3Reader(self, Bucket, Key, ExtraArgs=ExtraArgs, BlockSize=BlockSize, MaxBlocks=MaxBlocks, ReadAhead=ReadAhead,
+                    Config=Config)
+
+
+@with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
+async def get_object_ranges(
+    self,
+    Bucket: str,
+    Key: str,
+    Ranges: Sequence[Tuple[int, int]],
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    MaxGap: int = 64 * 1024,
+    MaxRangeSize: int = 8 * 1024 * 1024,
+    Config: Optional[S3TransferConfig] = None
+) -> List[memoryview]:
+    """Read many byte ranges of an object with as few requests as possible.
+
+    Ranges within MaxGap bytes of each other are merged into one ranged
+    get_object, and the merged ranges are fetched concurrently. Fetching
+    the bytes in a small gap is cheaper than another request.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            chunks = await s3.get_object_ranges('mybucket', 'data.parquet', [(4, 1000), (2000, 500)])
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to read from.
+
+    :type Key: str
+    :param Key: The name of the key to read from.
+
+    :type Ranges: list of (int, int)
+    :param Ranges: (offset, length) byte ranges to read, in any order and
+        possibly overlapping.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to the
+        client operation.
+
+    :type MaxGap: int
+    :param MaxGap: Ranges this many bytes or fewer apart are merged.
+
+    :type MaxRangeSize: int
+    :param MaxRangeSize: Ranges aren't merged into a request bigger than
+        this.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: At most Config.max_request_concurrency requests are made
+        at once, each retried up to Config.num_download_attempts times.
+
+    :rtype: list of memoryview
+    :return: A memoryview of the data for each range, in the same order as
+        Ranges. They point into the fetched buffers rather than copying them.
+        Ranges going past the end of the object are cut short, so ones
+        starting past it are empty.
+    """
+    Config = Config or S3TransferConfig()
+    return await get_ranges(self, Bucket, Key, Ranges, ExtraArgs, MaxGap, MaxRangeSize, Config.max_request_concurrency,
+                            Config.num_download_attempts)
+
+
+def list_objects_parallel(
+    self,
+    Bucket: str,
+    Prefix: str = '',
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Concurrency: int = 10,
+    Delimiter: Optional[str] = '/',
+    Ordered: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """List every object under a prefix using concurrent listings.
+
+    A list_objects_v2 pagination can only fetch one page at a time, so
+    the key space is split into shards which are listed concurrently.
+    Shards are the prefixes found by listing with Delimiter, or ranges of
+    keys when there aren't enough of those.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            async for obj in s3.list_objects_parallel('mybucket', 'data/', Concurrency=50):
+                print(obj['Key'], obj['Size'])
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to list.
+
+    :type Prefix: str
+    :param Prefix: Only list keys starting with this prefix.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to
+        list_objects_v2, e.g. RequestPayer.
+
+    :type Concurrency: int
+    :param Concurrency: The maximum number of shards listed at once.
+
+    :type Delimiter: str
+    :param Delimiter: The delimiter used to find shards. If None, keys are
+        only split into ranges.
+
+    :type Ordered: bool
+    :param Ordered: Yield objects in key order, like a normal listing.
+        Otherwise they're yielded as soon as any shard lists them, which
+        keeps all shards busy.
+
+    :rtype: async iterator of dict
+    :return: Objects, as in the Contents of a list_objects_v2 response.
+    """
+    return iter_objects_parallel(self, Bucket, Prefix, ExtraArgs, Concurrency, Delimiter, Ordered)
+
+
+async def list_objects_columnar(
+    self,
+    Bucket: str,
+    Prefix: str = '',
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Concurrency: int = 1
+) -> ObjectListing:
+    """List every object under a prefix into a compact ObjectListing.
+
+    Keys, ETags, sizes and LastModified timestamps are held in packed
+    columns rather than a dict per object, so huge listings fit in memory.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            listing = await s3.list_objects_columnar('mybucket', 'data/', Concurrency=20)
+            print(len(listing), listing.total_size())
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to list.
+
+    :type Prefix: str
+    :param Prefix: Only list keys starting with this prefix.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to
+        list_objects_v2, e.g. RequestPayer.
+
+    :type Concurrency: int
+    :param Concurrency: If more than 1, list with list_objects_parallel.
+        The listing is in key order either way.
+
+    :rtype: aioboto3.s3.columnar.ObjectListing
+    """
+    ExtraArgs = ExtraArgs or {}
+
+    if Concurrency > 1:
+        objects = iter_objects_parallel(self, Bucket, Prefix, ExtraArgs, Concurrency, ordered=True)
+        return await ObjectListing.from_async_iterable(objects)
+
+    listing = ObjectListing()
+    paginator = self.get_paginator('list_objects_v2')
+    async for page in paginator.paginate(Bucket=Bucket, Prefix=Prefix, **ExtraArgs):
+        for obj in page.get('Contents', []):
+            listing.append(obj)
+    return listing
+
+
+async def lookup_objects(
+    self,
+    Bucket: str,
+    Keys: Iterable[str],
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Concurrency: int = 10,
+    Delimiter: str = '/'
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Check whether many keys exist, and get their metadata.
+
+    Rather than a head_object per key, keys which share a prefix with
+    enough others are looked up with a few list_objects_v2 calls, the
+    rest with concurrent head_object calls. How to look keys up is
+    decided per prefix, from how many keys there are and how densely
+    they turn out to be packed.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            found = await s3.lookup_objects('mybucket', keys)
+            missing = [key for key, obj in found.items() if obj is None]
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket.
+
+    :type Keys: iterable of str
+    :param Keys: The keys to look up.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to both
+        list_objects_v2 and head_object, e.g. RequestPayer.
+
+    :type Concurrency: int
+    :param Concurrency: The maximum number of requests in flight.
+
+    :type Delimiter: str
+    :param Delimiter: Keys are grouped by their prefix up to the last
+        delimiter.
+
+    :rtype: dict
+    :returns: Each key mapped to a list_objects_v2 style Contents entry,
+        with Key, LastModified, ETag, Size and StorageClass, or None if
+        it doesn't exist. Keys are in the order given.
+    """
+    return await _lookup_objects(self, Bucket, Keys, ExtraArgs, Concurrency, Delimiter)
+
+
+def get_objects(
+    self,
+    Bucket: str,
+    Keys: Iterable[str],
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Concurrency: int = 10,
+    MaxBufferSize: int = 64 * 1024 * 1024,
+    Ordered: bool = False,
+    Config: Optional[S3TransferConfig] = None,
+    ReturnExceptions: bool = False
+) -> AsyncIterator[Tuple[str, Union[bytes, Exception]]]:
+    """Get many small objects into memory concurrently.
+
+    At most Concurrency get_object calls are in flight, and fetches wait
+    rather than buffer more than MaxBufferSize bytes of bodies which
+    haven't been consumed yet, so memory stays bounded however many keys
+    there are or however slowly they're consumed.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            async for key, body in s3.get_objects('mybucket', keys, Concurrency=50):
+                process(key, body)
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket.
+
+    :type Keys: iterable of str
+    :param Keys: The keys to get, read lazily so can be a generator.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to get_object.
+
+    :type Concurrency: int
+    :param Concurrency: The maximum number of get_object calls in flight.
+
+    :type MaxBufferSize: int
+    :param MaxBufferSize: The maximum number of bytes buffered. When
+        Ordered, the next object to be yielded may go over it.
+
+    :type Ordered: bool
+    :param Ordered: Yield objects in the order of Keys. Otherwise they're
+        yielded as they finish downloading.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: Only num_download_attempts is used.
+
+    :type ReturnExceptions: bool
+    :param ReturnExceptions: Yield (key, exception) for keys which couldn't
+        be fetched, e.g. NoSuchKey, and carry on with the rest. Otherwise
+        the first such error is raised and ends the iteration.
+
+    :rtype: async iterator of (str, bytes), or (str, bytes or Exception)
+        if ReturnExceptions
+    """
+    Config = Config or S3TransferConfig()
+    return _get_objects(self, Bucket, Keys, ExtraArgs, Concurrency, MaxBufferSize, Ordered, Config.num_download_attempts,
+                        ReturnExceptions)
+
+
+@with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
+async def sync_upload(
+    self,
+    Directory: str,
+    Bucket: str,
+    Prefix: str = '',
+    Manifest: Optional[str] = None,
+    Delete: bool = False,
+    FullScan: bool = False,
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Config: Optional[S3TransferConfig] = None,
+    Concurrency: int = 10
+) -> Dict[str, int]:
+    """Upload the files in a directory which have changed since the last sync.
+
+    A manifest of each file's size, mtime and ETag is kept, so later
+    syncs only upload files whose size or mtime have changed, without
+    listing the prefix or hashing any files. The first sync, or one with
+    FullScan, lists the prefix and skips files whose object is the same
+    size and newer.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            counts = await s3.sync_upload('/data/reports', 'mybucket', 'reports/', Delete=True)
+
+    :type Directory: str
+    :param Directory: The directory to upload.
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to upload to.
+
+    :type Prefix: str
+    :param Prefix: Prepended to each file's path relative to Directory to
+        give its key.
+
+    :type Manifest: str
+    :param Manifest: Path of the manifest file, by default
+        .aioboto3-sync.json in Directory, which isn't uploaded.
+
+    :type Delete: bool
+    :param Delete: Delete objects whose file has been deleted since the
+        last sync, or with FullScan, all objects without a file.
+
+    :type FullScan: bool
+    :param FullScan: List the prefix rather than trusting the manifest,
+        to pick up changes made to it by anything else.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to upload_file.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: The transfer configuration used for each file. At most
+        max_request_concurrency requests are in flight across all files.
+
+    :type Concurrency: int
+    :param Concurrency: The maximum number of files uploaded at once.
+
+    :rtype: dict
+    :returns: The number of files transferred, deleted and unchanged.
+    """
+    Config = Config or S3TransferConfig()
+
+    async def upload(filename: str, key: str, request_semaphore: asyncio.Semaphore) -> str:
+        return await _sync_upload_file(self, filename, Bucket, key, ExtraArgs, Config, request_semaphore)
+
+    return await _sync_upload(self, upload, Directory, Bucket, Prefix, Manifest, Delete, FullScan, ExtraArgs, Config, Concurrency)
+
+
+@with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
+async def sync_download(
+    self,
+    Bucket: str,
+    Prefix: str,
+    Directory: str,
+    Manifest: Optional[str] = None,
+    Delete: bool = False,
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Config: Optional[S3TransferConfig] = None,
+    Concurrency: int = 10
+) -> Dict[str, int]:
+    """Download the objects under a prefix which have changed since the last sync.
+
+    The prefix is listed, and objects are only downloaded if their ETag
+    differs from the manifest, or their file's size or mtime have changed
+    since it was downloaded. Without a manifest, files the same size as
+    their object and newer are skipped.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            counts = await s3.sync_download('mybucket', 'reports/', '/data/reports')
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to download from.
+
+    :type Prefix: str
+    :param Prefix: Only download keys starting with this prefix, it's
+        removed from each key to give the file's path in Directory.
+
+    :type Directory: str
+    :param Directory: The directory to download to.
+
+    :type Manifest: str
+    :param Manifest: Path of the manifest file, by default
+        .aioboto3-sync.json in Directory.
+
+    :type Delete: bool
+    :param Delete: Delete files in Directory which have no object.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to download_file.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: The transfer configuration used for each file. At most
+        max_request_concurrency requests are in flight across all files.
+
+    :type Concurrency: int
+    :param Concurrency: The maximum number of files downloaded at once.
+
+    :rtype: dict
+    :returns: The number of files transferred, deleted and unchanged.
+    """
+    Config = Config or S3TransferConfig()
+
+    async def download(key: str, filename: str, request_semaphore: asyncio.Semaphore) -> str:
+        # Into a temporary file first, so a failed download doesn't destroy the existing copy
+        tmp_filename = f'{filename}.{uuid.uuid4().hex}.tmp'
+        try:
+            async with aiofiles.open(tmp_filename, 'wb') as fileobj:
+                etag = await _download_fileobj(self, Bucket, key, fileobj, ExtraArgs or {}, None, Config, request_semaphore)
+            await aiofiles.os.replace(tmp_filename, filename)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(tmp_filename)
+            except FileNotFoundError:
+                pass
+            raise
+        return etag
+
+    return await _sync_download(self, download, Bucket, Prefix, Directory, Manifest, Delete, ExtraArgs, Config, Concurrency)
+
+
+@with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
+async def transform(
+    self,
+    CopySource: Dict[str, Any],
+    Bucket: str,
+    Key: str,
+    Stages: Sequence[Union[Stage, Callable[[bytes], Any]]],
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Callback: Optional[TransferCallback] = None,
+    SourceClient=None,  # Should be aioboto3/aiobotocore client
+    Config: Optional[S3TransferConfig] = None
+) -> Dict[str, int]:
+    """Stream an object through transform stages into another object.
+
+    The source is read with concurrent ranged gets, passed in order
+    through each stage, and uploaded in parts as it comes out, so objects
+    of any size can be rewritten (e.g. decompressed, filtered and
+    recompressed) without staging them on disk or holding them in memory.
+    Each step waits when the one after it falls behind.
+
+    Usage::
+
+        import zlib
+        from concurrent.futures import ThreadPoolExecutor
+
+        import aioboto3
+        from aioboto3.s3.pipeline import Stage
+
+        async with aioboto3.Session().client('s3') as s3:
+            decompressor = zlib.decompressobj(wbits=31)
+            compressor = zlib.compressobj(level=9, wbits=31)
+            executor = ThreadPoolExecutor()
+            await s3.transform(
+                {'Bucket': 'mybucket', 'Key': 'logs.gz'}, 'mybucket', 'logs-recompressed.gz',
+                [
+                    Stage(decompressor.decompress, flush=decompressor.flush, executor=executor),
+                    Stage(compressor.compress, flush=compressor.flush, executor=executor),
+                ]
+            )
+
+    :type CopySource: dict
+    :param CopySource: The name of the source bucket, key name of the
+        source object, and optional version ID of the source object. The
+        dictionary format is:
+        ``{'Bucket': 'bucket', 'Key': 'key', 'VersionId': 'id'}``.
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to write to.
+
+    :type Key: str
+    :param Key: The name of the key to write to.
+
+    :type Stages: list
+    :param Stages: aioboto3.s3.pipeline.Stage's, or functions taking and
+        returning bytes, applied in order.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to the upload,
+        plus the CopySource* arguments as accepted by copy, which apply
+        to reading the source.
+
+    :type Callback: method
+    :param Callback: A method which takes a number of bytes uploaded.
+
+    :type SourceClient: aioboto3 or aiobotocore client
+    :param SourceClient: The client used to read the source object,
+        defaults to this one.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: multipart_chunksize sets the size of both the ranged
+        reads and the uploaded parts, and max_request_concurrency how many
+        of each are in flight.
+
+    :rtype: dict
+    :returns: The number of bytes read and written.
+    """
+    ExtraArgs = ExtraArgs or {}
+    SourceClient = SourceClient or self
+
+    source_extra_args = _head_object_kwargs(ExtraArgs)
+    if CopySource.get('VersionId'):
+        source_extra_args['VersionId'] = CopySource['VersionId']
+    upload_extra_args = {k: v for k, v in ExtraArgs.items() if not k.startswith('CopySource')}
+
+    return await transform_object(
+        self, SourceClient, CopySource['Bucket'], CopySource['Key'], Bucket, Key, Stages,
+        source_extra_args=source_extra_args, extra_args=upload_extra_args, callback=Callback, config=Config
+    )
+
+
+@with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
+async def copy(
+    self,
+    CopySource: Dict[str, Any],
+    Bucket: str,
+    Key: str,
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Callback: Optional[TransferCallback] = None,
+    SourceClient=None,  # Should be aioboto3/aiobotocore client
+    Config: Optional[S3TransferConfig] = None,
+    UploadId: Optional[str] = None,
+    CopyThreshold: Optional[int] = None,
+    Streaming: bool = False
+):
+    """Copy an object from one S3 location to another.
+
+    Objects up to CopyThreshold bytes are copied with a single CopyObject
+    request, larger ones with a multipart copy. At most Config.max_request_concurrency parts are
+    copied at once and each part is retried up to Config.num_download_attempts
+    times on transient errors.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            copy_source = {'Bucket': 'mybucket', 'Key': 'mykey'}
+            await s3.copy(copy_source, 'otherbucket', 'otherkey')
+
+    :type CopySource: dict
+    :param CopySource: The name of the source bucket, key name of the
+        source object, and optional version ID of the source object.
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to copy to.
+
+    :type Key: str
+    :param Key: The name of the key to copy to.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to the
+        client operation.
+
+    :type Callback: method
+    :param Callback: A method which takes the total number of bytes
+        copied so far, called after each part is copied.
+
+    :type SourceClient: aioboto3 S3 client
+    :param SourceClient: The client to be used for operations that may
+        happen at the source object, i.e. the head_object call.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: The transfer configuration to be used when performing the
+        copy.
+
+    :type UploadId: str
+    :param UploadId: The ID of an existing multipart upload to the destination
+        to copy into. Parts which have already been copied are skipped, but
+        only if ExtraArgs['CopySourceIfMatch'] holds the ETag of the source
+        the upload was started from, so they can't mix two versions of the
+        source; otherwise every part is copied again. If the copy fails the
+        upload is not aborted, so it can be resumed again with the same
+        UploadId, ExtraArgs and Config. A copy without an UploadId aborts the
+        multipart upload it creates when it fails, so to make a large copy
+        resumable, create the upload with create_multipart_upload and persist
+        its UploadId along with the source's ETag before calling copy().
+
+    :type CopyThreshold: int
+    :param CopyThreshold: The size in bytes up to which objects are copied
+        with a single CopyObject request, defaults to and is capped at 5GiB,
+        the most CopyObject supports. A server-side copy is one request no
+        matter the size, so lower this only if the parallelism of a multipart
+        copy is worth the extra requests. Config.multipart_threshold is not
+        used for copies.
+
+    :type Streaming: bool
+    :param Streaming: Instead of a server-side copy, stream the object with
+        ranged get_object calls on SourceClient into concurrent upload_part
+        calls on this client. For when the destination credentials can't
+        read the source, e.g. cross-account or cross-partition copies. At most
+        Config.max_request_concurrency parts are held in memory at once.
+        Objects under Config.multipart_threshold are copied with a single
+        get_object and put_object, which keeps the source's Metadata and
+        content headers unless ExtraArgs sets them or MetadataDirective is
+        REPLACE. UploadId is not supported.
+    """
+    assert 'Bucket' in CopySource
+    assert 'Key' in CopySource
+
+    SourceClient = SourceClient or self
+    Config = Config or S3TransferConfig()
+    ExtraArgs = ExtraArgs or {}
+
+    for attempt in range(2):
+        # Get object metadata to determine the total size
+        head_response = await _head_copy_source(SourceClient, CopySource, ExtraArgs)
+
+        try:
+            await _copy_object(
+                self, CopySource, Bucket, Key, head_response['ContentLength'], head_response['ETag'], ExtraArgs, Callback,
+                SourceClient, Config, UploadId, CopyThreshold, Streaming
+            )
+            return
+        except ClientError as err:
+            if attempt or not _is_precondition_failed(err):
+                raise
+            # Most likely a stale cached head_object response, so start again from a fresh one
+            logger.debug(f'{CopySource["Bucket"]}/{CopySource["Key"]} changed before it was copied, retrying')
+            invalidate_head_object(SourceClient, CopySource['Bucket'], CopySource['Key'])
+
+
+@with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
+async def copy_prefix(
+    self,
+    SourceBucket: str,
+    SourcePrefix: str,
+    Bucket: str,
+    Prefix: str,
+    ExtraArgs: Optional[Dict[str, Any]] = None,
+    Callback: Optional[TransferCallback] = None,
+    SourceClient=None,  # Should be aioboto3/aiobotocore client
+    Config: Optional[S3TransferConfig] = None,
+    CopyThreshold: Optional[int] = None,
+    Streaming: bool = False
+) -> int:
+    """Copy every object under a prefix to another bucket and/or prefix.
+
+    The source is listed with list_objects_v2 whilst objects are being
+    copied, and the size and ETag from the listing are used instead of a
+    head_object per key, unless the object has been overwritten since it was
+    listed, in which case the version it has now is copied. Each object is copied as in copy(), with
+    CopyObject or a multipart copy depending on its size. At most
+    Config.max_request_concurrency objects are copied at once, and they
+    share one budget of Config.max_request_concurrency requests in flight.
+    With Streaming, part bodies count against that budget until they've
+    been uploaded, so at most that many are held in memory.
+
+    Usage::
+
+        import aioboto3
+
+        async with aioboto3.Session().client('s3') as s3:
+            await s3.copy_prefix('mybucket', 'data/2024/', 'otherbucket', 'archive/2024/')
+
+    :type SourceBucket: str
+    :param SourceBucket: The name of the bucket to copy from.
+
+    :type SourcePrefix: str
+    :param SourcePrefix: Only objects with keys starting with this prefix
+        are copied.
+
+    :type Bucket: str
+    :param Bucket: The name of the bucket to copy to.
+
+    :type Prefix: str
+    :param Prefix: Replaces SourcePrefix at the start of each copied key.
+
+    :type ExtraArgs: dict
+    :param ExtraArgs: Extra arguments that may be passed to the
+        client operation, used for every object.
+
+    :type Callback: method
+    :param Callback: A method which takes a number of bytes, called with
+        the size of each object once it has been copied.
+
+    :type SourceClient: aioboto3 S3 client
+    :param SourceClient: The client to be used for operations that may
+        happen at the source, i.e. listing and streaming reads.
+
+    :type Config: boto3.s3.transfer.TransferConfig
+    :param Config: The transfer configuration to be used when performing the
+        copies.
+
+    :type CopyThreshold: int
+    :param CopyThreshold: See copy().
+
+    :type Streaming: bool
+    :param Streaming: See copy().
+
+    :rtype: int
+    :return: The number of objects copied.
+
+    :raises ValueError: If Prefix is under SourcePrefix in the same bucket,
+        as the copies would be listed and copied again.
+    """
+    if SourceBucket == Bucket and Prefix != SourcePrefix and Prefix.startswith(SourcePrefix):
+        raise ValueError(f'Prefix {Prefix!r} is under SourcePrefix {SourcePrefix!r} in the same bucket')
+
+    SourceClient = SourceClient or self
+    Config = Config or S3TransferConfig()
+    ExtraArgs = ExtraArgs or {}
+
+    request_semaphore = asyncio.Semaphore(Config.max_request_concurrency)
+    copied = 0
+
+    async def list_objects():
+        paginator = SourceClient.get_paginator('list_objects_v2')
+        async for page in paginator.paginate(Bucket=SourceBucket, Prefix=SourcePrefix):
+            for obj in page.get('Contents', []):
+                yield obj
+
+    async def copy_one(obj: Dict[str, Any]) -> None:
+        nonlocal copied
+
+        copy_source = {'Bucket': SourceBucket, 'Key': obj['Key']}
+        key = Prefix + obj['Key'][len(SourcePrefix):]
+        object_size, etag = obj['Size'], obj['ETag']
+        for attempt in range(2):
+            try:
+                await _copy_object(
+                    self, copy_source, Bucket, key, object_size, etag, ExtraArgs, None,
+                    SourceClient, Config, CopyThreshold=CopyThreshold, Streaming=Streaming, request_semaphore=request_semaphore
+                )
+                break
+            except ClientError as err:
+                if attempt or not _is_precondition_failed(err):
+                    raise
+                # Overwritten since it was listed, so copy whatever version is there now
+                async with request_semaphore:
+                    head_response = await _head_copy_source(SourceClient, copy_source, ExtraArgs)
+                object_size, etag = head_response['ContentLength'], head_response['ETag']
+        copied += 1
+
+        # Call the callback, if it blocks then not good :/
+        if Callback:
+            try:
+                Callback(object_size)
             except:  # noqa: E722
                 pass
 
-    num_parts = int(math.ceil(head_response['ContentLength'] / float(Config.multipart_chunksize)))
+    # Keep the next page of keys coming whilst the current one is copied. At most
+    # max_request_concurrency objects are copied at once, and every request they make, along with
+    # every part body held by a streaming copy, takes a slot of the shared request_semaphore
+    await run_concurrently(prefetch(list_objects(), 1000), copy_one, Config.max_request_concurrency)
+
+    return copied
+
+
+async def _copy_object(
+    self,
+    CopySource: Dict[str, Any],
+    Bucket: str,
+    Key: str,
+    object_size: int,
+    etag: str,
+    ExtraArgs: Dict[str, Any],
+    Callback: Optional[TransferCallback],
+    SourceClient,
+    Config: S3TransferConfig,
+    UploadId: Optional[str] = None,
+    CopyThreshold: Optional[int] = None,
+    Streaming: bool = False,
+    request_semaphore: Optional[asyncio.Semaphore] = None
+) -> None:
+    """
+    The guts of copy(), once the size and ETag of the source object are known.
+
+    request_semaphore limits the number of copy requests in flight, so it can be shared between many copies.
+    """
+    if request_semaphore is None:
+        request_semaphore = asyncio.Semaphore(Config.max_request_concurrency)
+
+    if Streaming:
+        if UploadId is not None:
+            raise ValueError('UploadId is not supported for streaming copies')
+
+        # Make sure every range comes from the same version of the object
+        get_object_kwargs = {'IfMatch': etag, **_head_object_kwargs(ExtraArgs)}
+        if 'VersionId' in CopySource:
+            get_object_kwargs['VersionId'] = CopySource['VersionId']
+        await _streaming_copy(self, SourceClient, CopySource, Bucket, Key, object_size, get_object_kwargs, ExtraArgs, Callback, Config,
+                              request_semaphore)
+        return
+
+    # CopyObject works up to 5GiB, S3Transfer uses Config.multipart_threshold which by default is 8MiB, which
+    # means lots of extra requests for no real gain as the copy happens server side
+    if CopyThreshold is None:
+        CopyThreshold = MAX_COPY_OBJECT_SIZE
+    CopyThreshold = min(CopyThreshold, MAX_COPY_OBJECT_SIZE)
 
-    tasks = []
-    upload_kwargs = {k: v for k, v in ExtraArgs.items() if k in CopySubmissionTask.UPLOAD_PART_COPY_ARGS}
-    upload_kwargs.update({'Bucket': Bucket, 'Key': Key, 'CopySource': CopySource, 'UploadId': create_multipart_upload_resp['UploadId']})
-    for part_number in range(1, num_parts + 1):
-        part_upload_kwargs = upload_kwargs.copy()
-        part_upload_kwargs['PartNumber'] = part_number
+    if UploadId is None and object_size <= CopyThreshold:
+        # Pinned to the version whose size chose this path, like the parts of a multipart copy
+        async with request_semaphore:
+            await self.copy_object(CopySource=CopySource, Bucket=Bucket, Key=Key, **{'CopySourceIfMatch': etag, **ExtraArgs})
+        return
+
+    chunksize, num_parts = _multipart_layout(Config, object_size)
 
-        range_start = (part_number - 1) * Config.multipart_chunksize
-        range_end = range_start + Config.multipart_chunksize - 1
-        if part_number == num_parts:
-            range_end = head_response['ContentLength'] - 1
+    if UploadId is None:
+        # File is larger than the threshold, do multipart copy
+        create_multipart_kwargs = {k: v for k, v in ExtraArgs.items() if k not in CopySubmissionTask.CREATE_MULTIPART_ARGS_BLACKLIST}
+        async with request_semaphore:
+            create_multipart_upload_resp = await self.create_multipart_upload(Bucket=Bucket, Key=Key, **create_multipart_kwargs)
+        upload_id = create_multipart_upload_resp['UploadId']
+        finished_parts = []
+    else:
+        upload_id = UploadId
+        if ExtraArgs.get('CopySourceIfMatch') == etag:
+            # Resuming from the same version of the source, so reuse any parts that have already been
+            # copied with the size we'd expect
+            list_parts_kwargs = {k: v for k, v in ExtraArgs.items() if k in ('RequestPayer', 'ExpectedBucketOwner')}
+            async with request_semaphore:
+                uploaded_parts = await _list_uploaded_parts(self, Bucket, Key, upload_id, **list_parts_kwargs)
+            finished_parts = [
+                {'ETag': part['ETag'], 'PartNumber': part_number}
+                for part_number, part in uploaded_parts.items()
+                if part_number <= num_parts and part['Size'] == _part_size(part_number, chunksize, object_size)
+            ]
+            logger.debug(f'Resuming copy to {Bucket}/{Key}, {len(finished_parts)}/{num_parts} parts already copied')
+        else:
+            # No way to tell which version of the source the existing parts came from, so copy them all again
+            finished_parts = []
+            logger.debug(f'Resuming copy to {Bucket}/{Key} without a CopySourceIfMatch ETag, copying every part again')
 
-        part_upload_kwargs['CopySourceRange'] = f'bytes={range_start}-{range_end}'
+    total_size = 0
+    # Make sure every part comes from the same version of the source object
+    upload_kwargs = {'CopySourceIfMatch': etag}
+    upload_kwargs.update({k: v for k, v in ExtraArgs.items() if k in CopySubmissionTask.UPLOAD_PART_COPY_ARGS})
+    upload_kwargs.update({'Bucket': Bucket, 'Key': Key, 'CopySource': CopySource, 'UploadId': upload_id})
+
+    async def copy_part(part_number: int) -> None:
+        nonlocal total_size
 
-        tasks.append(uploader(range_end-range_start, part_upload_kwargs))
+        range_start = (part_number - 1) * chunksize
+        range_end = range_start + _part_size(part_number, chunksize, object_size) - 1
+        part_upload_kwargs = {**upload_kwargs, 'PartNumber': part_number, 'CopySourceRange': f'bytes={range_start}-{range_end}'}
+
+        async def upload_part_copy():
+            async with request_semaphore:
+                return await self.upload_part_copy(**part_upload_kwargs)
+
+        upload_part_response = await call_with_retries(upload_part_copy, Config.num_download_attempts)
+        finished_parts.append({'ETag': upload_part_response['CopyPartResult']['ETag'], 'PartNumber': part_number})
+
+        # Call the callback, if it blocks then not good :/
+        if Callback:
+            try:
+                total_size += range_end - range_start + 1
+                Callback(total_size)
+            except:  # noqa: E722
+                pass
+
+    already_copied = {part['PartNumber'] for part in finished_parts}
+    parts_to_copy = (part_number for part_number in range(1, num_parts + 1) if part_number not in already_copied)
 
     try:
-        await asyncio.gather(*tasks)
+        # Only max_request_concurrency workers pull part numbers, rather than a coroutine per part
+        await run_concurrently(parts_to_copy, copy_part, Config.max_request_concurrency)
 
         assert len(finished_parts) == num_parts, "Number of finished upload parts does not match expected parts"
 
         finished_parts.sort(key=lambda item: item['PartNumber'])
 
         complete_upload_args = {k: v for k, v in ExtraArgs.items() if k in CopySubmissionTask.COMPLETE_MULTIPART_ARGS}
-        await self.complete_multipart_upload(
-            Bucket=Bucket,
-            Key=Key,
-            UploadId=create_multipart_upload_resp['UploadId'],
-            MultipartUpload={'Parts': finished_parts},
-            **complete_upload_args
-        )
+        async with request_semaphore:
+            await self.complete_multipart_upload(
+                Bucket=Bucket,
+                Key=Key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': finished_parts},
+                **complete_upload_args
+            )
+
+    except Exception as err:
+        if UploadId is not None:
+            # Leave the upload in place so the copy can be resumed
+            raise
+        try:
+            async with request_semaphore:
+                await self.abort_multipart_upload(Bucket=Bucket, Key=Key, UploadId=upload_id)
+        except Exception as err2:
+            raise err2 from err
+        raise err
+
+
+async def _streaming_copy(
+    self,
+    source_client,
+    copy_source: Dict[str, Any],
+    bucket: str,
+    key: str,
+    object_size: int,
+    get_object_kwargs: Dict[str, Any],
+    extra_args: Dict[str, Any],
+    callback: Optional[TransferCallback],
+    config: S3TransferConfig,
+    request_semaphore: asyncio.Semaphore
+) -> None:
+    create_kwargs = {k: v for k, v in extra_args.items() if k not in CopySubmissionTask.CREATE_MULTIPART_ARGS_BLACKLIST}
+    upload_part_args = {k: v for k, v in extra_args.items() if k in UploadSubmissionTask.UPLOAD_PART_ARGS}
+    complete_upload_args = {k: v for k, v in extra_args.items() if k in UploadSubmissionTask.COMPLETE_MULTIPART_ARGS}
+    checksum_algorithm = extra_args.get('ChecksumAlgorithm')
+
+    async def get_range(start: int, end: int) -> Tuple[Dict[str, Any], bytes]:
+        """
+        Get a range and its body, the caller must release a request_semaphore slot once it's done with the body.
+
+        The slot is held from the get until the body has been uploaded, so request_semaphore
+        bounds the number of bodies in memory as well as the number of requests.
+        """
+        async def get():
+            kwargs = dict(get_object_kwargs)
+            if end >= start:
+                kwargs['Range'] = f'bytes={start}-{end}'
+            await request_semaphore.acquire()
+            try:
+                response = await source_client.get_object(Bucket=copy_source['Bucket'], Key=copy_source['Key'], **kwargs)
+                return response, await response['Body'].read()
+            except BaseException:
+                # Don't hold the slot whilst backing off
+                request_semaphore.release()
+                raise
+
+        # Retry the whole get as the body could fail part way through being read
+        return await call_with_retries(get, config.num_download_attempts)
+
+    if object_size < config.multipart_threshold:
+        response, body = await get_range(0, object_size - 1)
+        put_kwargs = dict(create_kwargs)
+        if extra_args.get('MetadataDirective') != 'REPLACE':
+            # Keep the source's metadata and content headers, as a server-side CopyObject would
+            for name in _COPIED_OBJECT_ATTRIBUTES:
+                if name in response and name not in put_kwargs:
+                    put_kwargs[name] = response[name]
+        try:
+            await self.put_object(Bucket=bucket, Key=key, Body=body, **put_kwargs)
+        finally:
+            request_semaphore.release()
+        if callback:
+            try:
+                callback(len(body))
+            except:  # noqa: E722
+                pass
+        return
 
+    async def create_multipart_upload() -> Dict[str, Any]:
+        try:
+            return await self.create_multipart_upload(Bucket=bucket, Key=key, **create_kwargs)
+        finally:
+            request_semaphore.release()
+
+    # Parts can be downloaded whilst the multipart upload is being created. Its slot is taken
+    # first, as parts hold theirs whilst waiting for the UploadId
+    await request_semaphore.acquire()
+    create_multipart_future = asyncio.ensure_future(create_multipart_upload())
+    chunksize, num_parts = _multipart_layout(config, object_size)
+    finished_parts = []
+    total_size = 0
+
+    async def copy_part(part_number: int) -> None:
+        nonlocal total_size
+
+        range_start = (part_number - 1) * chunksize
+        part_size = _part_size(part_number, chunksize, object_size)
+        _, body = await get_range(range_start, range_start + part_size - 1)
+        try:
+            checksum_future = schedule_checksum(checksum_algorithm, body)
+
+            part_args = {'Body': body, 'Bucket': bucket, 'Key': key, 'PartNumber': part_number,
+                         'UploadId': (await create_multipart_future)['UploadId'], **upload_part_args}
+            if checksum_future is not None:
+                checksum_args = await checksum_future
+                if checksum_args:
+                    part_args.update(checksum_args)
+
+            resp = await call_with_retries(lambda: self.upload_part(**part_args), config.num_download_attempts)
+        finally:
+            request_semaphore.release()
+
+        finished_part = {'ETag': resp['ETag'], 'PartNumber': part_number}
+        if checksum_algorithm:
+            for resp_key in resp:
+                if resp_key.startswith('Checksum'):
+                    finished_part[resp_key] = resp[resp_key]
+        finished_parts.append(finished_part)
+
+        if callback:
+            try:
+                total_size += part_size
+                callback(total_size)
+            except:  # noqa: E722
+                pass
+
+    try:
+        # Each worker holds at most one part in memory
+        await run_concurrently(range(1, num_parts + 1), copy_part, config.max_request_concurrency)
+
+        finished_parts.sort(key=lambda item: item['PartNumber'])
+        upload_id = (await create_multipart_future)['UploadId']
+        async with request_semaphore:
+            await self.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': finished_parts},
+                **complete_upload_args
+            )
     except Exception as err:
         try:
-            await self.abort_multipart_upload(Bucket=Bucket, Key=Key, UploadId=create_multipart_upload_resp['UploadId'])
+            upload_id = (await create_multipart_future)['UploadId']
+        except Exception:
+            # Never managed to create the multipart upload, so nothing to abort
+            raise err
+        try:
+            async with request_semaphore:
+                await self.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
         except Exception as err2:
             raise err2 from err
         raise err
 
 
+async def _head_copy_source(source_client, copy_source: Dict[str, Any], extra_args: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await cached_head_object(source_client, Bucket=copy_source['Bucket'], Key=copy_source['Key'], **_head_object_kwargs(extra_args))
+    except ClientError as err:
+        if err.response['Error']['Code'] == 'NoSuchKey':
+            # Convert to 404 so it looks the same when boto3.download_file fails
+            raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+        raise
+
+
+def _head_object_kwargs(extra_args: Dict[str, Any]) -> Dict[str, Any]:
+    head_object_kwargs = {}
+    for param, value in extra_args.items():
+        if param in CopySubmissionTask.EXTRA_ARGS_TO_HEAD_ARGS_MAPPING:
+            head_object_kwargs[CopySubmissionTask.EXTRA_ARGS_TO_HEAD_ARGS_MAPPING[param]] = value
+    return head_object_kwargs
+
+
+def _multipart_layout(config: S3TransferConfig, total_size: int) -> Tuple[int, int]:
+    """
+    Get the part size and number of parts for a multipart transfer, keeping within S3's limits on
+    the number of parts and their size.
+    """
+    chunksize = ChunksizeAdjuster().adjust_chunksize(config.multipart_chunksize, total_size)
+    return chunksize, max(int(math.ceil(total_size / float(chunksize))), 1)
+
+
+def _part_size(part_number: int, chunksize: int, total_size: int) -> int:
+    return min(chunksize, total_size - (part_number - 1) * chunksize)
+
+
+async def _list_uploaded_parts(self, bucket: str, key: str, upload_id: str, **kwargs) -> Dict[int, Dict[str, Any]]:
+    parts = {}
+    paginator = self.get_paginator('list_parts')
+    async for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id, **kwargs):
+        for part in page.get('Parts', []):
+            parts[part['PartNumber']] = part
+    return parts
+
+
 async def bucket_load(self, *args, **kwargs):
     """
     Calls s3.Client.list_buckets() to update the attributes of the Bucket
@@ -720,13 +2472,14 @@ async def bucket_load(self, *args, **kwargs):
     # However, we may fail if we lack permissions to ListBuckets
     # or the bucket is in another account. In which case, creation_date
     # will be None.
+    # The session's bucket index means that's one listing for many loads,
+    # rather than one per load.
     self.meta.data = {}
+    bucket_index = self._bucket_index or BucketIndex(ttl=0)
     try:
-        response = await self.meta.client.list_buckets()
-        for bucket_data in response['Buckets']:
-            if bucket_data['Name'] == self.name:
-                self.meta.data = bucket_data
-                break
+        bucket_data = await bucket_index.get(self.meta.client, self.name)
+        if bucket_data is not None:
+            self.meta.data = bucket_data
     except ClientError as e:
         if not e.response.get('Error', {}).get('Code') == 'AccessDenied':
             raise
@@ -0,0 +1,191 @@
+import asyncio
+import math
+import string
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, Awaitable
+
+from aioboto3.s3.utils import start_after
+from aioboto3.utils import run_concurrently
+
+# Characters most keys are made up of, in sort order. Used to split a prefix into key ranges when
+# there are no delimiters to go on
+SHARD_ALPHABET = string.digits + string.ascii_uppercase + string.ascii_lowercase
+
+
+class _Shard(object):
+    """
+    A contiguous range of keys, everything under prefix which is >= lower and < upper.
+
+    Objects which were already listed whilst discovering shards are held in objects instead.
+    """
+    __slots__ = ('prefix', 'lower', 'upper', 'objects')
+
+    def __init__(self, prefix: str, lower: Optional[str] = None, upper: Optional[str] = None,
+                 objects: Optional[List[Dict[str, Any]]] = None):
+        self.prefix = prefix
+        self.lower = lower
+        self.upper = upper
+        self.objects = objects
+
+    @property
+    def sort_key(self) -> str:
+        return self.lower or self.prefix
+
+
+def _split_prefix(prefix: str, num_shards: int) -> List[_Shard]:
+    """
+    Split the keys under a prefix into roughly equal ranges of SHARD_ALPHABET.
+    """
+    num_shards = max(1, min(num_shards, len(SHARD_ALPHABET)))
+    boundaries = sorted({SHARD_ALPHABET[len(SHARD_ALPHABET) * i // num_shards] for i in range(1, num_shards)})
+    bounds = [None] + [prefix + char for char in boundaries] + [None]
+    return [_Shard(prefix, lower=bounds[i], upper=bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+async def _discover_shards(
+    client, bucket: str, prefix: str, extra_args: Dict[str, Any], num_shards: int, delimiter: Optional[str], depth: int
+) -> List[_Shard]:
+    if not delimiter or depth <= 0:
+        return _split_prefix(prefix, num_shards)
+
+    resp = await client.list_objects_v2(Bucket=bucket, Prefix=prefix, Delimiter=delimiter, **extra_args)
+    if resp.get('IsTruncated'):
+        # Too much at this level to enumerate, so split on key ranges instead
+        return _split_prefix(prefix, num_shards)
+
+    shards = [_Shard(obj['Key'], objects=[obj]) for obj in resp.get('Contents', [])]
+    sub_prefixes = [common_prefix['Prefix'] for common_prefix in resp.get('CommonPrefixes', [])]
+    if len(sub_prefixes) >= num_shards:
+        shards.extend(_Shard(sub_prefix) for sub_prefix in sub_prefixes)
+    elif sub_prefixes:
+        # Not enough prefixes to keep everything busy, look a level deeper
+        shards_per_prefix = int(math.ceil(num_shards / len(sub_prefixes)))
+        results = await asyncio.gather(*[
+            _discover_shards(client, bucket, sub_prefix, extra_args, shards_per_prefix, delimiter, depth - 1)
+            for sub_prefix in sub_prefixes
+        ])
+        for result in results:
+            shards.extend(result)
+
+    return shards
+
+
+async def _list_shard(
+    client, bucket: str, shard: _Shard, extra_args: Dict[str, Any], put_page: Callable[[List[Dict[str, Any]]], Awaitable[None]]
+) -> None:
+    if shard.objects is not None:
+        await put_page(shard.objects)
+        return
+
+    kwargs = {'Bucket': bucket, 'Prefix': shard.prefix, **extra_args}
+    if shard.lower is not None:
+        # Starts just below the lower bound, any keys in between are filtered out below
+        kwargs['StartAfter'] = start_after(shard.lower)
+
+    paginator = client.get_paginator('list_objects_v2')
+    async for page in paginator.paginate(**kwargs):
+        objects = page.get('Contents', [])
+        if shard.lower is not None:
+            objects = [obj for obj in objects if obj['Key'] >= shard.lower]
+        if shard.upper is None:
+            if objects:
+                await put_page(objects)
+            continue
+
+        in_range = [obj for obj in objects if obj['Key'] < shard.upper]
+        if in_range:
+            await put_page(in_range)
+        if len(in_range) < len(objects):
+            # Gone past the end of the shard
+            return
+
+
+async def _get(queue: asyncio.Queue, task: asyncio.Future):
+    """
+    Get from a queue, raising instead if the task filling it fails.
+    """
+    getter = asyncio.ensure_future(queue.get())
+    try:
+        await asyncio.wait([getter, task], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not getter.done():
+            getter.cancel()
+    if getter.done() and not getter.cancelled():
+        return getter.result()
+    # Raises if the task failed, otherwise everything has already been queued
+    task.result()
+    return await queue.get()
+
+
+async def iter_objects_parallel(
+    client,
+    bucket: str,
+    prefix: str = '',
+    extra_args: Optional[Dict[str, Any]] = None,
+    concurrency: int = 10,
+    delimiter: Optional[str] = '/',
+    ordered: bool = False,
+    max_depth: int = 2
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    List every object under a prefix, with multiple list_objects_v2 paginations running at once.
+
+    Each pagination is sequential, so the key space is split into shards which are listed
+    concurrently. Shards are found by listing with the delimiter up to max_depth levels deep, if
+    that finds too few (or the keys don't use the delimiter), prefixes are split into key ranges
+    with StartAfter.
+
+    :param client: S3 client
+    :param bucket: Bucket name
+    :param prefix: Only list keys starting with this
+    :param extra_args: Extra list_objects_v2 arguments, e.g. RequestPayer
+    :param concurrency: Number of shards listed at once
+    :param delimiter: Delimiter used to find shards, None to only split on key ranges
+    :param ordered: Yield objects in key order, as a plain listing would. Otherwise objects are
+                    yielded as soon as any shard lists them
+    :param max_depth: How many levels of delimited prefixes to look through for shards
+    :return: Async iterator of dicts, as in list_objects_v2's Contents
+    """
+    extra_args = extra_args or {}
+    shards = await _discover_shards(client, bucket, prefix, extra_args, concurrency * 2, delimiter, max_depth)
+    shards.sort(key=lambda shard: shard.sort_key)
+
+    if ordered:
+        # Each shard gets its own small buffer and they're drained in order. Shards are started in
+        # order too, so the one being drained is always being listed
+        queues = [asyncio.Queue(maxsize=2) for _ in shards]
+
+        async def list_shard(index: int) -> None:
+            await _list_shard(client, bucket, shards[index], extra_args, queues[index].put)
+            await queues[index].put(None)
+
+        task = asyncio.ensure_future(run_concurrently(range(len(shards)), list_shard, concurrency))
+        try:
+            for queue in queues:
+                while True:
+                    page = await _get(queue, task)
+                    if page is None:
+                        break
+                    for obj in page:
+                        yield obj
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        return
+
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def list_shards() -> None:
+        await run_concurrently(shards, lambda shard: _list_shard(client, bucket, shard, extra_args, queue.put), concurrency)
+        await queue.put(None)
+
+    task = asyncio.ensure_future(list_shards())
+    try:
+        while True:
+            page = await _get(queue, task)
+            if page is None:
+                break
+            for obj in page:
+                yield obj
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,131 @@
+import logging
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from botocore.exceptions import ClientError
+
+from aioboto3.s3.cache import cached_head_object
+from aioboto3.s3.utils import call_with_retries, start_after
+from aioboto3.utils import run_concurrently
+
+logger = logging.getLogger(__name__)
+
+# Keys are grouped by the prefix up to their last delimiter, groups with at least this many keys are listed
+LIST_MIN_KEYS = 4
+# Listing pages which resolve fewer keys than this mean a group is too spread out, the rest of it is HEAD'd
+LIST_MIN_KEYS_PER_PAGE = 4
+LIST_PAGE_SIZE = 1000
+
+
+def _group_keys(keys: List[str], delimiter: str) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for key in keys:
+        prefix = key[:key.rfind(delimiter) + 1] if delimiter else ''
+        groups.setdefault(prefix, []).append(key)
+    return groups
+
+
+def _from_head(key: str, head_response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a head_object response to look like an entry in list_objects_v2's Contents.
+    """
+    return {
+        'Key': key,
+        'LastModified': head_response['LastModified'],
+        'ETag': head_response['ETag'],
+        'Size': head_response['ContentLength'],
+        'StorageClass': head_response.get('StorageClass', 'STANDARD'),
+    }
+
+
+async def lookup_objects(
+    client,
+    bucket: str,
+    keys: Iterable[str],
+    extra_args: Optional[Dict[str, Any]] = None,
+    concurrency: int = 10,
+    delimiter: str = '/',
+    attempts: int = 5
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Find which of many keys exist, and their size, ETag etc., with as few requests as possible.
+
+    Keys are grouped by their prefix up to the last delimiter. Groups of LIST_MIN_KEYS or more
+    are looked up with list_objects_v2 calls starting just before the next unresolved key, so
+    each page resolves every wanted key up to the last key it lists and gaps are skipped over.
+    Small groups, and the rest of any group whose listing pages turn out to resolve only a few
+    keys each, are looked up with concurrent head_object calls.
+
+    extra_args are passed to both list_objects_v2 and head_object, so should only be arguments
+    both take, e.g. RequestPayer or ExpectedBucketOwner.
+
+    :return: Dict of key to a list_objects_v2 style Contents entry, or None if it doesn't exist, in the order given
+    """
+    extra_args = extra_args or {}
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    # Unique keys in the order given
+    keys = list(dict.fromkeys(keys))
+
+    work: List[Tuple[str, Any]] = []
+    # S3 sorts by UTF-8 bytes, which for str is the same as code point order
+    for prefix, group in _group_keys(sorted(keys), delimiter).items():
+        if len(group) >= LIST_MIN_KEYS:
+            work.append(('list', (prefix, group)))
+        else:
+            work.extend(('head', key) for key in group)
+    fallback_keys: List[str] = []
+
+    async def head(key: str) -> None:
+        try:
+            head_response = await call_with_retries(
+                lambda: cached_head_object(client, Bucket=bucket, Key=key, **extra_args), attempts
+            )
+        except ClientError as err:
+            if err.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+                raise
+            results[key] = None
+        else:
+            results[key] = _from_head(key, head_response)
+
+    async def list_group(prefix: str, group: List[str]) -> None:
+        index = 0
+        while index < len(group):
+            kwargs = {
+                'Bucket': bucket, 'Prefix': prefix, 'StartAfter': start_after(group[index]),
+                'MaxKeys': LIST_PAGE_SIZE, **extra_args
+            }
+            try:
+                response = await call_with_retries(lambda: client.list_objects_v2(**kwargs), attempts)
+            except ClientError as err:
+                if err.response['Error']['Code'] != 'AccessDenied':
+                    raise
+                # Allowed to get objects but not list them
+                fallback_keys.extend(group[index:])
+                return
+
+            contents = response.get('Contents', [])
+            listed = {obj['Key']: obj for obj in contents}
+            # Everything up to the last key listed is resolved, or everything left if that was the last page
+            last_key = contents[-1]['Key'] if response.get('IsTruncated') and contents else None
+            resolved = 0
+            while index < len(group) and (last_key is None or group[index] <= last_key):
+                results[group[index]] = listed.get(group[index])
+                index += 1
+                resolved += 1
+
+            if index < len(group) and resolved < LIST_MIN_KEYS_PER_PAGE:
+                logger.debug(f'Keys under {bucket}/{prefix} are sparse, looking up {len(group) - index} with head_object')
+                fallback_keys.extend(group[index:])
+                return
+
+    async def process(item: Tuple[str, Any]) -> None:
+        kind, value = item
+        if kind == 'list':
+            await list_group(*value)
+        else:
+            await head(value)
+
+    await run_concurrently(work, process, concurrency)
+    if fallback_keys:
+        await run_concurrently(fallback_keys, head, concurrency)
+
+    return {key: results[key] for key in keys}
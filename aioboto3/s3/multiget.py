@@ -0,0 +1,139 @@
+import asyncio
+from functools import partial
+from typing import Optional, Dict, Any, Iterable, AsyncIterator, Callable, Tuple, Union
+
+from aiobotocore.context import with_current_context
+from botocore.useragent import register_feature_id
+
+from aioboto3.s3.utils import call_with_retries
+from aioboto3.utils import run_concurrently
+
+_DONE = object()
+
+
+class _ByteBudget(object):
+    """
+    Limit on the bytes buffered but not yet taken by the consumer.
+
+    A reservation always succeeds when nothing is buffered, so one object bigger than the whole
+    budget can't get stuck.
+    """
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, size: int, force: Callable[[], bool]) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.used == 0 or self.used + size <= self.limit or force())
+            self.used += size
+
+    async def release(self, size: int) -> None:
+        async with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+
+async def get_objects(
+    client,
+    bucket: str,
+    keys: Iterable[str],
+    extra_args: Optional[Dict[str, Any]] = None,
+    concurrency: int = 10,
+    max_buffer_size: int = 64 * 1024 * 1024,
+    ordered: bool = False,
+    attempts: int = 5,
+    return_exceptions: bool = False
+) -> AsyncIterator[Tuple[str, Union[bytes, Exception]]]:
+    """
+    Get many objects into memory concurrently, without buffering more than ``max_buffer_size`` bytes.
+
+    Once get_object has returned an object's headers, its ContentLength is reserved from the
+    buffer budget before the body is read, and given back once the consumer has moved on from
+    it. So when the consumer is slower than S3, the fetches wait rather than piling up bodies.
+    Only ``concurrency`` keys are taken from ``keys`` at a time, so it can be a huge generator.
+
+    If ``ordered``, objects are yielded in the order of ``keys``. An object which is next to be
+    yielded can always go over the budget, otherwise later objects could fill it and leave it
+    with nowhere to go, so up to one object more than the budget may be buffered.
+
+    By default the first key which can't be fetched, e.g. a NoSuchKey or AccessDenied, raises
+    its error and stops the iteration. With ``return_exceptions``, the error is yielded in
+    place of that key's body and the other keys carry on.
+
+    :return: Async iterator of (key, body or exception)
+    """
+    extra_args = extra_args or {}
+    budget = _ByteBudget(max_buffer_size)
+    queue: asyncio.Queue = asyncio.Queue()
+    next_index = 0
+
+    async def fetch(item: Tuple[int, str]) -> None:
+        index, key = item
+
+        async def get() -> bytes:
+            response = await client.get_object(Bucket=bucket, Key=key, **extra_args)
+            body = response['Body']
+            size = response['ContentLength']
+            try:
+                await budget.acquire(size, lambda: ordered and index == next_index)
+            except BaseException:
+                body.close()
+                raise
+            try:
+                return await body.read()
+            except BaseException:
+                await budget.release(size)
+                raise
+
+        try:
+            data = await call_with_retries(get, attempts)
+        except Exception as err:
+            if not return_exceptions:
+                raise
+            data = err
+        await queue.put((index, key, data))
+
+    # The requests are all made from this task, so it's where the transfer is marked. Setting it
+    # whilst yielding to the consumer would leak it into the consumer's own requests
+    @with_current_context(partial(register_feature_id, 'S3_TRANSFER'))
+    async def producer() -> None:
+        try:
+            await run_concurrently(enumerate(keys), fetch, concurrency)
+            await queue.put(_DONE)
+        except Exception as err:
+            await queue.put(err)
+
+    async def next_result() -> Any:
+        item = await queue.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    task = asyncio.ensure_future(producer())
+    # Objects which arrived ahead of their turn, when ordered
+    early: Dict[int, Tuple[int, str, Union[bytes, Exception]]] = {}
+    try:
+        while True:
+            if ordered:
+                while next_index not in early:
+                    item = await next_result()
+                    if item is _DONE:
+                        return
+                    early[item[0]] = item
+                _, key, data = early.pop(next_index)
+            else:
+                item = await next_result()
+                if item is _DONE:
+                    return
+                _, key, data = item
+
+            yield key, data
+            next_index += 1
+            # Even for errors, which hold no budget, so a fetch waiting for its turn to go over the
+            # budget re-checks whether it's now next
+            await budget.release(0 if isinstance(data, Exception) else len(data))
+    finally:
+        if not task.done():
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,178 @@
+import asyncio
+import collections
+import inspect
+from concurrent.futures import Executor
+from typing import Optional, Dict, Any, Callable, Sequence, Union, AsyncIterator
+
+from boto3.s3.transfer import S3TransferConfig
+
+from aioboto3.s3.cache import cached_head_object
+from aioboto3.s3.utils import call_with_retries
+from aioboto3.s3.writer import S3Writer
+
+_EOF = object()
+
+
+class Stage(object):
+    """
+    A step of a transform pipeline.
+
+    ``func`` is called with each chunk of data in order and returns the transformed bytes, which
+    can be empty. ``flush``, if given, is called once at the end for anything still held back,
+    e.g. ``zlib.compressobj().flush``. Both can be plain or async functions.
+
+    Plain functions run on the event loop unless an ``executor`` is given. A thread pool suits
+    functions which release the GIL, like zlib. A process pool only works for stateless
+    functions, as state would be kept in the worker processes. Stateless functions can also be
+    given a ``concurrency`` above 1 to transform several chunks at once, output stays in order.
+    """
+    def __init__(
+        self,
+        func: Callable[[bytes], Any],
+        flush: Optional[Callable[[], Any]] = None,
+        executor: Optional[Executor] = None,
+        concurrency: int = 1
+    ):
+        self.func = func
+        self.flush = flush
+        self.executor = executor
+        self.concurrency = max(concurrency, 1)
+
+    async def _call(self, func: Callable, *args) -> bytes:
+        if inspect.iscoroutinefunction(func):
+            result = await func(*args)
+        elif self.executor is not None:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, func, *args)
+        else:
+            result = func(*args)
+        return result or b''
+
+    async def run(self, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        pending: 'collections.deque[asyncio.Future]' = collections.deque()
+
+        async def put(data: bytes) -> None:
+            if data:
+                await outbox.put(data)
+
+        try:
+            while True:
+                chunk = await inbox.get()
+                if chunk is _EOF:
+                    break
+                pending.append(asyncio.ensure_future(self._call(self.func, chunk)))
+                while len(pending) >= self.concurrency:
+                    await put(await pending.popleft())
+
+            while pending:
+                await put(await pending.popleft())
+            if self.flush is not None:
+                await put(await self._call(self.flush))
+            await outbox.put(_EOF)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def _read_ranges(
+    client, bucket: str, key: str, size: int, get_object_kwargs: Dict[str, Any], chunk_size: int, read_ahead: int, attempts: int
+) -> AsyncIterator[bytes]:
+    """
+    Read an object in order with ranged get_object calls, up to read_ahead of them in flight.
+    """
+    async def get_range(start: int, end: int) -> bytes:
+        async def get():
+            response = await client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end - 1}', **get_object_kwargs)
+            return await response['Body'].read()
+
+        return await call_with_retries(get, attempts)
+
+    futures: 'collections.deque[asyncio.Future]' = collections.deque()
+    next_start = 0
+    try:
+        while futures or next_start < size:
+            while len(futures) < read_ahead and next_start < size:
+                end = min(next_start + chunk_size, size)
+                futures.append(asyncio.ensure_future(get_range(next_start, end)))
+                next_start = end
+            yield await futures.popleft()
+    finally:
+        for future in futures:
+            future.cancel()
+        await asyncio.gather(*futures, return_exceptions=True)
+
+
+async def transform_object(
+    client,
+    source_client,
+    source_bucket: str,
+    source_key: str,
+    bucket: str,
+    key: str,
+    stages: Sequence[Union[Stage, Callable[[bytes], Any]]],
+    source_extra_args: Optional[Dict[str, Any]] = None,
+    extra_args: Optional[Dict[str, Any]] = None,
+    callback: Optional[Callable[[int], None]] = None,
+    config: Optional[S3TransferConfig] = None,
+    queue_size: int = 1
+) -> Dict[str, int]:
+    """
+    Stream an object through some transform stages into another object, without staging it on disk.
+
+    The source is read with ranged get_object calls of ``config.multipart_chunksize`` bytes, up
+    to ``config.max_request_concurrency`` ahead, all pinned to the ETag it had at the start.
+    Each stage runs as its own task, passing chunks on through queues of ``queue_size``, and the
+    result is written with an S3Writer which uploads parts concurrently. Every step waits when
+    the next one is behind, so memory stays around
+    ``(2 * max_request_concurrency + number of stages * (queue_size + 1)) * multipart_chunksize``
+    however big the object is, give or take what the stages themselves expand data to.
+
+    If anything fails, the upload is aborted.
+
+    :return: Dict of the number of bytes read and written
+    """
+    source_extra_args = source_extra_args or {}
+    config = config or S3TransferConfig()
+    stages = [stage if isinstance(stage, Stage) else Stage(stage) for stage in stages]
+
+    head_response = await cached_head_object(source_client, Bucket=source_bucket, Key=source_key, **source_extra_args)
+    size = head_response['ContentLength']
+    get_object_kwargs = {'IfMatch': head_response['ETag'], **source_extra_args}
+
+    counts = {'read': 0, 'written': 0}
+    queues = [asyncio.Queue(maxsize=max(queue_size, 1)) for _ in range(len(stages) + 1)]
+
+    async def source() -> None:
+        chunks = _read_ranges(
+            source_client, source_bucket, source_key, size, get_object_kwargs, config.multipart_chunksize,
+            config.max_request_concurrency, config.num_download_attempts
+        )
+        async for chunk in chunks:
+            counts['read'] += len(chunk)
+            await queues[0].put(chunk)
+        await queues[0].put(_EOF)
+
+    async def sink(writer: S3Writer) -> None:
+        while True:
+            chunk = await queues[-1].get()
+            if chunk is _EOF:
+                return
+            await writer.write(chunk)
+            counts['written'] += len(chunk)
+
+    async with S3Writer(client, bucket, key, ExtraArgs=extra_args, Callback=callback, Config=config) as writer:
+        tasks = [asyncio.ensure_future(source())]
+        tasks.extend(asyncio.ensure_future(stage.run(queues[index], queues[index + 1])) for index, stage in enumerate(stages))
+        tasks.append(asyncio.ensure_future(sink(writer)))
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return counts
@@ -0,0 +1,97 @@
+import asyncio
+from typing import Optional, Dict, Any, List, Tuple, Sequence
+
+from botocore.exceptions import ClientError
+
+from aioboto3.s3.utils import call_with_retries
+
+
+def coalesce_ranges(ranges: Sequence[Tuple[int, int]], max_gap: int, max_size: int) -> List[Tuple[int, int, List[int]]]:
+    """
+    Merge (offset, length) ranges which are within max_gap bytes of each other.
+
+    Merged ranges are kept under max_size bytes, unless a single range is bigger than that.
+    Overlapping ranges are always merged.
+
+    :return: List of (start, end) exclusive merged ranges, with the indexes of the ranges in each
+    """
+    merged: List[Tuple[int, int, List[int]]] = []
+    for index in sorted(range(len(ranges)), key=lambda i: ranges[i][0]):
+        offset, length = ranges[index]
+        if offset < 0 or length < 0:
+            raise ValueError(f'Invalid range ({offset}, {length})')
+        if length == 0:
+            continue
+
+        end = offset + length
+        if merged:
+            start, merged_end, indexes = merged[-1]
+            if offset < merged_end or (offset - merged_end <= max_gap and max(end, merged_end) - start <= max_size):
+                merged[-1] = (start, max(end, merged_end), indexes + [index])
+                continue
+        merged.append((offset, end, [index]))
+    return merged
+
+
+async def get_ranges(
+    client,
+    bucket: str,
+    key: str,
+    ranges: Sequence[Tuple[int, int]],
+    extra_args: Optional[Dict[str, Any]] = None,
+    max_gap: int = 64 * 1024,
+    max_size: int = 8 * 1024 * 1024,
+    concurrency: int = 10,
+    attempts: int = 5
+) -> List[memoryview]:
+    """
+    Read many (offset, length) ranges of an object, merging nearby ranges into fewer ranged get_object calls.
+
+    Merged ranges are fetched concurrently. Each result is a memoryview into the buffer of the
+    merged range it came from, so nothing is copied. Ranges past the end of the object are cut
+    short, as with a normal ranged get_object, and ranges starting at or past the end are empty
+    rather than failing with InvalidRange.
+
+    If the object changes between the get_object calls, they're all made again pinned to the
+    ETag from a fresh head_object, so every slice comes from the current version.
+
+    :return: memoryview per range, in the same order as ranges
+    """
+    extra_args = extra_args or {}
+    merged = coalesce_ranges(ranges, max_gap, max_size)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(start: int, end: int, get_object_kwargs: Dict[str, Any]) -> Tuple[bytes, Optional[str]]:
+        async def get_range():
+            async with semaphore:
+                try:
+                    response = await client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end - 1}', **get_object_kwargs)
+                except ClientError as err:
+                    if err.response.get('Error', {}).get('Code') != 'InvalidRange':
+                        raise
+                    # Starts past the end of the object
+                    return b'', None
+                return await response['Body'].read(), response['ETag']
+
+        return await call_with_retries(get_range, attempts)
+
+    results = await asyncio.gather(*[fetch(start, end, extra_args) for start, end, _ in merged])
+
+    etags = {etag for _, etag in results if etag is not None}
+    if len(etags) > 1:
+        # Any of the ETags seen could be out of date by now
+        head_args = client.meta.service_model.operation_model('HeadObject').input_shape.members
+        head_response = await call_with_retries(
+            lambda: client.head_object(Bucket=bucket, Key=key, **{arg: value for arg, value in extra_args.items() if arg in head_args}),
+            attempts
+        )
+        pinned_args = {**extra_args, 'IfMatch': head_response['ETag']}
+        results = await asyncio.gather(*[fetch(start, end, pinned_args) for start, end, _ in merged])
+
+    views = [memoryview(b'')] * len(ranges)
+    for (start, _, indexes), (body, _) in zip(merged, results):
+        body_view = memoryview(body)
+        for index in indexes:
+            offset, length = ranges[index]
+            views[index] = body_view[offset - start:offset - start + length]
+    return views
@@ -0,0 +1,231 @@
+import asyncio
+import io
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Set, Union
+
+from boto3.s3.transfer import S3TransferConfig
+
+from aioboto3.s3.cache import cached_head_object
+from aioboto3.s3.utils import call_with_retries
+
+logger = logging.getLogger(__name__)
+
+
+class S3Reader(object):
+    """
+    Async, seekable, read-only file-like object over an S3 object.
+
+    Reads are served from fixed size blocks fetched with ranged get_object calls, which are kept in
+    an LRU cache of ``max_blocks`` blocks. Blocks a read spans are fetched concurrently. Once reads
+    look sequential, the next ``read_ahead`` blocks are prefetched in the background. Random reads,
+    e.g. of a Parquet footer then a few column chunks, only fetch the blocks they touch.
+
+    Usage::
+
+        async with s3.open_reader('mybucket', 'data.parquet') as reader:
+            await reader.seek(-8, io.SEEK_END)
+            footer_length = await reader.read(4)
+
+    Every block is fetched with IfMatch on the ETag from the initial head_object, so if the
+    object is overwritten whilst being read, reads fail rather than mixing two versions. At most
+    ``Config.max_request_concurrency`` get_object calls are in flight at once, prefetches included,
+    however many blocks a read spans.
+    """
+    def __init__(
+        self,
+        client,
+        Bucket: str,
+        Key: str,
+        ExtraArgs: Optional[Dict[str, Any]] = None,
+        BlockSize: int = 1024 * 1024,
+        MaxBlocks: int = 32,
+        ReadAhead: int = 4,
+        Config: Optional[S3TransferConfig] = None
+    ):
+        self._client = client
+        self._bucket = Bucket
+        self._key = Key
+        self._extra_args = ExtraArgs or {}
+        self._block_size = BlockSize
+        self._max_blocks = max(MaxBlocks, 1)
+        self._read_ahead = ReadAhead
+        self._config = Config or S3TransferConfig()
+
+        self._size: Optional[int] = None
+        self._etag: Optional[str] = None
+        self._position = 0
+        self._blocks: 'OrderedDict[int, bytes]' = OrderedDict()
+        self._fetches: Dict[int, asyncio.Future] = {}
+        self._prefetches: Set[asyncio.Future] = set()
+        self._request_semaphore = asyncio.Semaphore(max(self._config.max_request_concurrency, 1))
+        # Block the previous read ended in, to spot sequential reads
+        self._last_block: Optional[int] = None
+        self._sequential_reads = 0
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def size(self) -> Optional[int]:
+        """
+        Size of the object, None until it's been opened.
+        """
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return False
+
+    async def __aenter__(self) -> 'S3Reader':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self) -> None:
+        """
+        Get the object's size and ETag, done automatically by the first read or seek if not called.
+        """
+        if self._size is None:
+            head_response = await cached_head_object(self._client, Bucket=self._bucket, Key=self._key, **self._extra_args)
+            self._size = head_response['ContentLength']
+            self._etag = head_response['ETag']
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in self._prefetches:
+            task.cancel()
+        if self._prefetches:
+            await asyncio.gather(*self._prefetches, return_exceptions=True)
+        self._blocks.clear()
+
+    def tell(self) -> int:
+        return self._position
+
+    async def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._check_closed()
+        await self.open()
+
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f'invalid whence ({whence}, should be 0, 1 or 2)')
+        if position < 0:
+            raise ValueError(f'negative seek position {position}')
+
+        self._position = position
+        return position
+
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Read up to size bytes, or to the end of the object if size is negative.
+        """
+        self._check_closed()
+        await self.open()
+
+        end = self._size if size is None or size < 0 else min(self._position + size, self._size)
+        if end <= self._position:
+            return b''
+
+        data = await self._read_range(self._position, end)
+        self._position = end
+        return data
+
+    async def readinto(self, buffer: Union[bytearray, memoryview]) -> int:
+        data = await self.read(len(buffer))
+        memoryview(buffer).cast('B')[:len(data)] = data
+        return len(data)
+
+    def _check_closed(self) -> None:
+        if self._closed:
+            raise ValueError('I/O operation on closed file.')
+
+    async def _read_range(self, start: int, end: int) -> bytes:
+        first_block = start // self._block_size
+        last_block = (end - 1) // self._block_size
+
+        self._update_read_ahead(first_block, last_block)
+
+        blocks = await asyncio.gather(*[self._get_block(index) for index in range(first_block, last_block + 1)])
+
+        if len(blocks) == 1:
+            offset = start - first_block * self._block_size
+            return blocks[0][offset:offset + end - start]
+
+        views = [memoryview(block) for block in blocks]
+        views[0] = views[0][start - first_block * self._block_size:]
+        views[-1] = views[-1][:end - last_block * self._block_size]
+        return b''.join(views)
+
+    def _update_read_ahead(self, first_block: int, last_block: int) -> None:
+        if self._last_block is not None and first_block in (self._last_block, self._last_block + 1):
+            self._sequential_reads += 1
+        else:
+            self._sequential_reads = 0
+        self._last_block = last_block
+
+        # Two sequential reads in a row before prefetching, so one-off adjacent reads don't trigger it
+        if self._read_ahead <= 0 or self._sequential_reads < 2:
+            return
+
+        num_blocks = (self._size + self._block_size - 1) // self._block_size
+        # Don't prefetch more than the cache could hold alongside what's being read
+        read_ahead = min(self._read_ahead, self._max_blocks - (last_block - first_block + 1))
+        for index in range(last_block + 1, min(last_block + 1 + read_ahead, num_blocks)):
+            if index not in self._blocks and index not in self._fetches:
+                task = asyncio.ensure_future(self._get_block(index))
+                self._prefetches.add(task)
+                task.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, task: asyncio.Future) -> None:
+        self._prefetches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # It'll be fetched again if it's actually read
+            logger.debug(f'Failed to prefetch block of {self._bucket}/{self._key}: {task.exception()}')
+
+    async def _get_block(self, index: int) -> bytes:
+        block = self._blocks.get(index)
+        if block is not None:
+            self._blocks.move_to_end(index)
+            return block
+
+        future = self._fetches.get(index)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_block(index))
+            self._fetches[index] = future
+            future.add_done_callback(lambda _: self._fetches.pop(index, None))
+        # Shielded as other reads or prefetches may be waiting on the same block
+        return await asyncio.shield(future)
+
+    async def _fetch_block(self, index: int) -> bytes:
+        start = index * self._block_size
+        end = min(start + self._block_size, self._size) - 1
+
+        async def get_range() -> bytes:
+            # Per attempt, so retries waiting to go again don't hold up other blocks
+            async with self._request_semaphore:
+                response = await self._client.get_object(
+                    Bucket=self._bucket, Key=self._key, Range=f'bytes={start}-{end}', **{'IfMatch': self._etag, **self._extra_args}
+                )
+                return await response['Body'].read()
+
+        block = await call_with_retries(get_range, self._config.num_download_attempts)
+
+        self._blocks[index] = block
+        self._blocks.move_to_end(index)
+        while len(self._blocks) > self._max_blocks:
+            self._blocks.popitem(last=False)
+        return block
@@ -0,0 +1,300 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+
+from boto3.s3.transfer import S3TransferConfig
+
+from aioboto3.utils import run_concurrently
+
+logger = logging.getLogger(__name__)
+
+# Name of the manifest file kept in the synced directory, unless another path is given
+DEFAULT_MANIFEST_NAME = '.aioboto3-sync.json'
+MANIFEST_VERSION = 1
+DELETE_BATCH_SIZE = 1000
+
+# Relative path -> (size, mtime in nanoseconds)
+LocalFiles = Dict[str, Tuple[int, int]]
+# Transfer one file, sharing a semaphore of request slots with the others, and return the object's ETag.
+# Upload takes (path, key, semaphore), download (key, path, semaphore)
+TransferFunc = Callable[[str, str, asyncio.Semaphore], Awaitable[str]]
+
+
+class SyncManifest(object):
+    """
+    What a directory and prefix looked like when they were last synced, stored as a JSON file.
+
+    Each entry maps a file's path relative to the directory to its size, mtime and the ETag of
+    the object it was synced with. If a file's size and mtime still match its entry, it hasn't
+    changed since the last sync, so doesn't need hashing or comparing with S3.
+    """
+    def __init__(self, path: str, bucket: str, prefix: str, direction: str):
+        self.path = path
+        self.bucket = bucket
+        self.prefix = prefix
+        self.direction = direction
+        # Whether entries were loaded from an earlier sync of the same bucket, prefix and direction
+        self.loaded = False
+        self.files: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as manifest_file:
+                data = json.load(manifest_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as err:
+            logger.warning(f'Ignoring unreadable sync manifest {self.path}: {err}')
+            return
+
+        if data.get('version') != MANIFEST_VERSION or \
+                (data.get('bucket'), data.get('prefix'), data.get('direction')) != (self.bucket, self.prefix, self.direction):
+            logger.debug(f'Sync manifest {self.path} is for a different sync, ignoring it')
+            return
+        self.files = data['files']
+        self.loaded = True
+
+    def save(self) -> None:
+        data = {
+            'version': MANIFEST_VERSION, 'bucket': self.bucket, 'prefix': self.prefix, 'direction': self.direction,
+            'files': self.files,
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as manifest_file:
+            json.dump(data, manifest_file)
+        os.replace(tmp_path, self.path)
+
+    def unchanged(self, rel_path: str, size: int, mtime_ns: int) -> bool:
+        entry = self.files.get(rel_path)
+        return entry is not None and entry['size'] == size and entry['mtime_ns'] == mtime_ns
+
+    def record(self, rel_path: str, size: int, mtime_ns: int, etag: str) -> None:
+        self.files[rel_path] = {'size': size, 'mtime_ns': mtime_ns, 'etag': etag}
+
+
+def _walk(directory: str, exclude: str) -> LocalFiles:
+    files: LocalFiles = {}
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if path == exclude or path.startswith(exclude + '.'):
+                continue
+            stat = os.stat(path)
+            files[os.path.relpath(path, directory).replace(os.sep, '/')] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def _safe_rel_path(rel_path: str) -> bool:
+    """
+    Whether a key, minus the prefix, can be written under the directory without escaping it.
+    """
+    return all(part not in ('', '.', '..') for part in rel_path.split('/'))
+
+
+def _mtime(last_modified: datetime.datetime) -> int:
+    return int(last_modified.timestamp() * 1e9)
+
+
+def _bucket_args(extra_args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The ExtraArgs which also apply to listing and head_object.
+    """
+    return {arg: value for arg, value in extra_args.items() if arg in ('RequestPayer', 'ExpectedBucketOwner')}
+
+
+async def _run(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+async def _list_objects(client, bucket: str, prefix: str, extra_args: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    objects = {}
+    paginator = client.get_paginator('list_objects_v2')
+    async for page in paginator.paginate(Bucket=bucket, Prefix=prefix, **extra_args):
+        for obj in page.get('Contents', []):
+            rel_path = obj['Key'][len(prefix):]
+            if obj['Key'].endswith('/'):
+                # Folder markers
+                continue
+            if not _safe_rel_path(rel_path):
+                logger.warning(f"Skipping {bucket}/{obj['Key']}, it can't be synced to a file")
+                continue
+            objects[rel_path] = obj
+    return objects
+
+
+async def sync_upload(
+    client,
+    upload: TransferFunc,
+    directory: str,
+    bucket: str,
+    prefix: str = '',
+    manifest_path: Optional[str] = None,
+    delete: bool = False,
+    full_scan: bool = False,
+    extra_args: Optional[Dict[str, Any]] = None,
+    config: Optional[S3TransferConfig] = None,
+    concurrency: int = 10
+) -> Dict[str, int]:
+    """
+    Upload the files in a directory which have changed since the last sync.
+
+    Without a manifest from an earlier sync, or if ``full_scan``, the prefix is listed and files
+    whose object has the same size and is newer are taken to be in sync. After that, only files
+    whose size or mtime differ from the manifest are uploaded, without listing or hashing
+    anything. Changes made to the prefix by anything else are only noticed by a full scan.
+
+    Files are uploaded with ``upload``, ``concurrency`` at a time, sharing one semaphore of
+    ``config.max_request_concurrency`` request slots between them.
+
+    :return: Dict of the number of files transferred, deleted and unchanged
+    """
+    extra_args = extra_args or {}
+    config = config or S3TransferConfig()
+    request_semaphore = asyncio.Semaphore(config.max_request_concurrency)
+    manifest_path = manifest_path or os.path.join(directory, DEFAULT_MANIFEST_NAME)
+    manifest = SyncManifest(manifest_path, bucket, prefix, 'upload')
+    await _run(manifest.load)
+
+    local_files = await _run(_walk, directory, manifest_path)
+    remote_objects = None
+    if full_scan or not manifest.loaded:
+        remote_objects = await _list_objects(client, bucket, prefix, _bucket_args(extra_args))
+
+    counts = {'transferred': 0, 'deleted': 0, 'unchanged': 0}
+    to_upload: List[str] = []
+    for rel_path, (size, mtime_ns) in local_files.items():
+        if remote_objects is None:
+            if manifest.unchanged(rel_path, size, mtime_ns):
+                counts['unchanged'] += 1
+                continue
+        else:
+            obj = remote_objects.get(rel_path)
+            entry = manifest.files.get(rel_path)
+            if obj is not None and entry is not None and entry['etag'] == obj['ETag'] and manifest.unchanged(rel_path, size, mtime_ns):
+                counts['unchanged'] += 1
+                continue
+            if obj is not None and obj['Size'] == size and _mtime(obj['LastModified']) >= mtime_ns:
+                manifest.record(rel_path, size, mtime_ns, obj['ETag'])
+                counts['unchanged'] += 1
+                continue
+        to_upload.append(rel_path)
+
+    if remote_objects is None:
+        stale = [rel_path for rel_path in manifest.files if rel_path not in local_files]
+    else:
+        stale = sorted(rel_path for rel_path in set(manifest.files) | set(remote_objects) if rel_path not in local_files)
+
+    async def upload_file(rel_path: str) -> None:
+        size, mtime_ns = local_files[rel_path]
+        key = prefix + rel_path
+        etag = await upload(os.path.join(directory, *rel_path.split('/')), key, request_semaphore)
+        manifest.record(rel_path, size, mtime_ns, etag)
+        counts['transferred'] += 1
+
+    try:
+        await run_concurrently(to_upload, upload_file, concurrency)
+
+        for rel_path in stale:
+            manifest.files.pop(rel_path, None)
+        if delete and stale:
+            for index in range(0, len(stale), DELETE_BATCH_SIZE):
+                batch = stale[index:index + DELETE_BATCH_SIZE]
+                response = await client.delete_objects(
+                    Bucket=bucket, Delete={'Objects': [{'Key': prefix + rel_path} for rel_path in batch], 'Quiet': True},
+                    **_bucket_args(extra_args)
+                )
+                if response.get('Errors'):
+                    error = response['Errors'][0]
+                    raise RuntimeError(f"Failed to delete {len(response['Errors'])} objects, e.g. {error['Key']}: {error['Message']}")
+                counts['deleted'] += len(batch)
+    finally:
+        # Even after a failure, so what did get uploaded isn't uploaded again
+        await _run(manifest.save)
+
+    return counts
+
+
+async def sync_download(
+    client,
+    download: TransferFunc,
+    bucket: str,
+    prefix: str,
+    directory: str,
+    manifest_path: Optional[str] = None,
+    delete: bool = False,
+    extra_args: Optional[Dict[str, Any]] = None,
+    config: Optional[S3TransferConfig] = None,
+    concurrency: int = 10
+) -> Dict[str, int]:
+    """
+    Download the objects under a prefix which have changed since the last sync.
+
+    The prefix is listed, and objects are downloaded unless the manifest has the same ETag for
+    them and the local file's size and mtime still match the manifest. Without a manifest from
+    an earlier sync, files of the same size which are newer than their object are taken to be in
+    sync.
+
+    Objects are downloaded with ``download``, ``concurrency`` at a time, sharing one semaphore of
+    ``config.max_request_concurrency`` request slots between them.
+
+    :return: Dict of the number of files transferred, deleted and unchanged
+    """
+    extra_args = extra_args or {}
+    config = config or S3TransferConfig()
+    request_semaphore = asyncio.Semaphore(config.max_request_concurrency)
+    manifest_path = manifest_path or os.path.join(directory, DEFAULT_MANIFEST_NAME)
+    manifest = SyncManifest(manifest_path, bucket, prefix, 'download')
+    await _run(os.makedirs, directory, 0o777, True)
+    await _run(manifest.load)
+
+    local_files, remote_objects = await asyncio.gather(
+        _run(_walk, directory, manifest_path),
+        _list_objects(client, bucket, prefix, _bucket_args(extra_args))
+    )
+
+    counts = {'transferred': 0, 'deleted': 0, 'unchanged': 0}
+    to_download: List[str] = []
+    for rel_path, obj in remote_objects.items():
+        local = local_files.get(rel_path)
+        if local is not None:
+            size, mtime_ns = local
+            if manifest.loaded:
+                entry = manifest.files.get(rel_path)
+                if entry is not None and entry['etag'] == obj['ETag'] and manifest.unchanged(rel_path, size, mtime_ns):
+                    counts['unchanged'] += 1
+                    continue
+            elif size == obj['Size'] and mtime_ns >= _mtime(obj['LastModified']):
+                manifest.record(rel_path, size, mtime_ns, obj['ETag'])
+                counts['unchanged'] += 1
+                continue
+        to_download.append(rel_path)
+
+    stale = [rel_path for rel_path in local_files if rel_path not in remote_objects]
+
+    async def download_file(rel_path: str) -> None:
+        obj = remote_objects[rel_path]
+        path = os.path.join(directory, *rel_path.split('/'))
+        await _run(os.makedirs, os.path.dirname(path), 0o777, True)
+        # The object may have changed since it was listed, so record the version actually downloaded
+        etag = await download(obj['Key'], path, request_semaphore)
+        stat = await _run(os.stat, path)
+        manifest.record(rel_path, stat.st_size, stat.st_mtime_ns, etag)
+        counts['transferred'] += 1
+
+    try:
+        await run_concurrently(to_download, download_file, concurrency)
+
+        for rel_path in stale:
+            manifest.files.pop(rel_path, None)
+            if delete:
+                await _run(os.remove, os.path.join(directory, *rel_path.split('/')))
+                counts['deleted'] += 1
+    finally:
+        # Even after a failure, so what did get downloaded isn't downloaded again
+        await _run(manifest.save)
+
+    return counts
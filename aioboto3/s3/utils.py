@@ -0,0 +1,121 @@
+import asyncio
+import random
+from typing import Dict, Optional, Union, Callable, Awaitable, TypeVar
+
+from botocore.exceptions import ClientError, HTTPClientError, ConnectionError, IncompleteReadError, ResponseStreamingError
+
+try:
+    # Private, so might move in a future botocore. Without it botocore just calculates checksums itself
+    from botocore.httpchecksum import _CHECKSUM_CLS
+except ImportError:  # pragma: no cover
+    _CHECKSUM_CLS = {}
+
+T = TypeVar('T')
+
+# Mirrors what botocore's standard retry mode considers transient or throttling
+RETRYABLE_ERROR_CODES = {
+    'RequestTimeout', 'RequestTimeoutException', 'PriorRequestNotComplete', 'InternalError',
+    'ServiceUnavailable', 'Throttling', 'ThrottlingException', 'RequestThrottled', 'SlowDown',
+    'RequestLimitExceeded', 'BandwidthLimitExceeded', 'TooManyRequestsException',
+}
+RETRYABLE_EXCEPTIONS = (HTTPClientError, ConnectionError, IncompleteReadError, ResponseStreamingError)
+
+
+def checksum_param_name(algorithm: str) -> str:
+    """
+    Get the request/response parameter name that holds a given checksum, e.g. CRC32 -> ChecksumCRC32
+    """
+    return 'Checksum' + algorithm.upper()
+
+
+def start_after(key: str) -> str:
+    """
+    The StartAfter for a listing to begin at key itself, as StartAfter is exclusive.
+
+    S3 lists in UTF-8 byte order, which for str is code point order. Decrementing the last
+    character and appending the highest code point gives a string just below key, so at most a
+    few keys sort between the two, whereas decrementing alone would go back to the start of
+    everything sharing that last character.
+    """
+    if not key:
+        return key
+    if key[-1] == '\0':
+        return key[:-1]
+    last = ord(key[-1]) - 1
+    if 0xD800 <= last <= 0xDFFF:
+        # Surrogates can't be encoded as UTF-8, skip below them
+        last = 0xD7FF
+    return key[:-1] + chr(last) + '\U0010FFFF'
+
+
+def compute_checksum(algorithm: str, body: Union[bytes, bytearray, memoryview]) -> Optional[Dict[str, str]]:
+    """
+    Calculate the flexible checksum of a request body.
+
+    This is CPU bound so is intended to be run inside an executor. Returns None if botocore has no
+    implementation for the algorithm (e.g. CRC32C without awscrt), or its implementations can't be
+    found, in which case botocore should be left to deal with it as it normally would.
+
+    :param algorithm: Checksum algorithm, as passed via the ChecksumAlgorithm parameter
+    :param body: Part body
+    :return: Dict of the checksum parameter to the base64 encoded digest
+    """
+    checksum_cls = _CHECKSUM_CLS.get(algorithm.lower())
+    if checksum_cls is None:
+        return None
+
+    checksum = checksum_cls()
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        checksum.update(body)
+        digest = checksum.b64digest()
+    else:
+        digest = checksum.handle(body)
+
+    return {checksum_param_name(algorithm): digest}
+
+
+def schedule_checksum(algorithm: Optional[str], body) -> Optional[asyncio.Future]:
+    """
+    Start calculating a body's checksum in the default executor so it can overlap with other network IO.
+
+    The resulting future resolves to a dict of extra upload_part kwargs, or None if there's nothing to add.
+    """
+    if not algorithm:
+        return None
+
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(None, compute_checksum, algorithm, body)
+
+
+def is_retryable_error(err: BaseException) -> bool:
+    """
+    Whether an error from an S3 call is likely to go away if the call is retried.
+    """
+    if isinstance(err, ClientError):
+        if err.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES:
+            return True
+        return err.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500
+    return isinstance(err, RETRYABLE_EXCEPTIONS)
+
+
+async def call_with_retries(func: Callable[[], Awaitable[T]], attempts: int, base_delay: float = 0.1, max_delay: float = 20.0) -> T:
+    """
+    Await func(), retrying with jittered exponential backoff if it raises a retryable error.
+
+    This sits on top of botocore's own retries, so is for when those have been exhausted, e.g. one
+    part of a large transfer hitting a run of 503s shouldn't fail the whole transfer.
+
+    :param func: Function returning a new awaitable on each call
+    :param attempts: Maximum number of times to call func
+    :return: Result of func()
+    """
+    attempt = 1
+    while True:
+        try:
+            return await func()
+        except Exception as err:
+            if attempt >= max(attempts, 1) or not is_retryable_error(err):
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            attempt += 1
@@ -0,0 +1,288 @@
+import asyncio
+import inspect
+import logging
+from typing import Optional, Callable, Dict, Any, List, Set, Union
+
+from boto3.s3.transfer import S3TransferConfig
+from s3transfer.upload import UploadSubmissionTask
+
+from aioboto3.s3.utils import schedule_checksum
+
+logger = logging.getLogger(__name__)
+
+
+class S3Writer(object):
+    """
+    Async writable file-like object which streams everything written to it into an S3 object.
+
+    Writes are buffered up until there's enough data for a part, at which point the part is uploaded
+    in the background whilst more data can be written. Once ``Config.max_request_concurrency`` parts
+    are in flight, ``write`` will wait for one of them to finish so memory usage stays bounded to
+    roughly ``(max_request_concurrency + 1) * multipart_chunksize``.
+
+    If less than ``Config.multipart_threshold`` bytes are written in total, the object is uploaded
+    with a single ``put_object`` call on close.
+
+    Usage::
+
+        async with s3.open_writer('mybucket', 'mykey') as writer:
+            async for record in records():
+                await writer.write(record)
+
+    Exceptions from background uploads are raised on the next ``write`` or ``close``. Exiting the
+    context manager with an exception, or calling ``abort``, aborts the multipart upload. Once
+    closed, ``etag`` is the uploaded object's ETag.
+
+    Every request takes a slot of ``RequestSemaphore``, by default one of
+    ``Config.max_request_concurrency`` slots, and a part holds its slot until it's uploaded. Pass
+    the same semaphore to several writers to bound their requests, and memory, together.
+    """
+    def __init__(
+        self,
+        client,
+        Bucket: str,
+        Key: str,
+        ExtraArgs: Optional[Dict[str, Any]] = None,
+        Callback: Optional[Callable[[int], None]] = None,
+        Config: Optional[S3TransferConfig] = None,
+        RequestSemaphore: Optional[asyncio.Semaphore] = None
+    ):
+        self._client = client
+        self._bucket = Bucket
+        self._key = Key
+        self._extra_args = ExtraArgs or {}
+        self._callback = Callback
+        self._config = Config or S3TransferConfig()
+
+        self._upload_part_args = {k: v for k, v in self._extra_args.items() if k in UploadSubmissionTask.UPLOAD_PART_ARGS}
+        self._complete_upload_args = {k: v for k, v in self._extra_args.items() if k in UploadSubmissionTask.COMPLETE_MULTIPART_ARGS}
+        self._checksum_algorithm = self._extra_args.get('ChecksumAlgorithm')
+
+        self._buffer = bytearray()
+        self._part_number = 0
+        self._finished_parts: List[Dict[str, Any]] = []
+        self._upload_id_task: Optional[asyncio.Task] = None
+        self._part_tasks: Set[asyncio.Task] = set()
+        self._request_semaphore = RequestSemaphore or asyncio.Semaphore(self._config.max_request_concurrency)
+        self._exception: Optional[BaseException] = None
+        self._closed = False
+        self.etag: Optional[str] = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def writable(self) -> bool:
+        return True
+
+    async def __aenter__(self) -> 'S3Writer':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.abort()
+
+    async def write(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        """
+        Buffer some data, uploading a part if there's enough buffered. Will wait if there are too
+        many parts being uploaded.
+
+        :param data: Bytes-like object
+        :return: Number of bytes written
+        """
+        if self._closed:
+            raise ValueError('I/O operation on closed file.')
+        self._raise_for_exception()
+
+        self._buffer += data
+
+        # Hold the first part back until we're over the multipart threshold, else we might just need a put_object
+        chunksize = self._config.multipart_chunksize
+        if self._part_number == 0:
+            chunksize = max(chunksize, self._config.multipart_threshold)
+
+        while len(self._buffer) >= chunksize:
+            if len(self._buffer) < 2 * chunksize:
+                # Hand over the whole buffer rather than copying out of it
+                body = self._buffer
+                self._buffer = bytearray()
+            else:
+                # Large write, split it up so the parts can be uploaded concurrently
+                body = self._buffer[:chunksize]
+                del self._buffer[:chunksize]
+            await self._submit_part(body)
+            chunksize = self._config.multipart_chunksize
+
+        return len(data)
+
+    async def write_part(self, body) -> None:
+        """
+        Upload body as the next part as it is, rather than buffering it. Will wait if there are
+        too many parts being uploaded.
+
+        For callers which already have part sized chunks, e.g. segments of a file. body can be
+        anything upload_part accepts as long as it has a length, and every part but the last must
+        be at least 5 MiB. Can't be mixed with ``write``.
+
+        :param body: Part body
+        """
+        if self._closed:
+            raise ValueError('I/O operation on closed file.')
+        if self._buffer:
+            raise ValueError('write_part() cannot follow buffered write() calls')
+        self._raise_for_exception()
+
+        await self._submit_part(body)
+
+    async def close(self) -> None:
+        """
+        Upload any remaining data and wait for all parts to finish, then complete the upload.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            if self._part_number == 0:
+                await self._put_object()
+                return
+
+            if self._buffer:
+                body = self._buffer
+                self._buffer = bytearray()
+                await self._submit_part(body)
+
+            if self._part_tasks:
+                await asyncio.wait(self._part_tasks)
+            self._raise_for_exception()
+
+            # Sort the finished parts as they must be in order
+            self._finished_parts.sort(key=lambda item: item['PartNumber'])
+            async with self._request_semaphore:
+                resp = await self._client.complete_multipart_upload(
+                    Bucket=self._bucket,
+                    Key=self._key,
+                    UploadId=self._upload_id_task.result(),
+                    MultipartUpload={'Parts': self._finished_parts},
+                    **self._complete_upload_args
+                )
+            self.etag = resp.get('ETag')
+        except BaseException:
+            await self._abort()
+            raise
+
+    async def abort(self) -> None:
+        """
+        Stop uploading and abort the multipart upload, nothing will be written to S3.
+        """
+        self._closed = True
+        await self._abort()
+
+    async def _abort(self) -> None:
+        self._buffer = bytearray()
+
+        for task in self._part_tasks:
+            task.cancel()
+        if self._part_tasks:
+            await asyncio.gather(*self._part_tasks, return_exceptions=True)
+
+        if self._upload_id_task is None:
+            return
+        if not self._upload_id_task.done():
+            self._upload_id_task.cancel()
+        upload_id_task = self._upload_id_task
+        self._upload_id_task = None
+        try:
+            upload_id = await upload_id_task
+        except BaseException:
+            # Failed to create the multipart upload, so nothing to abort
+            return
+
+        try:
+            async with self._request_semaphore:
+                await self._client.abort_multipart_upload(Bucket=self._bucket, Key=self._key, UploadId=upload_id)
+        except Exception as err:
+            logger.warning(f'Failed to abort multipart upload {upload_id} to {self._bucket}/{self._key}: {err}')
+
+    def _raise_for_exception(self) -> None:
+        if self._exception is not None:
+            raise self._exception
+
+    async def _put_object(self) -> None:
+        body = self._buffer
+        self._buffer = bytearray()
+        async with self._request_semaphore:
+            resp = await self._client.put_object(Bucket=self._bucket, Key=self._key, Body=body, **self._extra_args)
+        self.etag = resp.get('ETag')
+        await self._call_callback(len(body))
+
+    async def _submit_part(self, body) -> None:
+        """
+        Start uploading a part in the background, waiting for a free slot first.
+
+        body can be anything upload_part accepts, as long as it has a length.
+        """
+        if self._upload_id_task is None:
+            # Other parts can be read and checksummed whilst waiting for the UploadId. It takes its
+            # slot first, as parts hold theirs whilst waiting for it
+            await self._request_semaphore.acquire()
+            self._upload_id_task = asyncio.ensure_future(self._create_multipart_upload())
+            self._upload_id_task.add_done_callback(lambda _: self._request_semaphore.release())
+
+        await self._request_semaphore.acquire()
+        if self._exception is not None:
+            self._request_semaphore.release()
+            raise self._exception
+
+        self._part_number += 1
+        task = asyncio.ensure_future(self._upload_part(self._part_number, body))
+        self._part_tasks.add(task)
+        task.add_done_callback(self._part_tasks.discard)
+        # Released however the task ends, even if it's cancelled before it starts running
+        task.add_done_callback(lambda _: self._request_semaphore.release())
+
+    async def _create_multipart_upload(self) -> str:
+        resp = await self._client.create_multipart_upload(Bucket=self._bucket, Key=self._key, **self._extra_args)
+        return resp['UploadId']
+
+    async def _upload_part(self, part_number: int, body) -> None:
+        try:
+            checksum_future = schedule_checksum(self._checksum_algorithm, body)
+            upload_id = await self._upload_id_task
+
+            part_args = {'Body': body, 'Bucket': self._bucket, 'Key': self._key,
+                         'PartNumber': part_number, 'UploadId': upload_id, **self._upload_part_args}
+            if checksum_future is not None:
+                checksum_args = await checksum_future
+                if checksum_args:
+                    part_args.update(checksum_args)
+
+            resp = await self._client.upload_part(**part_args)
+
+            finished_part = {'ETag': resp['ETag'], 'PartNumber': part_number}
+            if self._checksum_algorithm:
+                for key in resp:
+                    if key.startswith('Checksum'):
+                        finished_part[key] = resp[key]
+            self._finished_parts.append(finished_part)
+            logger.debug(f'Uploaded part {part_number} to S3')
+
+            await self._call_callback(len(body))
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            if self._exception is None:
+                self._exception = err
+
+    async def _call_callback(self, num_bytes: int) -> None:
+        # Call the callback, if it blocks then not good :/
+        if self._callback:
+            try:
+                if inspect.iscoroutinefunction(self._callback):
+                    await self._callback(num_bytes)
+                else:
+                    self._callback(num_bytes)
+            except:  # noqa: E722
+                pass
@@ -17,6 +17,7 @@ from aiobotocore.config import AioConfig
 from botocore.exceptions import NoCredentialsError
 
 from aioboto3.resources.factory import AIOBoto3ResourceFactory
+from aioboto3.s3.bucket_index import BucketIndex
 
 
 class Session(boto3.session.Session):
@@ -93,6 +94,8 @@ class Session(boto3.session.Session):
         self.resource_factory = AIOBoto3ResourceFactory(
             self._session.get_component('event_emitter')
         )
+        # Shared by all S3 Bucket resources created from this session
+        self.bucket_index = BucketIndex()
         self._setup_loader()
         self._register_default_handlers()
 
@@ -177,7 +180,10 @@ class Session(boto3.session.Session):
         )
         self._session.register(
             'creating-resource-class.s3.Bucket',
-            boto3.utils.lazy_call('aioboto3.s3.inject.inject_bucket_methods'),
+            boto3.utils.lazy_call(
+                'aioboto3.s3.inject.inject_bucket_methods',
+                bucket_index=self.bucket_index
+            ),
         )
         self._session.register(
             'creating-resource-class.s3.Object',
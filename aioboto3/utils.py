@@ -0,0 +1,87 @@
+import asyncio
+from typing import Union, Callable, Awaitable, Iterable, AsyncIterable, TypeVar
+
+T = TypeVar('T')
+
+
+async def run_concurrently(items: Union[Iterable[T], AsyncIterable[T]], func: Callable[[T], Awaitable[None]], concurrency: int) -> None:
+    """
+    Call func on every item with at most `concurrency` calls in flight.
+
+    Unlike gathering a coroutine per item, only `concurrency` tasks ever exist and items are pulled
+    from the (async) iterable lazily, so it's fine to use with huge or unbounded inputs. If any call
+    raises, the remaining workers are cancelled and the exception is raised.
+    """
+    if hasattr(items, '__aiter__'):
+        iterator = items.__aiter__()
+    else:
+        iterator = iter(items)
+    # Async generators can't be advanced by multiple coroutines at once
+    iterator_lock = asyncio.Lock()
+    exhausted = False
+
+    async def next_item():
+        nonlocal exhausted
+        async with iterator_lock:
+            if exhausted:
+                raise StopAsyncIteration
+            try:
+                if hasattr(iterator, '__anext__'):
+                    return await iterator.__anext__()
+                return next(iterator)
+            except (StopIteration, StopAsyncIteration):
+                exhausted = True
+                raise StopAsyncIteration
+
+    async def worker():
+        while True:
+            try:
+                item = await next_item()
+            except StopAsyncIteration:
+                return
+            await func(item)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(concurrency, 1))]
+    try:
+        done, pending = await asyncio.wait(workers, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in workers:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def prefetch(items: AsyncIterable[T], size: int) -> AsyncIterable[T]:
+    """
+    Iterate over an async iterable whilst a background task reads up to `size` items ahead.
+
+    Useful for overlapping paginated listings with processing the results, so the next page is
+    being fetched whilst the current one is worked through.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(size, 1))
+    done = object()
+
+    async def producer():
+        try:
+            async for item in items:
+                await queue.put((item, None))
+            await queue.put((done, None))
+        except Exception as err:
+            await queue.put((done, err))
+
+    task = asyncio.ensure_future(producer())
+    try:
+        while True:
+            item, err = await queue.get()
+            if err is not None:
+                raise err
+            if item is done:
+                return
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -1,12 +1,27 @@
 import asyncio
+import base64
+import io
+import json
 import os
+import zlib
 import datetime
 import tempfile
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import AsyncMock
 
 from botocore.exceptions import ClientError
 from boto3.s3.transfer import S3TransferConfig
+from s3transfer.utils import ChunksizeAdjuster
+from aioboto3.resources.collection import load_resources
+from aioboto3.s3.index import ListingIndex
+from aioboto3.s3.hedging import HedgingPolicy, MIN_LATENCY_SAMPLES
+from aioboto3.s3.inject import _multipart_layout
+from aioboto3.s3.pipeline import Stage
+from aioboto3.s3.utils import start_after
+from aioboto3.s3.writer import S3Writer
+from aioboto3.session import Session
+from tests.conftest import moto_config
 import aiofiles
 import pytest
 
@@ -93,6 +108,537 @@ async def test_s3_download_fileobj_nonseekable_syncwrite(s3_client, bucket_name,
     assert fh.data == data
 
 
+@pytest.mark.asyncio
+async def test_s3_download_fileobj_splits_straggler(s3_client, bucket_name, region, monkeypatch):
+    data = os.urandom(4 * 1024 * 1024)
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    monkeypatch.setattr('aioboto3.s3.inject.STRAGGLER_MIN_ELAPSED', 0.2)
+    monkeypatch.setattr('aioboto3.s3.inject.STRAGGLER_MIN_SPLIT', 64 * 1024)
+
+    class SlowBody:
+        def __init__(self, body):
+            self._body = body
+
+        async def read(self, amt=None):
+            await asyncio.sleep(0.05)
+            return await self._body.read(min(amt, 8 * 1024))
+
+        def close(self):
+            self._body.close()
+
+    ranges = []
+    get_object = s3_client.get_object
+
+    async def slow_get_object(**kwargs):
+        ranges.append(kwargs['Range'])
+        response = await get_object(**kwargs)
+        # The first part would take over 6 seconds
+        if kwargs['Range'].startswith('bytes=0-'):
+            response['Body'] = SlowBody(response['Body'])
+        return response
+
+    monkeypatch.setattr(s3_client, 'get_object', slow_get_object)
+
+    downloaded = 0
+
+    def callback(total):
+        nonlocal downloaded
+        downloaded = total
+
+    fh = BytesIO()
+    config = S3TransferConfig(multipart_chunksize=1024 * 1024, io_chunksize=64 * 1024, max_request_concurrency=4)
+    await s3_client.download_fileobj(bucket_name, 'test_file', fh, Callback=callback, Config=config)
+
+    assert fh.getvalue() == data
+    assert downloaded == len(data)
+    # The tail of the first part was downloaded separately
+    starts = [int(byte_range[6:].split('-')[0]) for byte_range in ranges]
+    assert any(0 < start < 1024 * 1024 for start in starts)
+
+
+@pytest.mark.asyncio
+async def test_s3_hedging(s3_client, bucket_name, region, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=b'Hello World\n')
+
+    policy = s3_client.enable_hedging(Delay=0.1, BudgetRatio=0, BudgetBurst=1)
+
+    calls = 0
+    get_object = s3_client.get_object
+
+    async def slow_get_object(**kwargs):
+        nonlocal calls
+        calls += 1
+        # Every other request is slow
+        if calls % 2:
+            await asyncio.sleep(1)
+        return await get_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, 'get_object', slow_get_object)
+
+    start = asyncio.get_running_loop().time()
+    fh = BytesIO()
+    await s3_client.download_fileobj(bucket_name, 'test_file', fh)
+    assert fh.getvalue() == b'Hello World\n'
+    assert asyncio.get_running_loop().time() - start < 0.9
+    assert policy.hedges == 1
+    assert policy.hedge_wins == 1
+
+    # Budget's used up, so the next slow request isn't hedged
+    calls = 0
+    response = await s3_client.hedged_get_object(Bucket=bucket_name, Key='test_file')
+    assert await response['Body'].read() == b'Hello World\n'
+    assert calls == 1
+    assert policy.hedges == 1
+
+    response = await s3_client.hedged_head_object(Bucket=bucket_name, Key='test_file')
+    assert response['ContentLength'] == 12
+
+
+@pytest.mark.asyncio
+async def test_s3_hedging_policy_latencies():
+    policy = HedgingPolicy(percentile=50, budget_burst=100)
+
+    async def sleep(seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    # Each operation has its own history
+    for _ in range(MIN_LATENCY_SAMPLES):
+        await policy.call(lambda: sleep(0), operation='head_object')
+    assert policy.hedge_delay('head_object') is not None
+    assert policy.hedge_delay('download') is None
+
+    # Both attempts are recorded, the loser with how long it ran before it was cancelled
+    policy = HedgingPolicy(delay=0.05, budget_burst=100)
+    durations = iter([0.5, 0])
+    assert await policy.call(lambda: sleep(next(durations)), operation='download') == 0
+    assert policy.hedge_wins == 1
+    assert len(policy._latencies['download']) == 2
+    assert min(policy._latencies['download']) < 0.05 <= max(policy._latencies['download'])
+
+
+@pytest.mark.asyncio
+async def test_s3_lookup_objects(s3_client, bucket_name, region, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    for i in range(30):
+        await s3_client.put_object(Bucket=bucket_name, Key=f'dense/{i:03d}', Body=b'x' * i)
+    await s3_client.put_object(Bucket=bucket_name, Key='sparse/a', Body=b'Hello World\n')
+
+    calls = {'ListObjectsV2': 0, 'HeadObject': 0}
+
+    def count_call(model, **kwargs):
+        calls[model.name] += 1
+
+    s3_client.meta.events.register('before-call.s3.ListObjectsV2', count_call)
+    s3_client.meta.events.register('before-call.s3.HeadObject', count_call)
+
+    keys = [f'dense/{i:03d}' for i in range(0, 40, 2)] + ['sparse/a', 'sparse/b']
+    found = await s3_client.lookup_objects(bucket_name, keys)
+
+    assert set(found) == set(keys)
+    assert [key for key, obj in found.items() if obj is None] == ['dense/030', 'dense/032', 'dense/034', 'dense/036', 'dense/038', 'sparse/b']
+    assert found['dense/010']['Size'] == 10
+    assert found['sparse/a']['Size'] == 12
+    assert calls == {'ListObjectsV2': 1, 'HeadObject': 2}
+
+    # Pages which don't resolve many keys give up on listing
+    monkeypatch.setattr('aioboto3.s3.lookup.LIST_PAGE_SIZE', 2)
+    calls = {'ListObjectsV2': 0, 'HeadObject': 0}
+    keys = ['dense/000', 'dense/010', 'dense/020', 'dense/029']
+    found = await s3_client.lookup_objects(bucket_name, keys)
+    assert all(found[key] is not None for key in keys)
+    assert calls == {'ListObjectsV2': 1, 'HeadObject': 3}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('ordered', [False, True])
+async def test_s3_get_objects(s3_client, bucket_name, region, ordered, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    keys = [f'file{i:02d}' for i in range(20)]
+    for i, key in enumerate(keys):
+        await s3_client.put_object(Bucket=bucket_name, Key=key, Body=bytes([i]) * 1000)
+
+    in_flight = 0
+    max_in_flight = 0
+    get_object = s3_client.get_object
+
+    async def counting_get_object(**kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            return await get_object(**kwargs)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(s3_client, 'get_object', counting_get_object)
+
+    results = []
+    # Only room for two objects at a time
+    async for key, body in s3_client.get_objects(bucket_name, keys, Concurrency=5, MaxBufferSize=2000, Ordered=ordered):
+        results.append((key, body))
+        await asyncio.sleep(0.01)
+
+    if ordered:
+        assert [key for key, _ in results] == keys
+    assert sorted(results) == [(key, bytes([i]) * 1000) for i, key in enumerate(keys)]
+    assert 1 < max_in_flight <= 5
+
+    # Stopping early cancels what's left
+    async for key, body in s3_client.get_objects(bucket_name, keys, Ordered=ordered):
+        break
+
+    # Missing keys are yielded as errors rather than ending the iteration
+    with_missing = keys[:5] + ['missing'] + keys[5:10]
+    results = [item async for item in s3_client.get_objects(bucket_name, with_missing, Ordered=ordered, ReturnExceptions=True)]
+    if ordered:
+        assert [key for key, _ in results] == with_missing
+    errors = {key: body for key, body in results if isinstance(body, Exception)}
+    assert list(errors) == ['missing']
+    assert isinstance(errors['missing'], ClientError)
+    assert len(results) == 11
+
+    with pytest.raises(ClientError):
+        async for key, body in s3_client.get_objects(bucket_name, with_missing, Ordered=ordered):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_s3_get_objects_ordered_error_with_full_budget(s3_client, bucket_name, region, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='k1', Body=b'1' * 1000)
+    await s3_client.put_object(Bucket=bucket_name, Key='k2', Body=b'2' * 1000)
+
+    # k2 fills the budget, then k1 waits for its turn to go over it, then k0 fails
+    delays = {'k0': 0.2, 'k1': 0.05, 'k2': 0}
+    get_object = s3_client.get_object
+
+    async def delayed_get_object(**kwargs):
+        await asyncio.sleep(delays[kwargs['Key']])
+        return await get_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, 'get_object', delayed_get_object)
+
+    async def get_all():
+        return [
+            item async for item in s3_client.get_objects(bucket_name, ['k0', 'k1', 'k2'], MaxBufferSize=1000, Ordered=True,
+                                                         ReturnExceptions=True)
+        ]
+
+    results = await asyncio.wait_for(get_all(), 5)
+    assert [key for key, _ in results] == ['k0', 'k1', 'k2']
+    assert isinstance(results[0][1], ClientError)
+    assert results[1][1] == b'1' * 1000
+
+
+@pytest.mark.asyncio
+async def test_s3_sync(s3_client, bucket_name, region, tmp_path):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    source = tmp_path / 'source'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'a.txt').write_bytes(b'Hello World\n')
+    (source / 'sub' / 'b.txt').write_bytes(b'Goodbye World\n')
+
+    list_calls = []
+    s3_client.meta.events.register('before-call.s3.ListObjectsV2', lambda **kwargs: list_calls.append(1))
+
+    counts = await s3_client.sync_upload(str(source), bucket_name, 'sync/')
+    assert counts == {'transferred': 2, 'deleted': 0, 'unchanged': 0}
+
+    # Nothing's changed, and the manifest means there's no need to list
+    list_calls.clear()
+    counts = await s3_client.sync_upload(str(source), bucket_name, 'sync/')
+    assert counts == {'transferred': 0, 'deleted': 0, 'unchanged': 2}
+    assert not list_calls
+
+    (source / 'a.txt').write_bytes(b'Hello Again\n')
+    os.utime(source / 'a.txt', ns=(0, 1000000000))
+    (source / 'sub' / 'b.txt').unlink()
+    counts = await s3_client.sync_upload(str(source), bucket_name, 'sync/', Delete=True)
+    assert counts == {'transferred': 1, 'deleted': 1, 'unchanged': 0}
+    resp = await s3_client.list_objects_v2(Bucket=bucket_name, Prefix='sync/')
+    assert [obj['Key'] for obj in resp['Contents']] == ['sync/a.txt']
+
+    destination = tmp_path / 'destination'
+    counts = await s3_client.sync_download(bucket_name, 'sync/', str(destination))
+    assert counts == {'transferred': 1, 'deleted': 0, 'unchanged': 0}
+    assert (destination / 'a.txt').read_bytes() == b'Hello Again\n'
+
+    counts = await s3_client.sync_download(bucket_name, 'sync/', str(destination))
+    assert counts == {'transferred': 0, 'deleted': 0, 'unchanged': 1}
+
+    await s3_client.put_object(Bucket=bucket_name, Key='sync/c/d.txt', Body=b'New\n')
+    await s3_client.delete_object(Bucket=bucket_name, Key='sync/a.txt')
+    counts = await s3_client.sync_download(bucket_name, 'sync/', str(destination), Delete=True)
+    assert counts == {'transferred': 1, 'deleted': 1, 'unchanged': 0}
+    assert (destination / 'c' / 'd.txt').read_bytes() == b'New\n'
+    assert not (destination / 'a.txt').exists()
+
+
+@pytest.mark.asyncio
+async def test_s3_sync_download_failure_keeps_file(s3_client, bucket_name, region, tmp_path, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='sync/a.txt', Body=b'Hello World\n')
+    destination = tmp_path / 'destination'
+    await s3_client.sync_download(bucket_name, 'sync/', str(destination))
+
+    await s3_client.put_object(Bucket=bucket_name, Key='sync/a.txt', Body=b'Hello Again\n')
+
+    async def get_object(**kwargs):
+        raise ClientError({'Error': {'Code': 'InternalError', 'Message': 'Oops'}}, 'GetObject')
+
+    monkeypatch.setattr(s3_client, 'get_object', get_object)
+    with pytest.raises(Exception, match="Couldn't download"):
+        await s3_client.sync_download(bucket_name, 'sync/', str(destination))
+    assert (destination / 'a.txt').read_bytes() == b'Hello World\n'
+    assert sorted(path.name for path in destination.iterdir()) == ['.aioboto3-sync.json', 'a.txt']
+
+    monkeypatch.undo()
+    counts = await s3_client.sync_download(bucket_name, 'sync/', str(destination))
+    assert counts == {'transferred': 1, 'deleted': 0, 'unchanged': 0}
+    assert (destination / 'a.txt').read_bytes() == b'Hello Again\n'
+
+
+@pytest.mark.asyncio
+async def test_s3_sync_shares_request_slots(s3_client, bucket_name, region, tmp_path, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    source = tmp_path / 'source'
+    source.mkdir()
+    for i in range(6):
+        (source / f'{i}.txt').write_bytes(b'Hello World\n' * i)
+    (source / 'large.bin').write_bytes(os.urandom(11 * 1024 * 1024))
+
+    in_flight = 0
+    peak = 0
+
+    def track(name):
+        method = getattr(s3_client, name)
+
+        async def tracked(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                return await method(**kwargs)
+            finally:
+                in_flight -= 1
+
+        monkeypatch.setattr(s3_client, name, tracked)
+
+    for name in ('put_object', 'create_multipart_upload', 'upload_part', 'complete_multipart_upload', 'get_object'):
+        track(name)
+    head_calls = []
+    s3_client.meta.events.register('before-call.s3.HeadObject', lambda **kwargs: head_calls.append(1))
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024, max_request_concurrency=2)
+    counts = await s3_client.sync_upload(str(source), bucket_name, 'sync/', Config=config, Concurrency=4)
+    assert counts == {'transferred': 7, 'deleted': 0, 'unchanged': 0}
+    assert peak == 2
+    # ETags come from the upload responses
+    assert not head_calls
+    with open(source / '.aioboto3-sync.json') as manifest_file:
+        manifest = json.load(manifest_file)
+    resp = await s3_client.list_objects_v2(Bucket=bucket_name, Prefix='sync/')
+    assert {obj['Key']: obj['ETag'] for obj in resp['Contents']} == \
+        {'sync/' + rel_path: entry['etag'] for rel_path, entry in manifest['files'].items()}
+
+    peak = 0
+    destination = tmp_path / 'destination'
+    counts = await s3_client.sync_download(bucket_name, 'sync/', str(destination), Config=config, Concurrency=4)
+    assert counts == {'transferred': 7, 'deleted': 0, 'unchanged': 0}
+    assert peak == 2
+    assert (destination / 'large.bin').read_bytes() == (source / 'large.bin').read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_s3_transfer_feature_id(s3_client, bucket_name, region, tmp_path):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=b'Hello World\n')
+    (tmp_path / 'a.txt').write_bytes(b'Hello World\n')
+
+    # Operation -> whether each request was marked as an S3 transfer
+    marked = []
+
+    def record(request, event_name, **kwargs):
+        user_agent = request.headers['User-Agent']
+        if isinstance(user_agent, bytes):
+            user_agent = user_agent.decode()
+        features = [part[2:].split(',') for part in user_agent.split() if part.startswith('m/')]
+        marked.append((event_name.split('.')[-1], bool(features) and 'G' in features[0]))
+
+    s3_client.meta.events.register('before-send.s3', record)
+
+    await s3_client.sync_upload(str(tmp_path), bucket_name, 'sync/')
+    await s3_client.sync_download(bucket_name, 'sync/', str(tmp_path / 'download'))
+    await s3_client.transform({'Bucket': bucket_name, 'Key': 'test_file'}, bucket_name, 'upper', [bytes.upper])
+    async for key, body in s3_client.get_objects(bucket_name, ['test_file']):
+        # Not leaked into the consumer's own requests
+        await s3_client.head_object(Bucket=bucket_name, Key=key)
+
+    assert ('HeadObject', False) in marked
+    assert all(is_marked for name, is_marked in marked if name != 'HeadObject')
+    assert {name for name, _ in marked} >= {'ListObjectsV2', 'PutObject', 'GetObject'}
+
+
+@pytest.mark.asyncio
+async def test_s3_transform(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    data = b''.join(f'line {i} of the source\n'.encode() for i in range(50000))
+    await s3_client.put_object(Bucket=bucket_name, Key='source.z', Body=zlib.compress(data))
+
+    decompressor = zlib.decompressobj()
+    compressor = zlib.compressobj()
+
+    async def upper(chunk):
+        return chunk.upper()
+
+    get_calls = []
+    s3_client.meta.events.register('before-call.s3.GetObject', lambda **kwargs: get_calls.append(1))
+
+    config = S3TransferConfig(multipart_chunksize=64 * 1024, max_request_concurrency=2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        counts = await s3_client.transform(
+            {'Bucket': bucket_name, 'Key': 'source.z'}, bucket_name, 'dest.z',
+            [
+                Stage(decompressor.decompress, flush=decompressor.flush, executor=executor),
+                upper,
+                Stage(bytes.swapcase, executor=executor, concurrency=2),
+                Stage(compressor.compress, flush=compressor.flush),
+            ],
+            Config=config
+        )
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='dest.z')
+    assert zlib.decompress(await resp['Body'].read()) == data
+    assert counts['read'] == len(zlib.compress(data))
+    assert counts['written'] == resp['ContentLength']
+    # Read in ranges rather than all at once
+    assert len(get_calls) > 2
+
+    # Failing stages fail the transform, and nothing's written
+    def fail(chunk):
+        raise ValueError('bad data')
+
+    with pytest.raises(ValueError):
+        await s3_client.transform({'Bucket': bucket_name, 'Key': 'source.z'}, bucket_name, 'failed.z', [fail], Config=config)
+    with pytest.raises(ClientError):
+        await s3_client.head_object(Bucket=bucket_name, Key='failed.z')
+
+
+@pytest.mark.asyncio
+async def test_s3_head_object_cache(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=b'Hello World\n')
+
+    head_calls = []
+    s3_client.meta.events.register('before-call.s3.HeadObject', lambda **kwargs: head_calls.append(1))
+    cache = s3_client.enable_head_object_cache(MaxSize=10, TTL=60)
+
+    async def download():
+        fh = BytesIO()
+        await s3_client.download_fileobj(bucket_name, 'test_file', fh)
+        return fh.getvalue()
+
+    # Concurrent lookups share one head_object, later ones are served from the cache
+    assert await asyncio.gather(*[download() for _ in range(5)]) == [b'Hello World\n'] * 5
+    assert await download() == b'Hello World\n'
+    assert len(head_calls) == 1
+    assert len(cache) == 1
+
+    # Writes through the client evict the key
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=b'Goodbye World\n')
+    assert len(cache) == 0
+    assert await download() == b'Goodbye World\n'
+    assert len(head_calls) == 2
+
+    # 404s aren't cached
+    for _ in range(2):
+        with pytest.raises(ClientError):
+            await s3_client.download_fileobj(bucket_name, 'missing', BytesIO())
+    assert len(head_calls) == 4
+
+
+# Small objects are downloaded with one hedged get_object, larger ones in parts
+@pytest.mark.parametrize('old_size,new_size', [(12, 6 * 1024 * 1024), (6 * 1024 * 1024, 12)])
+@pytest.mark.asyncio
+async def test_s3_head_object_cache_stale_download(s3_client, s3_resource, bucket_name, region, old_size, new_size):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    old_data = os.urandom(old_size)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=old_data)
+    s3_client.enable_head_object_cache(MaxSize=10, TTL=60)
+    s3_client.enable_hedging(Delay=60)
+    config = S3TransferConfig(multipart_chunksize=5 * 1024 * 1024)
+
+    get_calls = []
+    s3_client.meta.events.register('before-parameter-build.s3.GetObject', lambda params, **kwargs: get_calls.append(params.get('IfMatch')))
+
+    async def download():
+        fh = BytesIO()
+        await s3_client.download_fileobj(bucket_name, 'test_file', fh, Config=config)
+        return fh.getvalue()
+
+    assert await download() == old_data
+    old_etag = get_calls[0]
+    assert old_etag is not None
+
+    # Overwritten through another client, so the cached head_object response is now stale
+    data = os.urandom(new_size)
+    await s3_resource.meta.client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+    get_calls.clear()
+    assert await download() == data
+    # The ranged get pinned to the stale ETag failed, so it started again from a fresh head_object
+    new_etag = get_calls[-1]
+    assert old_etag in get_calls and new_etag != old_etag
+    assert get_calls == [old_etag] * get_calls.count(old_etag) + [new_etag] * get_calls.count(new_etag)
+
+
+@pytest.mark.asyncio
+async def test_s3_download_cache(s3_client, bucket_name, region, tmp_path):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    data = os.urandom(6 * 1024 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    get_calls = []
+    s3_client.meta.events.register('before-call.s3.GetObject', lambda **kwargs: get_calls.append(1))
+    s3_client.enable_download_cache(str(tmp_path / 'cache'), MaxSize=10 * 1024 * 1024)
+    config = S3TransferConfig(multipart_chunksize=5 * 1024 * 1024)
+
+    async def download():
+        fh = BytesIO()
+        await s3_client.download_fileobj(bucket_name, 'test_file', fh, Config=config)
+        return fh.getvalue()
+
+    # Multipart download into the cache
+    assert await download() == data
+    assert len(get_calls) == 2
+
+    # Revalidated with one conditional get
+    assert await download() == data
+    assert len(get_calls) == 3
+
+    with await s3_client.open_cached(bucket_name, 'test_file', Mmap=True) as mapped:
+        assert mapped[:100] == data[:100]
+
+    # Changed objects are downloaded by the conditional get
+    new_data = os.urandom(1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=new_data)
+    assert await download() == new_data
+
+    # Goes over MaxSize, so the least recently used object is evicted
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file2', Body=data)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file3', Body=data)
+    for key in ('test_file2', 'test_file3'):
+        await s3_client.download_fileobj(bucket_name, key, BytesIO(), Config=config)
+    assert len([filename for filename in os.listdir(tmp_path / 'cache') if filename.endswith('.json')]) == 1
+
+    with pytest.raises(ClientError):
+        await s3_client.download_fileobj(bucket_name, 'missing', BytesIO())
+
+
 @pytest.mark.asyncio
 async def test_s3_download_file_404(s3_client, bucket_name, region):
     await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
@@ -276,6 +822,79 @@ async def test_s3_upload_fileobj_async_multipart_completes_with_checksum_on_part
 
 
 
+@pytest.mark.asyncio
+async def test_s3_upload_fileobj_multipart_precomputes_part_checksums(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(11 * 1024 * 1024)
+
+    upload_part_calls = []
+    original_upload_part = s3_client.upload_part
+
+    async def upload_part(**kwargs):
+        upload_part_calls.append(kwargs)
+        return await original_upload_part(**kwargs)
+
+    s3_client.upload_part = upload_part
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    await s3_client.upload_fileobj(BytesIO(data), bucket_name, 'test_file', Config=config,
+                                   ExtraArgs={'ChecksumAlgorithm': 'CRC32'})
+
+    assert len(upload_part_calls) > 1
+    for call in upload_part_calls:
+        expected = base64.b64encode(zlib.crc32(call['Body']).to_bytes(4, 'big')).decode()
+        assert call['ChecksumCRC32'] == expected
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_upload_fileobj_multipart_checksums_without_botocore_classes(s3_client, bucket_name, region, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    # As if botocore's private checksum classes had moved, botocore is left to checksum the parts
+    monkeypatch.setattr('aioboto3.s3.utils._CHECKSUM_CLS', {})
+    from aioboto3.s3.utils import compute_checksum
+    assert compute_checksum('CRC32', b'data') is None
+
+    data = os.urandom(11 * 1024 * 1024)
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    await s3_client.upload_fileobj(BytesIO(data), bucket_name, 'test_file', Config=config,
+                                   ExtraArgs={'ChecksumAlgorithm': 'CRC32'})
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_upload_fileobj_reads_whilst_creating_multipart_upload(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(12 * 1024 * 1024)
+    fh = BytesIO(data)
+    reads_during_create = []
+    original_create_multipart_upload = s3_client.create_multipart_upload
+
+    async def create_multipart_upload(**kwargs):
+        position = fh.tell()
+        await asyncio.sleep(0.2)
+        reads_during_create.append(fh.tell() - position)
+        return await original_create_multipart_upload(**kwargs)
+
+    s3_client.create_multipart_upload = create_multipart_upload
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024, io_chunksize=1024 * 1024)
+    await s3_client.upload_fileobj(fh, bucket_name, 'test_file', Config=config)
+
+    # The rest of the file should've been read whilst waiting on the UploadId
+    assert reads_during_create[0] > 0
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == data
+
+
 @pytest.mark.asyncio
 async def test_s3_upload_fileobj_async_slow(s3_client, bucket_name, region):
     await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
@@ -349,6 +968,17 @@ async def test_s3_upload_file(s3_client, bucket_name, region):
     assert (await resp['Body'].read()) == data
 
 
+def test_s3_multipart_layout_stays_within_part_limit():
+    config = S3TransferConfig()
+
+    # 5TB would be ~655k parts at the default 8MiB
+    chunksize, num_parts = _multipart_layout(config, 5 * 1024 ** 4)
+    assert num_parts <= 10000
+    assert chunksize * num_parts >= 5 * 1024 ** 4
+
+    assert _multipart_layout(config, 20 * 1024 * 1024) == (8 * 1024 * 1024, 3)
+
+
 @pytest.mark.asyncio
 async def test_s3_copy(s3_client, bucket_name, region):
     data = b'Hello World\n'
@@ -383,7 +1013,8 @@ async def test_s3_copy_multipart(s3_client, bucket_name, region):
     # Copy file
     copy_source = {'Bucket': bucket_name, 'Key': 'test_file'}
     config = S3TransferConfig(multipart_threshold=4)
-    await s3_client.copy(copy_source, bucket_name, 'test_file2', Config=config, ExtraArgs={'RequestPayer': 'requester'})
+    await s3_client.copy(copy_source, bucket_name, 'test_file2', Config=config, ExtraArgs={'RequestPayer': 'requester'},
+                         CopyThreshold=4)
 
     # Get copied file
     resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file2')
@@ -477,6 +1108,28 @@ async def test_s3_resource_objects_delete_filter(s3_client, s3_resource, bucket_
     assert files[0] == 'test/file1'
 
 
+@pytest.mark.asyncio
+async def test_s3_resource_objects_delete_concurrently(s3_client, s3_resource, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    files_to_create = [f'test/file{i}' for i in range(9)]
+    for file in files_to_create:
+        await s3_client.put_object(Bucket=bucket_name, Key=file, Body=b'Hello World\n')
+
+    bucket = await s3_resource.Bucket(bucket_name)
+    responses = await bucket.objects.page_size(2).delete(concurrency=3)
+
+    # One response per page, in page order
+    assert len(responses) == 5
+    deleted = [item['Key'] for response in responses for item in response['Deleted']]
+    assert deleted == files_to_create
+
+    files = []
+    async for item in bucket.objects.all():
+        files.append(item.key)
+
+    assert not files
+
+
 @pytest.mark.asyncio
 async def test_s3_object_summary_load(s3_client, s3_resource, bucket_name, region):
     data = b'Hello World\n'
@@ -488,6 +1141,26 @@ async def test_s3_object_summary_load(s3_client, s3_resource, bucket_name, regio
     assert obj_size == len(data)
 
 
+@pytest.mark.asyncio
+async def test_s3_object_summaries_bulk_load(s3_client, s3_resource, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    keys = [f'test/file{i}' for i in range(10)]
+    for key in keys:
+        await s3_client.put_object(Bucket=bucket_name, Key=key, Body=b'Hello World\n', ContentType='text/plain')
+
+    bucket = await s3_resource.Bucket(bucket_name)
+    loaded_keys = []
+    async for obj in bucket.objects.filter(Prefix='test/').page_size(3).loaded(concurrency=4):
+        assert obj.meta.data['ContentType'] == 'text/plain'
+        assert obj.meta.data['Size'] == 12
+        loaded_keys.append(obj.key)
+    assert loaded_keys == keys
+
+    summaries = [await s3_resource.ObjectSummary(bucket_name, key) for key in keys]
+    await load_resources(summaries, concurrency=4)
+    assert all(summary.meta.data['ContentType'] == 'text/plain' for summary in summaries)
+
+
 @pytest.mark.asyncio
 async def test_s3_bucket_creation_date(s3_client, s3_resource, bucket_name, region):
     await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
@@ -495,3 +1168,822 @@ async def test_s3_bucket_creation_date(s3_client, s3_resource, bucket_name, regi
     bucket = await s3_resource.Bucket(bucket_name)
     creation_date = await bucket.creation_date
     assert isinstance(creation_date, datetime.datetime)
+
+
+@pytest.mark.asyncio
+async def test_s3_bucket_load_uses_bucket_index(s3_client, bucket_name, region, config, moto_server):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.create_bucket(Bucket=bucket_name + '-2', CreateBucketConfiguration={'LocationConstraint': region})
+
+    session = Session(region_name=region, **moto_config())
+    session.bucket_index.ttl = 60
+    async with session.resource('s3', region_name=region, endpoint_url=moto_server, config=config) as s3_resource:
+        list_buckets_calls = []
+        s3_resource.meta.client.meta.events.register('before-call.s3.ListBuckets', lambda **kwargs: list_buckets_calls.append(1))
+
+        buckets = [await s3_resource.Bucket(bucket_name), await s3_resource.Bucket(bucket_name + '-2')]
+        creation_dates = await asyncio.gather(*[bucket.creation_date for bucket in buckets])
+        assert all(isinstance(creation_date, datetime.datetime) for creation_date in creation_dates)
+        # Both loads share one listing
+        assert len(list_buckets_calls) == 1
+
+        # Bucket isn't in the cached index, so it's refreshed once
+        await s3_client.create_bucket(Bucket=bucket_name + '-3', CreateBucketConfiguration={'LocationConstraint': region})
+        bucket = await s3_resource.Bucket(bucket_name + '-3')
+        assert isinstance(await bucket.creation_date, datetime.datetime)
+        assert len(list_buckets_calls) == 2
+
+        bucket = await s3_resource.Bucket('does-not-exist')
+        assert await bucket.creation_date is None
+
+    # Other credentials get their own listing
+    async with session.resource('s3', region_name=region, endpoint_url=moto_server, config=config,
+                                aws_access_key_id='other', aws_secret_access_key='other') as s3_resource:
+        s3_resource.meta.client.meta.events.register('before-call.s3.ListBuckets', lambda **kwargs: list_buckets_calls.append(1))
+        bucket = await s3_resource.Bucket(bucket_name)
+        assert isinstance(await bucket.creation_date, datetime.datetime)
+        assert len(list_buckets_calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_s3_open_writer_small(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    callbacks = []
+
+    async with s3_client.open_writer(bucket_name, 'test_file', Callback=callbacks.append) as writer:
+        await writer.write(b'Hello ')
+        await writer.write(b'World\n')
+
+    assert writer.closed
+    assert callbacks == [12]
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == b'Hello World\n'
+
+
+@pytest.mark.asyncio
+async def test_s3_open_writer_multipart(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    chunk = os.urandom(1024 * 1024)
+    in_flight = 0
+    max_in_flight = 0
+    original_upload_part = s3_client.upload_part
+
+    async def upload_part(**kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(in_flight, max_in_flight)
+        try:
+            return await original_upload_part(**kwargs)
+        finally:
+            in_flight -= 1
+
+    s3_client.upload_part = upload_part
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024, max_request_concurrency=2)
+    async with s3_client.open_writer(bucket_name, 'test_file', Config=config) as writer:
+        for _ in range(22):
+            await writer.write(chunk)
+
+    assert 0 < max_in_flight <= 2
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == chunk * 22
+
+
+@pytest.mark.asyncio
+async def test_s3_open_writer_write_part(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    parts = [os.urandom(5 * 1024 * 1024), os.urandom(1024)]
+    async with s3_client.open_writer(bucket_name, 'test_file') as writer:
+        for part in parts:
+            await writer.write_part(part)
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == b''.join(parts)
+
+    with pytest.raises(ValueError):
+        async with s3_client.open_writer(bucket_name, 'test_file') as writer:
+            await writer.write(b'buffered')
+            await writer.write_part(parts[0])
+
+
+@pytest.mark.asyncio
+async def test_s3_open_writer_aborts_on_error(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    with pytest.raises(ValueError):
+        async with s3_client.open_writer(bucket_name, 'test_file', Config=config) as writer:
+            await writer.write(os.urandom(6 * 1024 * 1024))
+            raise ValueError('producer broke')
+
+    uploads_resps = await s3_client.list_multipart_uploads(Bucket=bucket_name)
+    assert len(uploads_resps.get('Uploads', [])) == 0
+
+    with pytest.raises(ClientError):
+        await s3_client.head_object(Bucket=bucket_name, Key='test_file')
+
+
+@pytest.mark.asyncio
+async def test_s3_writer_abort_releases_request_slots(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    request_semaphore = asyncio.Semaphore(4)
+    writer = S3Writer(s3_client, bucket_name, 'test_file', RequestSemaphore=request_semaphore)
+    for _ in range(2):
+        await writer.write_part(os.urandom(5 * 1024 * 1024))
+    # The part tasks are cancelled before they've had a chance to start
+    await writer.abort()
+
+    assert request_semaphore._value == 4
+    uploads_resps = await s3_client.list_multipart_uploads(Bucket=bucket_name)
+    assert len(uploads_resps.get('Uploads', [])) == 0
+
+
+@pytest.mark.asyncio
+async def test_s3_open_reader(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    data = os.urandom(10 * 1024 + 123)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    get_ranges = []
+    s3_client.meta.events.register('before-parameter-build.s3.GetObject', lambda params, **kwargs: get_ranges.append(params['Range']))
+
+    async with s3_client.open_reader(bucket_name, 'test_file', BlockSize=1024, MaxBlocks=4, ReadAhead=2) as reader:
+        assert reader.seekable()
+        assert await reader.seek(-10, io.SEEK_END) == len(data) - 10
+        assert await reader.read() == data[-10:]
+        assert await reader.read() == b''
+
+        # Spans 3 blocks
+        await reader.seek(1000)
+        assert await reader.read(2100) == data[1000:3100]
+        assert reader.tell() == 3100
+
+        # Cached
+        num_gets = len(get_ranges)
+        await reader.seek(1500)
+        assert await reader.read(10) == data[1500:1510]
+        assert len(get_ranges) == num_gets
+
+        # Read the rest sequentially, which starts prefetching
+        await reader.seek(0)
+        chunks = []
+        while True:
+            chunk = await reader.read(700)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        assert b''.join(chunks) == data
+
+        buffer = bytearray(5)
+        await reader.seek(7)
+        assert await reader.readinto(buffer) == 5
+        assert bytes(buffer) == data[7:12]
+
+    # Each block is only fetched once per time it's in the cache
+    assert len(get_ranges) < 20
+
+
+@pytest.mark.asyncio
+async def test_s3_open_reader_bounds_requests(s3_client, bucket_name, region, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    data = os.urandom(20 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    in_flight = 0
+    peak = 0
+    get_object = s3_client.get_object
+
+    async def slow_get_object(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await get_object(**kwargs)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(s3_client, 'get_object', slow_get_object)
+
+    config = S3TransferConfig(max_request_concurrency=3)
+    async with s3_client.open_reader(bucket_name, 'test_file', BlockSize=1024, MaxBlocks=32, ReadAhead=8, Config=config) as reader:
+        # Spans all 20 blocks
+        assert await reader.read() == data
+        assert peak == 3
+
+        # Sequential reads with prefetching on top
+        peak = 0
+        reader._blocks.clear()
+        await reader.seek(0)
+        chunks = []
+        while True:
+            chunk = await reader.read(3000)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        assert b''.join(chunks) == data
+        assert peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_s3_get_object_ranges(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    data = os.urandom(100 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    get_ranges = []
+    s3_client.meta.events.register('before-parameter-build.s3.GetObject', lambda params, **kwargs: get_ranges.append(params['Range']))
+
+    ranges = [(50000, 100), (10, 20), (40, 10), (35, 10), (90000, 0), (99 * 1024, 2048)]
+    views = await s3_client.get_object_ranges(bucket_name, 'test_file', ranges, MaxGap=1024)
+
+    assert all(isinstance(view, memoryview) for view in views)
+    assert [bytes(view) for view in views] == [data[offset:offset + length] for offset, length in ranges]
+    assert sorted(get_ranges) == ['bytes=10-49', 'bytes=101376-103423', 'bytes=50000-50099']
+
+    # Starting past the end is empty rather than an InvalidRange error
+    views = await s3_client.get_object_ranges(bucket_name, 'test_file', [(10, 5), (200 * 1024, 10)], MaxGap=0)
+    assert [bytes(view) for view in views] == [data[10:15], b'']
+
+
+@pytest.mark.asyncio
+async def test_s3_get_object_ranges_changed(s3_client, bucket_name, region, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    old_data = os.urandom(100 * 1024)
+    new_data = os.urandom(100 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=old_data)
+
+    if_matches = []
+    get_object = s3_client.get_object
+
+    async def get_object_then_overwrite(**kwargs):
+        if_matches.append(kwargs.get('IfMatch'))
+        response = await get_object(**kwargs)
+        if len(if_matches) == 1:
+            # Overwritten after the first range was fetched, before the second
+            await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=new_data)
+        return response
+
+    monkeypatch.setattr(s3_client, 'get_object', get_object_then_overwrite)
+
+    ranges = [(10, 20), (90000, 100)]
+    config = S3TransferConfig(max_request_concurrency=1)
+    views = await s3_client.get_object_ranges(bucket_name, 'test_file', ranges, MaxGap=0, Config=config)
+
+    # Both re-fetched from the current version, not the one first seen
+    assert [bytes(view) for view in views] == [new_data[offset:offset + length] for offset, length in ranges]
+    new_etag = (await s3_client.head_object(Bucket=bucket_name, Key='test_file'))['ETag']
+    assert if_matches == [None, None, new_etag, new_etag]
+
+
+@pytest.mark.asyncio
+async def test_s3_upload_fileobj_async_iterable(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    async def chunks():
+        yield b'Hello '
+        yield b''
+        yield bytearray(b'World\n')
+
+    await s3_client.upload_fileobj(chunks(), bucket_name, 'test_file')
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == b'Hello World\n'
+
+
+@pytest.mark.asyncio
+async def test_s3_upload_fileobj_async_iterable_multipart(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(11 * 1024 * 1024)
+
+    async def chunks():
+        # Uneven chunk sizes so they straddle part boundaries
+        chunk_size = 700 * 1024
+        for offset in range(0, len(data), chunk_size):
+            yield data[offset:offset + chunk_size]
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    await s3_client.upload_fileobj(chunks(), bucket_name, 'test_file', Config=config)
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_upload_file_multipart_streams_from_file(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(11 * 1024 * 1024)
+    tmpfile = tempfile.NamedTemporaryFile(delete=False)
+    tmpfile.write(data)
+    tmpfile.close()
+
+    part_bodies = []
+    original_upload_part = s3_client.upload_part
+
+    async def upload_part(**kwargs):
+        part_bodies.append(kwargs['Body'])
+        return await original_upload_part(**kwargs)
+
+    s3_client.upload_part = upload_part
+
+    callbacks = []
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    try:
+        await s3_client.upload_file(tmpfile.name, bucket_name, 'test_file', Config=config, Callback=callbacks.append,
+                                    ExtraArgs={'ChecksumAlgorithm': 'SHA256'})
+    finally:
+        os.remove(tmpfile.name)
+
+    assert len(part_bodies) == 3
+    assert not any(isinstance(body, (bytes, bytearray)) for body in part_bodies)
+    assert sum(callbacks) == len(data)
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_uses_copy_object_below_copy_threshold(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(11 * 1024 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    s3_client.create_multipart_upload = AsyncMock(side_effect=AssertionError('Should not do a multipart copy'))
+
+    # Way over multipart_threshold, but well under the 5GiB CopyObject limit
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    await s3_client.copy({'Bucket': bucket_name, 'Key': 'test_file'}, bucket_name, 'test_file2', Config=config)
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file2')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.parametrize('delimiter', ['/', None])
+@pytest.mark.asyncio
+async def test_s3_list_objects_parallel(s3_client, bucket_name, region, delimiter):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    keys = ['data/top', 'data/-dash', 'data/~tilde', 'data/0', 'other/file']
+    keys += [f'data/{directory}/{i:03d}' for directory in ('a', 'B', 'c') for i in range(15)]
+    keys += [f'data/flat{i:03d}' for i in range(20)]
+    for key in keys:
+        await s3_client.put_object(Bucket=bucket_name, Key=key, Body=b'')
+
+    expected = sorted(key for key in keys if key.startswith('data/'))
+
+    listed = [obj['Key'] async for obj in s3_client.list_objects_parallel(bucket_name, 'data/', Concurrency=3, Delimiter=delimiter)]
+    assert sorted(listed) == expected
+
+    listing = s3_client.list_objects_parallel(bucket_name, 'data/', Concurrency=3, Delimiter=delimiter, Ordered=True)
+    listed = [obj['Key'] async for obj in listing]
+    assert listed == expected
+
+
+def test_s3_start_after():
+    assert start_after('data/b') == 'data/a\U0010ffff'
+    assert start_after('data/a\0') == 'data/a'
+    assert start_after('\ue000') == '\ud7ff\U0010ffff'
+    assert start_after('') == ''
+    # Just below the key, rather than before everything beginning 'data/a'
+    for key in ('data/a', 'data/az', 'data/a\uffff'):
+        assert key < start_after('data/b')
+    assert start_after('data/b') < 'data/a\U0010ffffz' < 'data/b'
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+@pytest.mark.asyncio
+async def test_s3_list_objects_columnar(s3_client, bucket_name, region, concurrency):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    keys = [f'data/{directory}/{i:02d}' for directory in ('a', 'b') for i in range(10)] + ['data/\u00e9t\u00e9']
+    for i, key in enumerate(keys):
+        await s3_client.put_object(Bucket=bucket_name, Key=key, Body=b'x' * i)
+
+    listing = await s3_client.list_objects_columnar(bucket_name, 'data/', Concurrency=concurrency)
+    assert len(listing) == len(keys)
+    assert list(listing.keys) == sorted(keys)
+    assert listing.total_size() == sum(range(len(keys)))
+    assert listing[listing.find('data/b/03')]['Size'] == 13
+    assert listing.find('data/c') is None
+    assert listing.sort().keys.buffer == listing.keys.buffer
+    assert list(listing.filter(lambda obj: obj['Key'].startswith('data/a/')).keys) == keys[:10]
+
+    await s3_client.delete_object(Bucket=bucket_name, Key='data/a/00')
+    await s3_client.put_object(Bucket=bucket_name, Key='data/a/01', Body=b'changed')
+    await s3_client.put_object(Bucket=bucket_name, Key='data/c', Body=b'')
+
+    new_listing = await s3_client.list_objects_columnar(bucket_name, 'data/', Concurrency=concurrency)
+    added, removed, changed = listing.diff(new_listing)
+    assert [new_listing.keys[index] for index in added] == ['data/c']
+    assert [listing.keys[index] for index in removed] == ['data/a/00']
+    assert [listing.keys[index] for index, _ in changed] == ['data/a/01']
+
+
+@pytest.mark.asyncio
+async def test_s3_listing_index(s3_client, bucket_name, region, tmp_path):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    keys = ['data/top', 'data/a/1', 'data/a/2', 'data/b/1', 'other/file']
+    for key in keys:
+        await s3_client.put_object(Bucket=bucket_name, Key=key, Body=b'Hello')
+
+    async with ListingIndex(str(tmp_path / 'index.db')) as index:
+        counts = await index.refresh(s3_client, bucket_name, 'data/')
+        assert counts == {'added': 4, 'updated': 0, 'deleted': 0}
+
+        assert await index.exists(bucket_name, 'data/a/1')
+        assert not await index.exists(bucket_name, 'other/file')
+        assert await index.exists_many(bucket_name, ['data/top', 'data/c']) == {'data/top': True, 'data/c': False}
+        obj = await index.get(bucket_name, 'data/b/1')
+        assert obj['Size'] == 5
+        assert [obj['Key'] async for obj in index.iter_objects(bucket_name, prefix='data/a/', batch_size=1)] == ['data/a/1', 'data/a/2']
+        assert [obj['Key'] async for obj in index.iter_objects(bucket_name, start_after='data/a/1', end_before='data/top')] == \
+            ['data/a/2', 'data/b/1']
+
+        await s3_client.put_object(Bucket=bucket_name, Key='data/a/1', Body=b'Hello world')
+        await s3_client.delete_object(Bucket=bucket_name, Key='data/b/1')
+        await s3_client.put_object(Bucket=bucket_name, Key='data/c/1', Body=b'Hello')
+
+        # Nothing is stale yet, only the objects directly under data/ and the new shard are listed
+        counts = await index.refresh(s3_client, bucket_name, 'data/', max_age=3600)
+        assert counts == {'added': 1, 'updated': 0, 'deleted': 1}
+        assert not await index.exists(bucket_name, 'data/b/1')
+
+        counts = await index.refresh(s3_client, bucket_name, 'data/')
+        assert counts == {'added': 0, 'updated': 1, 'deleted': 0}
+        assert (await index.get(bucket_name, 'data/a/1'))['Size'] == 11
+
+
+@pytest.mark.asyncio
+async def test_s3_listing_index_nested_prefixes(s3_client, bucket_name, region, tmp_path):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    keys = ['data/top', 'data/a/1', 'data/a/x/1', 'data/b/1']
+    for key in keys:
+        await s3_client.put_object(Bucket=bucket_name, Key=key, Body=b'Hello')
+
+    async with ListingIndex(str(tmp_path / 'index.db')) as index:
+        assert await index.refresh(s3_client, bucket_name, 'data/') == {'added': 4, 'updated': 0, 'deleted': 0}
+        # data/a/ is both a shard of data/ and refreshed itself, nothing has changed so nothing should be touched
+        assert await index.refresh(s3_client, bucket_name, 'data/a/') == {'added': 0, 'updated': 0, 'deleted': 0}
+        assert await index.refresh(s3_client, bucket_name, 'data/') == {'added': 0, 'updated': 0, 'deleted': 0}
+        assert await index.exists_many(bucket_name, keys) == dict.fromkeys(keys, True)
+
+        await s3_client.delete_object(Bucket=bucket_name, Key='data/a/1')
+        await s3_client.delete_object(Bucket=bucket_name, Key='data/a/x/1')
+        await s3_client.put_object(Bucket=bucket_name, Key='data/a/2', Body=b'Hello')
+        assert await index.refresh(s3_client, bucket_name, 'data/a/') == {'added': 1, 'updated': 0, 'deleted': 2}
+        assert await index.refresh(s3_client, bucket_name, 'data/') == {'added': 0, 'updated': 0, 'deleted': 0}
+
+        await s3_client.delete_object(Bucket=bucket_name, Key='data/b/1')
+        assert await index.refresh(s3_client, bucket_name, 'data/', max_age=3600) == {'added': 0, 'updated': 0, 'deleted': 1}
+        assert [obj['Key'] async for obj in index.iter_objects(bucket_name)] == ['data/a/2', 'data/top']
+
+
+@pytest.mark.asyncio
+async def test_s3_listing_index_switch_delimiter(s3_client, bucket_name, region, tmp_path):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    keys = ['data/top', 'data/a/1', 'data/b/1']
+    for key in keys:
+        await s3_client.put_object(Bucket=bucket_name, Key=key, Body=b'Hello')
+
+    async with ListingIndex(str(tmp_path / 'index.db')) as index:
+        assert await index.refresh(s3_client, bucket_name, 'data/', delimiter=None) == {'added': 3, 'updated': 0, 'deleted': 0}
+        # The whole prefix was one shard, now it's split up, which shouldn't lose the direct objects
+        assert await index.refresh(s3_client, bucket_name, 'data/', max_age=3600) == {'added': 0, 'updated': 0, 'deleted': 0}
+        assert await index.exists_many(bucket_name, keys) == dict.fromkeys(keys, True)
+
+        # And back again, data/ was refreshed as a whole less than max_age ago so isn't listed
+        assert await index.refresh(s3_client, bucket_name, 'data/', max_age=3600, delimiter=None) == \
+            {'added': 0, 'updated': 0, 'deleted': 0}
+        assert await index.exists_many(bucket_name, keys) == dict.fromkeys(keys, True)
+
+        await s3_client.delete_object(Bucket=bucket_name, Key='data/a/1')
+        assert await index.refresh(s3_client, bucket_name, 'data/', delimiter=None) == {'added': 0, 'updated': 0, 'deleted': 1}
+        assert [obj['Key'] async for obj in index.iter_objects(bucket_name)] == ['data/b/1', 'data/top']
+
+
+def enforce_copy_source_if_match(client, head_client, monkeypatch):
+    """
+    moto ignores CopySourceIfMatch, so check it as S3 would.
+    """
+    for name in ('copy_object', 'upload_part_copy'):
+        method = getattr(client, name)
+
+        async def checked(_method=method, _name=name, **kwargs):
+            if 'CopySourceIfMatch' in kwargs:
+                head = await head_client.head_object(Bucket=kwargs['CopySource']['Bucket'], Key=kwargs['CopySource']['Key'])
+                if head['ETag'] != kwargs['CopySourceIfMatch']:
+                    raise ClientError({'Error': {'Code': 'PreconditionFailed', 'Message': 'At least one of the pre-conditions you specified did not hold'},
+                                       'ResponseMetadata': {'HTTPStatusCode': 412}}, _name)
+            return await _method(**kwargs)
+
+        monkeypatch.setattr(client, name, checked)
+
+
+@pytest.mark.parametrize('old_size,new_size', [(1024, 11 * 1024 * 1024), (11 * 1024 * 1024, 1024)])
+@pytest.mark.asyncio
+async def test_s3_copy_stale_head_object_cache(s3_client, s3_resource, bucket_name, region, monkeypatch, old_size, new_size):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=os.urandom(old_size))
+    s3_client.enable_head_object_cache(MaxSize=10, TTL=60)
+    enforce_copy_source_if_match(s3_client, s3_resource.meta.client, monkeypatch)
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    copy_source = {'Bucket': bucket_name, 'Key': 'test_file'}
+
+    await s3_client.copy(copy_source, bucket_name, 'test_file2', Config=config, CopyThreshold=5 * 1024 * 1024)
+
+    # Overwritten through another client, so the cached head_object response is now stale
+    data = os.urandom(new_size)
+    await s3_resource.meta.client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+    await s3_client.copy(copy_source, bucket_name, 'test_file2', Config=config, CopyThreshold=5 * 1024 * 1024)
+
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file2')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_prefix_overwritten_since_listed(s3_client, s3_resource, bucket_name, region, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='src/a', Body=b'Hello World\n')
+
+    async def list_objects(**kwargs):
+        # Overwritten between being listed and copied
+        resp = await original_list_objects(**kwargs)
+        await s3_client.put_object(Bucket=bucket_name, Key='src/a', Body=b'Goodbye World\n')
+        return resp
+
+    original_list_objects = s3_client.list_objects_v2
+    monkeypatch.setattr(s3_client, 'list_objects_v2', list_objects)
+    enforce_copy_source_if_match(s3_client, s3_resource.meta.client, monkeypatch)
+    callback_bytes = []
+    copied = await s3_client.copy_prefix(bucket_name, 'src/', bucket_name, 'dest/', Callback=callback_bytes.append)
+
+    assert copied == 1
+    assert callback_bytes == [len(b'Goodbye World\n')]
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='dest/a')
+    assert (await resp['Body'].read()) == b'Goodbye World\n'
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_prefix(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.create_bucket(Bucket=bucket_name + '-dest', CreateBucketConfiguration={'LocationConstraint': region})
+
+    small_data = b'Hello world'
+    large_data = os.urandom(11 * 1024 * 1024)
+    for i in range(5):
+        await s3_client.put_object(Bucket=bucket_name, Key=f'src/{i}', Body=small_data)
+    await s3_client.put_object(Bucket=bucket_name, Key='src/large', Body=large_data)
+    await s3_client.put_object(Bucket=bucket_name, Key='other/file', Body=small_data)
+
+    # Sizes and ETags come from the listing
+    s3_client.head_object = AsyncMock(side_effect=AssertionError('Should not HEAD objects'))
+
+    callback_bytes = []
+    config = S3TransferConfig(multipart_chunksize=5 * 1024 * 1024)
+    copied = await s3_client.copy_prefix(bucket_name, 'src/', bucket_name + '-dest', 'dest/', Callback=callback_bytes.append,
+                                         Config=config, CopyThreshold=5 * 1024 * 1024)
+
+    assert copied == 6
+    assert sum(callback_bytes) == 5 * len(small_data) + len(large_data)
+
+    resp = await s3_client.list_objects_v2(Bucket=bucket_name + '-dest')
+    assert sorted(obj['Key'] for obj in resp['Contents']) == ['dest/0', 'dest/1', 'dest/2', 'dest/3', 'dest/4', 'dest/large']
+
+    resp = await s3_client.get_object(Bucket=bucket_name + '-dest', Key='dest/large')
+    assert (await resp['Body'].read()) == large_data
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_prefix_overlapping(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='a/b/file', Body=b'Hello world')
+
+    # The copies would be listed and copied again
+    with pytest.raises(ValueError):
+        await s3_client.copy_prefix(bucket_name, 'a/', bucket_name, 'a/b/')
+    with pytest.raises(ValueError):
+        await s3_client.copy_prefix(bucket_name, '', bucket_name, 'copy/')
+
+    # Up out of the source prefix is fine
+    assert await s3_client.copy_prefix(bucket_name, 'a/b/', bucket_name, 'a/') == 1
+    resp = await s3_client.list_objects_v2(Bucket=bucket_name)
+    assert [obj['Key'] for obj in resp['Contents']] == ['a/b/file', 'a/file']
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_prefix_streaming_bounds_requests_and_bodies(s3_client, bucket_name, region, monkeypatch):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    large_data = os.urandom(11 * 1024 * 1024)
+    for i in range(3):
+        await s3_client.put_object(Bucket=bucket_name, Key=f'src/large{i}', Body=large_data)
+        await s3_client.put_object(Bucket=bucket_name, Key=f'src/small{i}', Body=b'Hello world')
+
+    in_flight = 0
+    max_in_flight = 0
+    # Bodies which have been got but not yet uploaded
+    bodies = 0
+    max_bodies = 0
+
+    def counted(name):
+        original = getattr(s3_client, name)
+
+        async def call(**kwargs):
+            nonlocal in_flight, max_in_flight, bodies, max_bodies
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            if name == 'get_object':
+                bodies += 1
+                max_bodies = max(max_bodies, bodies)
+            try:
+                return await original(**kwargs)
+            finally:
+                in_flight -= 1
+                if name in ('upload_part', 'put_object'):
+                    bodies -= 1
+
+        monkeypatch.setattr(s3_client, name, call)
+
+    for name in ('get_object', 'upload_part', 'put_object', 'create_multipart_upload', 'complete_multipart_upload'):
+        counted(name)
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024, max_request_concurrency=2)
+    copied = await s3_client.copy_prefix(bucket_name, 'src/', bucket_name, 'dest/', Config=config, Streaming=True)
+
+    assert copied == 6
+    assert max_in_flight <= 2
+    assert max_bodies <= 2
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='dest/large2')
+    assert (await resp['Body'].read()) == large_data
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_multipart_retries_parts(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(11 * 1024 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    failed_parts = set()
+    original_upload_part_copy = s3_client.upload_part_copy
+
+    async def upload_part_copy(**kwargs):
+        if kwargs['PartNumber'] not in failed_parts:
+            failed_parts.add(kwargs['PartNumber'])
+            raise ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Slow Down'},
+                               'ResponseMetadata': {'HTTPStatusCode': 503}}, 'UploadPartCopy')
+        return await original_upload_part_copy(**kwargs)
+
+    s3_client.upload_part_copy = upload_part_copy
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    await s3_client.copy({'Bucket': bucket_name, 'Key': 'test_file'}, bucket_name, 'test_file2', Config=config,
+                         CopyThreshold=5 * 1024 * 1024)
+
+    assert failed_parts == {1, 2, 3}
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file2')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_multipart_resume(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(11 * 1024 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+    copy_source = {'Bucket': bucket_name, 'Key': 'test_file'}
+
+    # Simulate an earlier copy which got as far as the first part
+    upload_id = (await s3_client.create_multipart_upload(Bucket=bucket_name, Key='test_file2'))['UploadId']
+    await s3_client.upload_part_copy(Bucket=bucket_name, Key='test_file2', CopySource=copy_source, UploadId=upload_id,
+                                     PartNumber=1, CopySourceRange=f'bytes=0-{5 * 1024 * 1024 - 1}')
+
+    copied_parts = []
+    original_upload_part_copy = s3_client.upload_part_copy
+
+    async def upload_part_copy(**kwargs):
+        copied_parts.append(kwargs['PartNumber'])
+        return await original_upload_part_copy(**kwargs)
+
+    s3_client.upload_part_copy = upload_part_copy
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    etag = (await s3_client.head_object(Bucket=bucket_name, Key='test_file'))['ETag']
+    await s3_client.copy(copy_source, bucket_name, 'test_file2', Config=config, UploadId=upload_id,
+                         ExtraArgs={'CopySourceIfMatch': etag}, CopyThreshold=5 * 1024 * 1024)
+
+    assert sorted(copied_parts) == [2, 3]
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file2')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_multipart_resume_changed_source(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=os.urandom(11 * 1024 * 1024))
+    copy_source = {'Bucket': bucket_name, 'Key': 'test_file'}
+    etag = (await s3_client.head_object(Bucket=bucket_name, Key='test_file'))['ETag']
+
+    upload_id = (await s3_client.create_multipart_upload(Bucket=bucket_name, Key='test_file2'))['UploadId']
+    await s3_client.upload_part_copy(Bucket=bucket_name, Key='test_file2', CopySource=copy_source, UploadId=upload_id,
+                                     PartNumber=1, CopySourceRange=f'bytes=0-{5 * 1024 * 1024 - 1}')
+
+    # The source changes before the copy is resumed
+    data = os.urandom(11 * 1024 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    copied_parts = []
+    s3_client.meta.events.register('before-parameter-build.s3.UploadPartCopy', lambda params, **kwargs: copied_parts.append(params['PartNumber']))
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+
+    # Pinned to the old version, which no longer exists
+    with pytest.raises(ClientError):
+        await s3_client.copy(copy_source, bucket_name, 'test_file2', Config=config, UploadId=upload_id,
+                             ExtraArgs={'CopySourceIfMatch': etag}, CopyThreshold=5 * 1024 * 1024)
+    assert not copied_parts
+
+    # Without an ETag the parts that are there can't be trusted
+    await s3_client.copy(copy_source, bucket_name, 'test_file2', Config=config, UploadId=upload_id,
+                         CopyThreshold=5 * 1024 * 1024)
+    assert sorted(copied_parts) == [1, 2, 3]
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file2')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+@pytest.mark.asyncio
+async def test_s3_copy_adjusts_part_size(s3_client, bucket_name, region, monkeypatch, streaming):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(12 * 1024 * 1024)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    # Stand in for the 10,000 part limit, 12MiB in 5MiB parts would need 3
+    monkeypatch.setattr('aioboto3.s3.inject.ChunksizeAdjuster', lambda: ChunksizeAdjuster(max_parts=2))
+    part_numbers = []
+    s3_client.meta.events.register('before-parameter-build.s3.UploadPart', lambda params, **kwargs: part_numbers.append(params['PartNumber']))
+    s3_client.meta.events.register('before-parameter-build.s3.UploadPartCopy', lambda params, **kwargs: part_numbers.append(params['PartNumber']))
+
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    await s3_client.copy({'Bucket': bucket_name, 'Key': 'test_file'}, bucket_name, 'test_file2', Config=config,
+                         CopyThreshold=5 * 1024 * 1024, Streaming=streaming)
+
+    assert sorted(part_numbers) == [1, 2]
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file2')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.parametrize('size', [12, 11 * 1024 * 1024])
+@pytest.mark.asyncio
+async def test_s3_copy_streaming(s3_client, bucket_name, region, size):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+
+    data = os.urandom(size)
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=data)
+
+    # Nothing should be copied server side
+    s3_client.copy_object = AsyncMock(side_effect=AssertionError('Should not use copy_object'))
+    s3_client.upload_part_copy = AsyncMock(side_effect=AssertionError('Should not use upload_part_copy'))
+
+    callbacks = []
+    config = S3TransferConfig(multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024)
+    await s3_client.copy({'Bucket': bucket_name, 'Key': 'test_file'}, bucket_name, 'test_file2', Config=config,
+                         SourceClient=s3_client, Streaming=True, Callback=callbacks.append)
+
+    assert max(callbacks) == size
+    resp = await s3_client.get_object(Bucket=bucket_name, Key='test_file2')
+    assert (await resp['Body'].read()) == data
+
+
+@pytest.mark.asyncio
+async def test_s3_copy_streaming_keeps_metadata(s3_client, bucket_name, region):
+    await s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={'LocationConstraint': region})
+    await s3_client.put_object(Bucket=bucket_name, Key='test_file', Body=b'{}', ContentType='application/json',
+                               CacheControl='no-cache', Metadata={'source': 'test'})
+    copy_source = {'Bucket': bucket_name, 'Key': 'test_file'}
+
+    await s3_client.copy(copy_source, bucket_name, 'test_file2', Streaming=True)
+    resp = await s3_client.head_object(Bucket=bucket_name, Key='test_file2')
+    assert resp['ContentType'] == 'application/json'
+    assert resp['CacheControl'] == 'no-cache'
+    assert resp['Metadata'] == {'source': 'test'}
+
+    # ExtraArgs take precedence
+    await s3_client.copy(copy_source, bucket_name, 'test_file2', Streaming=True, ExtraArgs={'Metadata': {'dest': 'test'}})
+    resp = await s3_client.head_object(Bucket=bucket_name, Key='test_file2')
+    assert resp['ContentType'] == 'application/json'
+    assert resp['Metadata'] == {'dest': 'test'}
+
+    await s3_client.copy(copy_source, bucket_name, 'test_file2', Streaming=True, ExtraArgs={'MetadataDirective': 'REPLACE'})
+    resp = await s3_client.head_object(Bucket=bucket_name, Key='test_file2')
+    assert resp['ContentType'] != 'application/json'
+    assert resp['Metadata'] == {}